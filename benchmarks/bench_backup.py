@@ -0,0 +1,70 @@
+"""Backup time and size as the database grows.
+
+For each size, fills a scratch database with datagen.py, takes a full
+backup, applies a batch of writes, takes an incremental backup and then
+restores the newest one, reporting times and bytes written:
+
+    python benchmarks/bench_backup.py --projects 100,1000,5000 --changes 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(HERE), "src")
+
+def _mb(count):
+    return count / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", default="100,1000,5000", help="Comma-separated project counts")
+    parser.add_argument("--changes", type=int, default=200, help="Orders placed between the two backups")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sys.path[:0] = [SRC, HERE]
+    from sqlalchemy import create_engine
+    from datagen import generate
+    from construction_cli.utils.backup import BackupSet
+    from construction_cli.utils.migrations import upgrade
+
+    print(f"{'projects':>8} {'db MB':>7} {'full s':>7} {'full MB':>8} {'incr s':>7} {'incr MB':>8}"
+          f" {'pages':>13} {'restore s':>9}")
+    for projects in (int(p) for p in args.projects.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            engine = create_engine("sqlite:///" + path)
+            with engine.begin() as conn:
+                conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+                upgrade(conn)
+            generate(engine, projects, args.seed)
+            backups = BackupSet(os.path.join(tmp, "backups"))
+
+            start = time.perf_counter()
+            full = backups.backup(path)
+            full_time = time.perf_counter() - start
+
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "INSERT INTO orders (material_id, supplier_id, quantity, unit_cost, total_cost, order_date, status) "
+                    "SELECT id, supplier_id, 10, cost_per_unit, 10 * cost_per_unit, date('now'), 'pending' "
+                    "FROM materials ORDER BY random() LIMIT ?", (args.changes,))
+            engine.dispose()
+
+            start = time.perf_counter()
+            incremental = backups.backup(path)
+            incremental_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            backups.restore(os.path.join(tmp, "restored.db"))
+            restore_time = time.perf_counter() - start
+
+            pages = f"{incremental['changed']}/{incremental['pages']}"
+            print(f"{projects:8d} {_mb(os.path.getsize(path)):7.1f} {full_time:7.2f} {_mb(full['size']):8.2f}"
+                  f" {incremental_time:7.2f} {_mb(incremental['size']):8.3f} {pages:>13} {restore_time:9.2f}")
+
+if __name__ == "__main__":
+    main()
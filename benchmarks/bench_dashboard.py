@@ -0,0 +1,87 @@
+"""Portfolio dashboard over many projects.
+
+Seeds a scratch SQLite file with projects, phases and milestones, then
+compares the grouped dashboard query with looking each project up in
+turn the way repeated project-status calls do:
+
+    python benchmarks/bench_dashboard.py --projects 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def seed(engine, projects, phases, milestones):
+    today = date.today()
+    day = lambda offset: (today + timedelta(days=offset)).isoformat()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO projects (id, name, budget, start_date, end_date, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [(i, f"Project {i}", random.uniform(1e5, 1e7), day(-random.randint(0, 400)),
+              day(random.randint(-30, 600)), random.choice(("active", "active", "active", "on_hold", "completed")))
+             for i in range(1, projects + 1)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO phases (project_id, name, duration, status) VALUES (?, ?, ?, ?)",
+            [(p, f"Phase {n}", random.randint(5, 60), random.choice(("planned", "in_progress", "completed")))
+             for p in range(1, projects + 1) for n in range(phases)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO milestones (project_id, name, target_date, status) VALUES (?, ?, ?, ?)",
+            [(p, f"Milestone {n}", day(random.randint(-120, 240)), random.choice(("pending", "pending", "completed")))
+             for p in range(1, projects + 1) for n in range(milestones)],
+        )
+
+def per_project(session, project_ids):
+    """What a loop of project-status calls costs: a few queries per project"""
+    from construction_cli.models.project import Project, Phase, Milestone
+    for project_id in project_ids:
+        session.get(Project, project_id)
+        session.query(Phase.status).filter(Phase.project_id == project_id).all()
+        session.query(Milestone.status, Milestone.target_date).filter(Milestone.project_id == project_id).all()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--phases", type=int, default=8, help="Phases per project")
+    parser.add_argument("--milestones", type=int, default=6, help="Milestones per project")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["BUILDCLI_DB_PATH"] = os.path.join(tmp, "bench.db")
+    sys.path.insert(0, SRC)
+    from construction_cli.utils.database import engine, init_db, get_session
+    from construction_cli.services.project_service import ProjectService
+
+    init_db()
+    random.seed(1)
+    seed(engine, args.projects, args.phases, args.milestones)
+    print(f"{args.projects:,} projects x ({args.phases} phases + {args.milestones} milestones)")
+
+    service = ProjectService()
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        rows = service.dashboard_rows()
+        timings.append(time.perf_counter() - start)
+    print(f"dashboard query   {len(rows):>6,} rows  median {statistics.median(timings) * 1000:7.0f} ms")
+
+    session = get_session()
+    try:
+        start = time.perf_counter()
+        per_project(session, range(1, args.projects + 1))
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+    print(f"per-project loop  {args.projects:>6,} rows  total  {elapsed * 1000:7.0f} ms"
+          f"  (3 queries per project, one process)")
+
+if __name__ == "__main__":
+    main()
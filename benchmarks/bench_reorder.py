@@ -0,0 +1,77 @@
+"""Reorder suggestions over a large catalogue.
+
+Seeds a scratch SQLite file with materials, stock, pending and delivered
+orders and issue history, then times ReorderService.suggest:
+
+    python benchmarks/bench_reorder.py --materials 50000 --issues 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def seed(engine, materials, issues, orders):
+    now = datetime.now()
+    stamp = lambda days: (now - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S.%f")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO suppliers (id, name) VALUES (1, 'Bench Supply')")
+        conn.exec_driver_sql(
+            "INSERT INTO materials (id, name, unit, cost_per_unit, supplier_id) VALUES (?, ?, 'piece', 5, 1)",
+            [(i, f"Material {i}") for i in range(1, materials + 1)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO inventory (material_id, quantity, location) VALUES (?, ?, 'warehouse')",
+            [(i, random.uniform(0, 200)) for i in range(1, materials + 1)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO stock_movements (material_id, kind, quantity, location, moved_at) "
+            "VALUES (?, 'issue', ?, 'warehouse', ?)",
+            [(random.randint(1, materials), -random.uniform(1, 10), stamp(random.uniform(0, 120)))
+             for _ in range(issues)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO orders (material_id, supplier_id, quantity, order_date, delivery_date, status) "
+            "VALUES (?, 1, 50, ?, ?, ?)",
+            [(random.randint(1, materials), date(2024, 1, 1).isoformat(),
+              (date(2024, 1, 1) + timedelta(days=random.randint(2, 21))).isoformat(),
+              random.choice(("pending", "delivered"))) for _ in range(orders)],
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--materials", type=int, default=50000)
+    parser.add_argument("--issues", type=int, default=100000, help="Issue movements spread over 120 days")
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["BUILDCLI_DB_PATH"] = os.path.join(tmp, "bench.db")
+    sys.path.insert(0, SRC)
+    from construction_cli.utils.database import engine, init_db
+    from construction_cli.services.reorder import ReorderService
+
+    init_db()
+    random.seed(1)
+    start = time.perf_counter()
+    seed(engine, args.materials, args.issues, args.orders)
+    print(f"seeded {args.materials:,} materials, {args.issues:,} issues, {args.orders:,} orders"
+          f" in {time.perf_counter() - start:.1f}s")
+
+    service = ReorderService()
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        rows = service.suggest()
+        timings.append(time.perf_counter() - start)
+    print(f"suggest: {len(rows):,} materials due"
+          f"  min {min(timings) * 1000:.0f} ms  median {statistics.median(timings) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
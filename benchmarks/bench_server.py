@@ -0,0 +1,101 @@
+"""Request throughput benchmark for `buildcli serve`.
+
+Seeds a scratch SQLite file, starts the API server in a child process and
+drives it with keep-alive connections from an asyncio client:
+
+    python benchmarks/bench_server.py --requests 5000 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+PATHS = ["/api/projects", "/api/materials", "/api/suppliers", "/api/inventory", "/api/projects/1/phases"]
+
+SEED = """
+from construction_cli.services.material_service import MaterialService
+from construction_cli.services.project_service import ProjectService
+materials, projects = MaterialService(), ProjectService()
+for i in range({n}):
+    materials.add_material(f"Material {{i}}", "piece", 1.5 + i, f"Supplier {{i % 10}}")
+    materials.update_stock(i + 1, i % 20)
+for i in range({n} // 4 or 1):
+    project = projects.create_project(f"Project {{i}}", 1000.0 * i)
+    projects.add_phase("Foundation", project.id, 10)
+"""
+
+async def client(host, port, paths, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length"))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+async def drive(host, port, total, concurrency):
+    per_client = total // concurrency
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, [PATHS[(c + i) % len(PATHS)] for i in range(per_client)], latencies)
+        for c in range(concurrency)
+    ))
+    return time.perf_counter() - start, latencies
+
+async def wait_for(host, port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=200, help="Materials to seed")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    host = "127.0.0.1"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=SRC, BUILDCLI_DB_PATH=os.path.join(tmp, "bench.db"))
+        subprocess.run([sys.executable, "-c", SEED.format(n=args.rows)], env=env, check=True)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "construction_cli.main", "serve", "--port", str(args.port),
+             "--workers", str(args.workers)],
+            env=env, stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(wait_for(host, args.port))
+            elapsed, latencies = asyncio.run(drive(host, args.port, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print(f"requests     {len(latencies)}")
+    print(f"concurrency  {args.concurrency} clients, {args.workers} workers")
+    print(f"throughput   {len(latencies) / elapsed:,.0f} req/s")
+    print(f"latency p50  {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"latency p99  {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
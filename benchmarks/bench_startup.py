@@ -0,0 +1,64 @@
+"""Startup latency benchmark for buildcli.
+
+Runs each scenario in a fresh interpreter against a scratch database and
+reports the median and best wall time:
+
+    python benchmarks/bench_startup.py --runs 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+SCENARIOS = [
+    ("import main", "import construction_cli.main"),
+    ("--help", "from construction_cli.main import buildcli\nbuildcli(['--help'])"),
+    ("project-list --help", "from construction_cli.main import buildcli\nbuildcli(['project-list', '--help'])"),
+    ("first query (project-list)", "from construction_cli.main import buildcli\nbuildcli(['project-list'])"),
+    ("first query (materials-orders)", "from construction_cli.main import buildcli\nbuildcli(['materials-orders'])"),
+]
+
+CHECK_HELP = """
+import sys
+from construction_cli.main import buildcli
+try:
+    buildcli(['--help'])
+except SystemExit:
+    pass
+print(any(name.startswith('sqlalchemy') for name in sys.modules))
+"""
+
+def run(code, env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=SRC, BUILDCLI_DB_PATH=os.path.join(tmp, "bench.db"))
+        # Create the schema once so the timed runs measure the warm path
+        run("from construction_cli.main import buildcli\nbuildcli(['project-list'])", env)
+
+        baseline = [run("pass", env) for _ in range(args.runs)]
+        print(f"{'interpreter only':32} median {statistics.median(baseline) * 1000:7.1f} ms")
+        for name, code in SCENARIOS:
+            times = [run(code, env) for _ in range(args.runs)]
+            print(f"{name:32} median {statistics.median(times) * 1000:7.1f} ms"
+                  f"  best {min(times) * 1000:7.1f} ms")
+
+        out = subprocess.run([sys.executable, "-c", CHECK_HELP], env=env, check=True,
+                             capture_output=True, text=True).stdout.strip().splitlines()[-1]
+        print(f"--help imports SQLAlchemy: {out}")
+
+if __name__ == "__main__":
+    main()
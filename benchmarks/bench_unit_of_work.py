@@ -0,0 +1,62 @@
+"""Per-call services versus one unit of work.
+
+Creates projects with phases and milestones both ways against a scratch
+SQLite file and reports time, sessions and commits per project:
+
+    python benchmarks/bench_unit_of_work.py --projects 50 --children 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--children", type=int, default=10, help="Phases and milestones per project")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["BUILDCLI_DB_PATH"] = os.path.join(tmp, "bench.db")
+    sys.path.insert(0, SRC)
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from construction_cli.utils.database import engine, init_db
+    from construction_cli.services.project_service import ProjectService
+    from construction_cli.services.unit_of_work import unit_of_work
+
+    counts = {"sessions": 0, "commits": 0}
+    event.listen(Session, "after_begin", lambda *a: counts.__setitem__("sessions", counts["sessions"] + 1))
+    event.listen(engine, "commit", lambda *a: counts.__setitem__("commits", counts["commits"] + 1))
+    init_db()
+
+    def per_call():
+        service = ProjectService()
+        project = service.create_project("Per-call project", 100000)
+        for i in range(args.children):
+            service.add_phase(f"Phase {i}", project.id, 10)
+            service.add_milestone(f"Milestone {i}", project.id, "2030-01-01")
+
+    def batched():
+        with unit_of_work() as uow:
+            project = uow.projects.create_project("Batched project", 100000)
+            for i in range(args.children):
+                uow.projects.add_phase(f"Phase {i}", project.id, 10)
+                uow.projects.add_milestone(f"Milestone {i}", project.id, "2030-01-01")
+
+    print(f"{args.projects} projects x ({args.children} phases + {args.children} milestones)")
+    for name, func in (("per-call", per_call), ("unit of work", batched)):
+        counts.update(sessions=0, commits=0)
+        start = time.perf_counter()
+        for _ in range(args.projects):
+            func()
+        elapsed = time.perf_counter() - start
+        print(f"{name:13} {elapsed * 1000 / args.projects:8.2f} ms/project"
+              f"  {counts['sessions'] / args.projects:5.1f} sessions"
+              f"  {counts['commits'] / args.projects:5.1f} commits")
+
+if __name__ == "__main__":
+    main()
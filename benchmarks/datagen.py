@@ -0,0 +1,168 @@
+"""Seeded synthetic data for benchmarks.
+
+Fills a scratch SQLite database with projects, phases, dependencies,
+milestones, suppliers, materials, inventory, stock movements and orders.
+Row counts scale with the number of projects and the same seed always
+produces the same rows:
+
+    python benchmarks/datagen.py /tmp/bench.db --scale medium --seed 1
+    python benchmarks/datagen.py /tmp/bench.db --projects 2500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Scale points shared with the benchmark suite, as a number of projects
+SCALES = {"small": 100, "medium": 1000, "large": 10000}
+
+LOCATIONS = ("warehouse", "yard", "site-a", "site-b", "site-c")
+UNITS = ("ton", "piece", "cubic-yard", "m3", "bag", "sheet", "linear-ft")
+PHASES = ("Site prep", "Foundation", "Framing", "Roofing", "Electrical", "Plumbing", "Finishing")
+STATUSES = ("active", "active", "active", "on_hold", "completed")
+WORDS = ("acme", "summit", "granite", "pioneer", "harbor", "delta", "apex", "northern", "coastal", "metro",
+         "river", "union", "eagle", "atlas", "prime", "valley", "cedar", "iron", "stone", "bridge")
+MATERIALS = ("Concrete", "Rebar", "Lumber", "Drywall", "Cement", "Gravel", "Sand", "Brick", "Insulation",
+             "Shingles", "Pipe", "Wire", "Glass", "Steel Beam", "Plywood", "Tile", "Paint", "Nails")
+
+def counts(projects):
+    """Row counts for a given number of projects"""
+    return {
+        "projects": projects,
+        "phases": projects * 5,
+        "milestones": projects * 3,
+        "suppliers": max(10, projects // 5),
+        "materials": projects * 5,
+        "orders": projects * 20,
+        "issues": projects * 20,
+    }
+
+def _day(value):
+    return value.isoformat()
+
+def _stamp(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+def generate(engine, projects, seed=0):
+    """Insert a deterministic data set sized by `projects`; returns the row counts"""
+    rng = random.Random(seed)
+    n = counts(projects)
+    today = date.today()
+    now = datetime.now()
+
+    suppliers = []
+    for i in range(1, n["suppliers"] + 1):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} Supply {i}"
+        suppliers.append((i, name, name.lower(), f"orders{i}@example.com"))
+
+    materials = []
+    for i in range(1, n["materials"] + 1):
+        name = f"{rng.choice(MATERIALS)} {rng.choice(WORDS)} #{i}"
+        materials.append((i, name, rng.choice(UNITS), round(rng.uniform(1, 500), 2), rng.randint(1, n["suppliers"])))
+
+    inventory = []
+    receipts = []
+    for material_id in range(1, n["materials"] + 1):
+        for location in rng.sample(LOCATIONS, rng.choice((1, 1, 2))):
+            quantity = round(rng.uniform(0, 400), 1)
+            inventory.append((material_id, quantity, location))
+            receipts.append((material_id, "receipt", quantity, location, _stamp(now - timedelta(days=150)), "seed"))
+    issues = [
+        (rng.randint(1, n["materials"]), "issue", -round(rng.uniform(1, 20), 1), "warehouse",
+         _stamp(now - timedelta(days=rng.uniform(0, 120))), None)
+        for _ in range(n["issues"])
+    ]
+
+    project_rows = []
+    phase_rows = []
+    dependencies = []
+    milestone_rows = []
+    phase_id = milestone_id = 0
+    project_phases = {}
+    for project_id in range(1, projects + 1):
+        start = today - timedelta(days=rng.randint(0, 400))
+        project_rows.append((project_id, f"Project {project_id}", f"{rng.choice(WORDS).title()} District",
+                             round(rng.uniform(1e5, 1e7), 2), _day(start),
+                             _day(start + timedelta(days=rng.randint(90, 900))), rng.choice(STATUSES)))
+        offset = 0
+        ids = []
+        for name in PHASES[:5]:
+            phase_id += 1
+            duration = rng.randint(3, 40)
+            phase_rows.append((phase_id, project_id, name, duration, _day(start + timedelta(days=offset)),
+                               offset, rng.choice(("planned", "in_progress", "completed"))))
+            if ids:
+                dependencies.append((phase_id, ids[-1]))
+            ids.append(phase_id)
+            offset += duration
+        project_phases[project_id] = ids
+        for k in range(3):
+            milestone_id += 1
+            target = start + timedelta(days=rng.randint(10, 600))
+            done = target < today and rng.random() < 0.6
+            milestone_rows.append((milestone_id, project_id, f"Milestone {k + 1}", _day(target),
+                                   _day(target) if done else None, "completed" if done else "pending"))
+
+    orders = []
+    for order_id in range(1, n["orders"] + 1):
+        material = materials[rng.randrange(len(materials))]
+        project_id = rng.randint(1, projects) if rng.random() < 0.7 else None
+        quantity = rng.randint(1, 200)
+        ordered = today - timedelta(days=rng.randint(0, 700))
+        orders.append((order_id, material[0], material[4], project_id,
+                       rng.choice(project_phases[project_id]) if project_id else None,
+                       quantity, material[3], round(quantity * material[3], 2), _day(ordered),
+                       _day(ordered + timedelta(days=rng.randint(2, 21))),
+                       rng.choice(("pending", "delivered", "delivered", "delivered"))))
+
+    with engine.begin() as conn:
+        run = conn.exec_driver_sql
+        run("INSERT INTO suppliers (id, name, normalized_name, contact) VALUES (?, ?, ?, ?)", suppliers)
+        run("INSERT INTO materials (id, name, unit, cost_per_unit, supplier_id) VALUES (?, ?, ?, ?, ?)", materials)
+        run("INSERT INTO inventory (material_id, quantity, location) VALUES (?, ?, ?)", inventory)
+        run("INSERT INTO stock_movements (material_id, kind, quantity, location, moved_at, reference) "
+            "VALUES (?, ?, ?, ?, ?, ?)", receipts + issues)
+        run("INSERT INTO projects (id, name, location, budget, start_date, end_date, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", project_rows)
+        run("INSERT INTO phases (id, project_id, name, duration, start_date, early_start, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", phase_rows)
+        run("INSERT INTO phase_dependencies (phase_id, predecessor_id) VALUES (?, ?)", dependencies)
+        run("INSERT INTO milestones (id, project_id, name, target_date, completion_date, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)", milestone_rows)
+        run("INSERT INTO orders (id, material_id, supplier_id, project_id, phase_id, quantity, unit_cost, "
+            "total_cost, order_date, delivery_date, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", orders)
+        run("INSERT INTO project_costs (project_id, committed, orders) "
+            "SELECT project_id, coalesce(sum(total_cost), 0), count(id) FROM orders "
+            "WHERE project_id IS NOT NULL GROUP BY project_id")
+    return {
+        "projects": len(project_rows), "phases": len(phase_rows), "milestones": len(milestone_rows),
+        "suppliers": len(suppliers), "materials": len(materials), "inventory": len(inventory),
+        "movements": len(receipts) + len(issues), "orders": len(orders),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="SQLite file to create (must not exist)")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--projects", type=int, help="Override the scale with an exact project count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    os.environ["BUILDCLI_DB_PATH"] = os.path.abspath(args.path)
+    sys.path.insert(0, SRC)
+    from construction_cli.utils.database import engine, init_db
+
+    init_db()
+    start = time.perf_counter()
+    rows = generate(engine, args.projects or SCALES[args.scale], args.seed)
+    print(", ".join(f"{count:,} {table}" for table, count in rows.items()))
+    print(f"generated in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
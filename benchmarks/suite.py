@@ -0,0 +1,313 @@
+"""Benchmark suite for services and CLI commands at several data sizes.
+
+Each scale point runs in its own interpreter against a fresh database
+from datagen.py. Every ProjectService/MaterialService method and every
+CLI command (through Click's test runner) is timed; results can be saved
+as a JSON baseline and later runs compared against it:
+
+    python benchmarks/suite.py --scales small,medium --save baseline.json
+    python benchmarks/suite.py --scales small,medium --compare baseline.json
+
+Comparison exits with status 1 when a case's median slows down by more
+than --threshold (and by more than --min-delta ms, to ignore noise).
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(HERE), "src")
+
+# Commands that start servers or read a terminal are not timed
+SKIP_COMMANDS = {"shell", "serve"}
+
+def service_cases(ids):
+    """(name, callable) pairs covering every public service method"""
+    from construction_cli.services.material_service import MaterialService
+    from construction_cli.services.project_service import ProjectService
+    from construction_cli.services.schedule_service import ScheduleService
+    from construction_cli.services.search_service import SearchService
+
+    ps = ProjectService()
+    ms = MaterialService()
+    project, material = ids["project"], ids["material"]
+    counter = iter(range(10 ** 9))
+    new_rows = lambda n: [(i, {"name": f"Bench material {next(counter)}", "unit": "ton", "cost_per_unit": "4",
+                               "supplier": "Bench Supplies", "quantity": "10"}) for i in range(n)]
+    order_rows = lambda n: [(i, {"material_id": material, "quantity": 5, "project_id": project}) for i in range(n)]
+
+    def add_and_delete_material():
+        ms.delete_material(ms.add_material(f"Scratch {next(counter)}", "ton", 1.0).id)
+
+    def add_and_merge_suppliers():
+        keep = ms.add_supplier(f"Merge keep {next(counter)}")
+        duplicate = ms.add_supplier(f"Merge duplicate {next(counter)}")
+        ms.merge_suppliers(keep.id, [duplicate.id])
+
+    return [
+        ("ProjectService.create_project", lambda: ps.create_project(f"Bench {next(counter)}", 1e6)),
+        ("ProjectService.list_projects", lambda: ps.list_projects(limit=500)),
+        ("ProjectService.get_project", lambda: ps.get_project(project)),
+        ("ProjectService.get_project_name", lambda: ps.get_project_name(project)),
+        ("ProjectService.project_rows", lambda: ps.project_rows()),
+        ("ProjectService.iter_project_rows", lambda: list(ps.iter_project_rows())),
+        ("ProjectService.phase_rows", lambda: ps.phase_rows(project)),
+        ("ProjectService.milestone_rows", lambda: ps.milestone_rows(project)),
+        ("ProjectService.dashboard_rows", lambda: ps.dashboard_rows()),
+        ("ProjectService.iter_dashboard_rows", lambda: list(ps.iter_dashboard_rows())),
+        ("ProjectService.cost_rows", lambda: ps.cost_rows()),
+        ("ProjectService.iter_cost_rows", lambda: list(ps.iter_cost_rows())),
+        ("ProjectService.cost_breakdown", lambda: ps.cost_breakdown(project)),
+        ("ProjectService.rebuild_costs", lambda: ps.rebuild_costs()),
+        ("ProjectService.update_project", lambda: ps.update_project(project, location="Bench District")),
+        ("ProjectService.add_phase", lambda: ps.add_phase("Bench phase", project, 3)),
+        ("ProjectService.list_phases", lambda: ps.list_phases(project)),
+        ("ProjectService.add_milestone", lambda: ps.add_milestone("Bench milestone", project)),
+        ("ProjectService.list_milestones", lambda: ps.list_milestones(project)),
+        ("ProjectService.complete_milestone", lambda: ps.complete_milestone(ids["milestone"])),
+        ("MaterialService.add_material", lambda: ms.add_material(f"Bench {next(counter)}", "ton", 2.5, "Bench Supplies")),
+        ("MaterialService.import_materials", lambda: ms.import_materials(new_rows(500))),
+        ("MaterialService.list_materials", lambda: ms.list_materials(limit=500)),
+        ("MaterialService.add_supplier", lambda: ms.add_supplier(f"Bench supplier {next(counter)}")),
+        ("MaterialService.match_suppliers", lambda: ms.match_suppliers("Acme Summit Supply")),
+        ("MaterialService.duplicate_suppliers", lambda: ms.duplicate_suppliers()),
+        ("MaterialService.merge_suppliers", add_and_merge_suppliers),
+        ("MaterialService.list_suppliers", lambda: ms.list_suppliers(limit=500)),
+        ("MaterialService.update_stock", lambda: ms.update_stock(material, 100)),
+        ("MaterialService.record_movement", lambda: ms.record_movement(material, "receipt", 5)),
+        ("MaterialService.stock_at", lambda: ms.stock_at(material, datetime.now())),
+        ("MaterialService.create_order", lambda: ms.create_order(material, 10, project_id=project)),
+        ("MaterialService.create_orders", lambda: ms.create_orders(order_rows(500))),
+        ("MaterialService.material_rows", lambda: ms.material_rows()),
+        ("MaterialService.supplier_rows", lambda: ms.supplier_rows()),
+        ("MaterialService.inventory_rows", lambda: ms.inventory_rows()),
+        ("MaterialService.material_stock_rows", lambda: ms.material_stock_rows()),
+        ("MaterialService.location_stock_rows", lambda: ms.location_stock_rows()),
+        ("MaterialService.order_rows", lambda: ms.order_rows()),
+        ("MaterialService.iter_material_rows", lambda: list(ms.iter_material_rows())),
+        ("MaterialService.iter_supplier_rows", lambda: list(ms.iter_supplier_rows())),
+        ("MaterialService.iter_inventory_rows", lambda: list(ms.iter_inventory_rows())),
+        ("MaterialService.iter_material_stock_rows", lambda: list(ms.iter_material_stock_rows())),
+        ("MaterialService.iter_location_stock_rows", lambda: list(ms.iter_location_stock_rows())),
+        ("MaterialService.iter_order_rows", lambda: list(ms.iter_order_rows())),
+        ("MaterialService.iter_movement_rows", lambda: list(ms.iter_movement_rows(material))),
+        ("MaterialService.delete_material", add_and_delete_material),
+        ("ScheduleService.schedule", lambda: ScheduleService().schedule(project)),
+        ("ScheduleService.set_duration", lambda: ScheduleService().set_duration(ids["phase"], 7)),
+        ("SearchService.search", lambda: SearchService().search(["conc"])),
+    ]
+
+def cli_cases(ids, import_file):
+    """(name, args, input) for every CLI command; input may be a callable for fresh values"""
+    counter = iter(range(10 ** 9))
+    project, material, supplier = str(ids["project"]), str(ids["material"]), str(ids["supplier"])
+    phase, other_phase = str(ids["phase"]), str(ids["phase"] + 3)
+    return [
+        ("project create", ["project", "create"], "Bench CLI\n250000\n2024-01-01\nDowntown\n"),
+        ("project list", ["project", "list"], None),
+        ("project status", ["project", "status", "--project-id", project], None),
+        ("project update", ["project", "update", "--project-id", project, "--budget", "2000000"], None),
+        ("project phases add", ["project", "phases", "add"], f"{project}\nBench phase\n5\n"),
+        ("project phases list", ["project", "phases", "list", "--project-id", project], None),
+        ("project phases depend", ["project", "phases", "depend", "--phase-id", other_phase, "--after", phase], None),
+        ("project phases undepend", ["project", "phases", "undepend", "--phase-id", other_phase, "--after", phase],
+         None),
+        ("project phases duration", ["project", "phases", "duration", "--phase-id", phase, "--days", "6"], None),
+        ("project milestones add", ["project", "milestones", "add"], f"{project}\nBench milestone\n2030-01-01\n"),
+        ("project milestones list", ["project", "milestones", "list", "--project-id", project], None),
+        ("project milestones complete", ["project", "milestones", "complete", "--milestone-id", str(ids["milestone"])],
+         None),
+        ("project dashboard", ["project", "dashboard"], None),
+        ("project costs", ["project", "costs"], None),
+        ("project schedule", ["project", "schedule", "--project-id", project], None),
+        ("materials add", ["materials", "add"], "Bench CLI material\nton\n3.5\n\n"),
+        ("materials import", ["materials", "import", import_file], None),
+        ("materials list", ["materials", "list"], None),
+        ("materials inventory", ["materials", "inventory"], None),
+        ("materials stock", ["materials", "stock"], f"{material}\n120\nwarehouse\n"),
+        ("materials move", ["materials", "move", "receipt", "--material-id", material, "--quantity", "5"], None),
+        ("materials movements", ["materials", "movements", "--material-id", material], None),
+        ("materials stock-at", ["materials", "stock-at", "--material-id", material], None),
+        ("materials reorder", ["materials", "reorder"], None),
+        ("materials order", ["materials", "order"], f"{material}\n10\n{supplier}\n\n"),
+        ("materials orders", ["materials", "orders"], None),
+        ("materials delete", ["materials", "delete"], f"{ids['last_material']}\nn\n"),
+        ("materials suppliers add", ["materials", "suppliers", "add"],
+         lambda: f"Bench CLI Supplies {next(counter)}\n\ny\n"),
+        ("materials suppliers list", ["materials", "suppliers", "list"], None),
+        ("materials suppliers dedupe", ["materials", "suppliers", "dedupe", "--dry-run"], None),
+        ("search", ["search", "concrete"], None),
+        ("archive", ["archive", "--dry-run"], None),
+        ("db version", ["db", "version"], None),
+        ("db upgrade", ["db", "upgrade"], None),
+        ("db explain", ["db", "explain"], None),
+        ("db reindex", ["db", "reindex"], None),
+        ("db backup", ["db", "backup"], None),
+        ("db restore", ["db", "restore", "--list"], None),
+    ]
+
+def _leaf_commands(group, ctx, path=(), seen=None):
+    import click
+    seen = set() if seen is None else seen
+    for name in group.list_commands(ctx):
+        command = group.get_command(ctx, name)
+        # Top-level aliases (project-list, suppliers, ...) repeat nested commands
+        if id(command) in seen:
+            continue
+        seen.add(id(command))
+        if isinstance(command, click.Group):
+            yield from _leaf_commands(command, ctx, path + (name,), seen)
+        else:
+            yield " ".join(path + (name,))
+
+def _time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+def run_scale(projects, repeat, seed, selected):
+    """Worker: generate data, time every case and return the results"""
+    import click
+    from click.testing import CliRunner
+    from datagen import generate
+    from construction_cli.main import buildcli
+    from construction_cli.services.material_service import MaterialService
+    from construction_cli.services.project_service import ProjectService
+    from construction_cli.utils.database import engine, init_db
+
+    init_db()
+    rows = generate(engine, projects, seed)
+    ids = {"project": 1, "material": 1, "supplier": 1, "milestone": 1, "phase": 1,
+           "last_material": rows["materials"]}
+    import_file = os.path.join(os.path.dirname(os.environ["BUILDCLI_DB_PATH"]), "import.csv")
+    with open(import_file, "w") as f:
+        f.write("name,unit,cost_per_unit,supplier,quantity,location\n")
+        f.writelines(f"CLI import {i},bag,9.5,Import Supplies,20,yard\n" for i in range(200))
+
+    results = {}
+    warnings = []
+
+    services = service_cases(ids)
+    for service in (ProjectService, MaterialService):
+        public = {f"{service.__name__}.{name}" for name, member in inspect.getmembers(service, inspect.isfunction)
+                  if not name.startswith("_") and member.__qualname__.startswith(service.__name__)}
+        missing = public - {name for name, _ in services}
+        if missing:
+            warnings.append(f"not benchmarked: {', '.join(sorted(missing))}")
+
+    for name, func in services:
+        if not selected or selected in name:
+            results[name] = _time(func, repeat)
+
+    runner = CliRunner()
+    commands = cli_cases(ids, import_file)
+    covered = {name for name, _, _ in commands}
+    ctx = click.Context(buildcli)
+    missing = set(_leaf_commands(buildcli, ctx)) - covered - SKIP_COMMANDS
+    if missing:
+        warnings.append(f"not benchmarked: {', '.join(sorted(missing))}")
+
+    for name, args, text in commands:
+        key = f"cli {name}"
+        if selected and selected not in key:
+            continue
+        failures = []
+
+        def invoke():
+            result = runner.invoke(buildcli, args, input=text() if callable(text) else text)
+            if result.exit_code:
+                failures.append(result.output.strip().splitlines()[-1:] or [repr(result.exception)])
+
+        results[key] = _time(invoke, repeat)
+        if failures:
+            warnings.append(f"{key} exited with an error: {failures[0][0]}")
+    return {"counts": rows, "results": results, "warnings": warnings}
+
+def compare(baseline, current, threshold, min_delta):
+    """Print per-case changes; return the number of regressions"""
+    regressions = 0
+    for scale, data in current["scales"].items():
+        before = baseline.get("scales", {}).get(scale)
+        if not before:
+            print(f"[{scale}] not in baseline")
+            continue
+        print(f"[{scale}]")
+        for name, timing in data["results"].items():
+            old = before["results"].get(name)
+            if not old:
+                print(f"  {name:48} {timing['median'] * 1000:9.2f} ms  (new)")
+                continue
+            ratio = timing["median"] / old["median"] if old["median"] else 1.0
+            slower = ratio > 1 + threshold and (timing["median"] - old["median"]) * 1000 > min_delta
+            regressions += slower
+            flag = "REGRESSION" if slower else "faster" if ratio < 1 - threshold else ""
+            print(f"  {name:48} {old['median'] * 1000:9.2f} -> {timing['median'] * 1000:9.2f} ms"
+                  f"  {ratio:5.2f}x  {flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="small", help="Comma-separated scale names or project counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is compared")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio")
+    parser.add_argument("--min-delta", type=float, default=2.0, help="Ignore slowdowns smaller than this (ms)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        sys.path[:0] = [SRC, HERE]
+        print(json.dumps(run_scale(args.worker, args.repeat, args.seed, args.filter)))
+        return
+
+    from datagen import SCALES
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scales": {},
+    }
+    for scale in args.scales.split(","):
+        projects = SCALES[scale] if scale in SCALES else int(scale)
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, BUILDCLI_DB_PATH=os.path.join(tmp, "bench.db"), BUILDCLI_FORMAT="table")
+            command = [sys.executable, os.path.abspath(__file__), "--worker", str(projects),
+                       "--repeat", str(args.repeat), "--seed", str(args.seed), "--filter", args.filter]
+            output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+        data = json.loads(output.strip().splitlines()[-1])
+        report["scales"][scale] = data
+        print(f"[{scale}] " + ", ".join(f"{count:,} {table}" for table, count in data["counts"].items()))
+        for warning in data["warnings"]:
+            print(f"  warning: {warning}", file=sys.stderr)
+        if not args.compare:
+            for name, timing in data["results"].items():
+                print(f"  {name:48} median {timing['median'] * 1000:9.2f} ms  min {timing['min'] * 1000:9.2f} ms")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold, args.min_delta)
+        print(f"{regressions} regression(s) over {args.threshold:.0%}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
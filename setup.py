@@ -7,8 +7,11 @@ setup(
     package_dir={"": "src"},
     install_requires=[
         "click>=8.0.0",
-        "sqlalchemy>=1.4.0",
+        "sqlalchemy>=1.4.40",
     ],
+    extras_require={
+        "analytics": ["numpy>=1.20"],
+    },
     entry_points={
         "console_scripts": [
             "buildcli=construction_cli.main:buildcli",
@@ -0,0 +1,222 @@
+import re
+from datetime import date, datetime
+from ..services.material_service import MaterialService, DuplicateSupplierError
+from ..services.project_service import ProjectService
+
+PROJECT_FIELDS = ("name", "budget", "status", "location", "start_date", "end_date")
+
+class ApiError(Exception):
+    """Error returned to the client as a JSON body with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def to_dict(obj):
+    """Serialize an ORM instance's column values"""
+    if obj is None:
+        return None
+    data = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+def _require(body, *names):
+    missing = [n for n in names if body.get(n) in (None, "")]
+    if missing:
+        raise ApiError(400, f"Missing field(s): {', '.join(missing)}")
+
+def _number(value, name, kind=float):
+    if value is None or value == "":
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be a number")
+
+def _date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be a YYYY-MM-DD date")
+
+def _page(query):
+    """Keyset paging parameters from ?limit=&after_id="""
+    return _number(query.get("limit"), "limit", int), _number(query.get("after_id"), "after_id", int)
+
+def _found(obj, what):
+    if obj is None:
+        raise ApiError(404, f"{what} not found")
+    return obj
+
+# Projects
+
+def list_projects(params, query, body):
+    return [to_dict(p) for p in ProjectService().list_projects(query.get("status"), *_page(query))]
+
+def get_project(params, query, body):
+    return to_dict(_found(ProjectService().get_project(int(params["id"])), "Project"))
+
+def create_project(params, query, body):
+    _require(body, "name")
+    _date(body.get("start_date"), "start_date")
+    project = ProjectService().create_project(
+        body["name"], _number(body.get("budget"), "budget"), body.get("start_date") or None, body.get("location"))
+    return 201, to_dict(project)
+
+def update_project(params, query, body):
+    changes = {k: body[k] for k in PROJECT_FIELDS if k in body}
+    if "budget" in changes:
+        changes["budget"] = _number(changes["budget"], "budget")
+    for key in ("start_date", "end_date"):
+        if key in changes:
+            changes[key] = _date(changes[key], key)
+    service = ProjectService()
+    _found(service.update_project(int(params["id"]), **changes) or None, "Project")
+    return to_dict(service.get_project(int(params["id"])))
+
+def list_phases(params, query, body):
+    return [to_dict(p) for p in ProjectService().list_phases(int(params["id"]))]
+
+def add_phase(params, query, body):
+    _require(body, "name")
+    phase = ProjectService().add_phase(body["name"], int(params["id"]), _number(body.get("duration"), "duration", int))
+    return 201, to_dict(_found(phase, "Project"))
+
+def list_milestones(params, query, body):
+    return [to_dict(m) for m in ProjectService().list_milestones(int(params["id"]))]
+
+def add_milestone(params, query, body):
+    _require(body, "name")
+    _date(body.get("target_date"), "target_date")
+    milestone = ProjectService().add_milestone(body["name"], int(params["id"]), body.get("target_date") or None)
+    return 201, to_dict(_found(milestone, "Project"))
+
+def complete_milestone(params, query, body):
+    return to_dict(_found(ProjectService().complete_milestone(int(params["id"])), "Milestone"))
+
+# Materials
+
+def list_materials(params, query, body):
+    return [to_dict(m) for m in MaterialService().list_materials(*_page(query))]
+
+def add_material(params, query, body):
+    _require(body, "name")
+    try:
+        material = MaterialService().add_material(
+            body["name"], body.get("unit"), _number(body.get("cost_per_unit"), "cost_per_unit"), body.get("supplier"))
+    except ValueError as e:
+        raise ApiError(400, str(e))
+    return 201, to_dict(material)
+
+def delete_material(params, query, body):
+    _found(MaterialService().delete_material(int(params["id"])) or None, "Material")
+    return {"deleted": int(params["id"])}
+
+def update_stock(params, query, body):
+    _require(body, "quantity")
+    inventory = MaterialService().update_stock(
+        int(params["id"]), _number(body["quantity"], "quantity"), body.get("location") or "warehouse")
+    return to_dict(_found(inventory, "Material"))
+
+def get_inventory(params, query, body):
+    threshold = _number(query.get("low_stock"), "low_stock")
+    return [row_dict(r) for r in MaterialService().material_stock_rows(threshold, *_page(query))]
+
+def get_inventory_sites(params, query, body):
+    threshold = _number(query.get("low_stock"), "low_stock")
+    return [row_dict(r) for r in MaterialService().inventory_rows(threshold, *_page(query))]
+
+def get_inventory_locations(params, query, body):
+    limit, _ = _page(query)
+    return [row_dict(r) for r in MaterialService().location_stock_rows(limit)]
+
+def list_suppliers(params, query, body):
+    return [to_dict(s) for s in MaterialService().list_suppliers(*_page(query))]
+
+def add_supplier(params, query, body):
+    _require(body, "name")
+    try:
+        return 201, to_dict(MaterialService().add_supplier(body["name"], body.get("contact")))
+    except DuplicateSupplierError as e:
+        raise ApiError(409, str(e))
+    except ValueError as e:
+        raise ApiError(400, str(e))
+
+def row_dict(row):
+    """Serialize a read-model row"""
+    return {k: v.isoformat() if isinstance(v, (date, datetime)) else v for k, v in row._asdict().items()}
+
+def list_orders(params, query, body):
+    since, until = _date(query.get("since"), "since"), _date(query.get("until"), "until")
+    return [row_dict(o) for o in MaterialService().order_rows(*_page(query), since=since, until=until)]
+
+def create_order(params, query, body):
+    _require(body, "material_id", "quantity")
+    order = MaterialService().create_order(
+        _number(body["material_id"], "material_id", int),
+        _number(body["quantity"], "quantity"),
+        _number(body.get("supplier_id"), "supplier_id", int),
+        _date(body.get("delivery_date"), "delivery_date"),
+        _number(body.get("project_id"), "project_id", int),
+        _number(body.get("phase_id"), "phase_id", int),
+    )
+    if order is None:
+        raise ApiError(422, "Unknown material, project or phase, or no supplier available")
+    return 201, to_dict(order)
+
+def create_orders(params, query, body):
+    _require(body, "orders")
+    if not isinstance(body["orders"], list):
+        raise ApiError(400, "orders must be a list")
+    records = enumerate(o if isinstance(o, dict) else None for o in body["orders"])
+    result = MaterialService().create_orders(records)
+    errors = [{"index": index, "error": message} for index, message in result.errors]
+    return 201 if result.orders else 422, {"created": result.orders, "errors": errors}
+
+def health(params, query, body):
+    return {"status": "ok"}
+
+ROUTES = [
+    ("GET", r"/api/health", health),
+    ("GET", r"/api/projects", list_projects),
+    ("POST", r"/api/projects", create_project),
+    ("GET", r"/api/projects/(?P<id>\d+)", get_project),
+    ("PATCH", r"/api/projects/(?P<id>\d+)", update_project),
+    ("GET", r"/api/projects/(?P<id>\d+)/phases", list_phases),
+    ("POST", r"/api/projects/(?P<id>\d+)/phases", add_phase),
+    ("GET", r"/api/projects/(?P<id>\d+)/milestones", list_milestones),
+    ("POST", r"/api/projects/(?P<id>\d+)/milestones", add_milestone),
+    ("POST", r"/api/milestones/(?P<id>\d+)/complete", complete_milestone),
+    ("GET", r"/api/materials", list_materials),
+    ("POST", r"/api/materials", add_material),
+    ("DELETE", r"/api/materials/(?P<id>\d+)", delete_material),
+    ("PUT", r"/api/materials/(?P<id>\d+)/stock", update_stock),
+    ("GET", r"/api/inventory", get_inventory),
+    ("GET", r"/api/inventory/sites", get_inventory_sites),
+    ("GET", r"/api/inventory/locations", get_inventory_locations),
+    ("GET", r"/api/suppliers", list_suppliers),
+    ("POST", r"/api/suppliers", add_supplier),
+    ("GET", r"/api/orders", list_orders),
+    ("POST", r"/api/orders", create_order),
+    ("POST", r"/api/orders/batch", create_orders),
+]
+
+_COMPILED = [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in ROUTES]
+
+def match(method, path):
+    """Return (handler, params) for a request, raising ApiError 404/405"""
+    allowed = False
+    for route_method, pattern, handler in _COMPILED:
+        found = pattern.match(path)
+        if found:
+            if route_method == method:
+                return handler, found.groupdict()
+            allowed = True
+    raise ApiError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
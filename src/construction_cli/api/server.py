@@ -0,0 +1,147 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+from . import routes
+
+MAX_BODY = 1024 * 1024
+
+# The React dev server; other origins must be allowed explicitly
+DEFAULT_ORIGINS = ("http://localhost:3000",)
+
+class BadRequest(Exception):
+    pass
+
+async def _read_request(reader):
+    """Parse one HTTP/1.1 request; return None when the client closed the connection"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise BadRequest("Request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise BadRequest("Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest("Invalid Content-Length")
+    if length > MAX_BODY:
+        raise BadRequest("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method.upper(), target, headers, body, keep_alive
+
+def _response(status, payload, keep_alive, origin=None):
+    """Encode a JSON response; CORS headers are only sent for an allowed origin"""
+    body = b"" if payload is None else json.dumps(payload).encode()
+    head = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+    ]
+    if origin:
+        head += [
+            f"Access-Control-Allow-Origin: {origin}",
+            "Access-Control-Allow-Methods: GET, POST, PUT, PATCH, DELETE, OPTIONS",
+            "Access-Control-Allow-Headers: Content-Type",
+            "Vary: Origin",
+        ]
+    head.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+    return ("\r\n".join(head) + "\r\n\r\n").encode() + body
+
+def dispatch(method, target, body):
+    """Run a request against the routes; blocking, called from a worker thread"""
+    url = urlsplit(target)
+    try:
+        handler, params = routes.match(method, url.path.rstrip("/") or "/")
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            raise routes.ApiError(400, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise routes.ApiError(400, "Body must be a JSON object")
+        result = handler(params, dict(parse_qsl(url.query)), data)
+    except routes.ApiError as e:
+        return e.status, {"error": e.message}
+    if isinstance(result, tuple):
+        return result
+    return 200, result
+
+class ApiServer:
+    """asyncio HTTP front end; service calls run on a thread pool sharing one engine"""
+
+    def __init__(self, host="127.0.0.1", port=8000, workers=4, allow_origins=DEFAULT_ORIGINS):
+        self.host = host
+        self.port = port
+        self.allow_origins = set(allow_origins)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="buildcli-api")
+        self.server = None
+
+    def cors_origin(self, headers):
+        """The Access-Control-Allow-Origin value for a request, or None to send no CORS headers"""
+        origin = headers.get("origin")
+        if "*" in self.allow_origins:
+            return "*"
+        return origin if origin in self.allow_origins else None
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except BadRequest as e:
+                    writer.write(_response(400, {"error": str(e)}, False))
+                    break
+                if request is None:
+                    break
+                method, target, headers, body, keep_alive = request
+                origin = self.cors_origin(headers)
+                if method == "OPTIONS":
+                    status, payload = 204, None
+                elif "origin" in headers and not origin and method != "GET":
+                    # Browsers send simple cross-site POSTs without a preflight;
+                    # refuse writes from pages that weren't allowed
+                    status, payload = 403, {"error": "Origin not allowed"}
+                else:
+                    try:
+                        status, payload = await loop.run_in_executor(self.executor, dispatch, method, target, body)
+                    except Exception as e:
+                        status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                writer.write(_response(status, payload, keep_alive, origin))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self, ready=None):
+        await self.start()
+        if ready:
+            ready(self)
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown(wait=True)
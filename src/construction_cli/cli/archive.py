@@ -0,0 +1,28 @@
+import click
+from datetime import date, timedelta
+
+@click.command()
+@click.option('--before', type=click.DateTime(["%Y-%m-%d"]),
+              help='Archive work dated before this day (default: --days ago)')
+@click.option('--days', type=click.IntRange(min=0), default=365, show_default=True,
+              help='Age cutoff in days when --before is not given')
+@click.option('--dry-run', is_flag=True, help='Only report what would be archived')
+def archive(before, days, dry_run):
+    """Move closed work out of the live database into compressed archive files
+
+    Completed projects (with their phases, milestones and dependencies)
+    whose end date is before the cutoff, and delivered orders placed before
+    it, are written to gzip-compressed columnar files partitioned by month
+    and deleted from the live tables. Reports given a --since/--until range
+    read them back.
+    """
+    from ..services.archive_service import ArchiveService
+    from ..utils.database import settings
+
+    cutoff = before.date() if before else date.today() - timedelta(days=days)
+    result = ArchiveService().archive(cutoff, dry_run=dry_run)
+    verb = "Would archive" if dry_run else "Archived"
+    click.echo(f"{verb} work dated before {cutoff}: {result.projects} projects, {result.phases} phases, "
+               f"{result.milestones} milestones, {result.dependencies} dependencies, {result.orders} orders")
+    if result.projects or result.orders:
+        click.echo(f"{result.partitions} partition file(s) in {settings.archive_dir}")
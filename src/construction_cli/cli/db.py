@@ -0,0 +1,147 @@
+import os
+import click
+
+@click.group()
+def db():
+    """Database maintenance commands"""
+    pass
+
+@db.command()
+@click.option('--to', 'target', type=int, help='Target schema version (default: latest)')
+def upgrade(target):
+    """Apply pending schema migrations"""
+    from ..utils.database import engine
+    from ..utils.migrations import upgrade as run_upgrade, current_version
+
+    with engine.begin() as conn:
+        applied = run_upgrade(conn, target)
+        version = current_version(conn)
+
+    if not applied:
+        click.echo(f"Schema is up to date (version {version})")
+        return
+    for number, description in applied:
+        click.echo(f"Applied {number}: {description}")
+    click.echo(f"Schema is now at version {version}")
+
+@db.command()
+def version():
+    """Show the schema version"""
+    from ..utils.database import engine
+    from ..utils.migrations import current_version, head_version
+
+    with engine.connect() as conn:
+        current = current_version(conn)
+    click.echo(f"Current version: {current if current is not None else 'unversioned'}")
+    click.echo(f"Latest version: {head_version()}")
+
+@db.command()
+def reindex():
+    """Rebuild the full-text search index"""
+    from ..services.search_service import SearchService
+    if not SearchService().reindex():
+        raise click.ClickException("No search index: run 'buildcli db upgrade' first")
+    click.echo("Search index rebuilt")
+
+@db.command()
+@click.option('--verbose', is_flag=True, help='Print the full plan for every query')
+def explain(verbose):
+    """Check query plans of service queries for full table scans"""
+    from sqlalchemy.exc import OperationalError
+    from ..utils.database import engine
+    from ..utils.query_plans import check_plans
+
+    problems = 0
+    with engine.connect() as conn:
+        try:
+            results = list(check_plans(conn))
+        except OperationalError as e:
+            raise click.ClickException(f"Cannot explain queries ({e.orig}). Run 'buildcli db upgrade' first.")
+        for name, plan, scans in results:
+            if scans:
+                problems += 1
+                click.echo(f"FULL SCAN  {name}: {', '.join(scans)}")
+            else:
+                click.echo(f"ok         {name}")
+            if verbose or scans:
+                for line in plan:
+                    click.echo(f"           {line}")
+
+    if problems:
+        click.echo(f"\n{problems} queries scan a whole table. Run 'buildcli db upgrade'.")
+        raise SystemExit(1)
+
+def _database_file():
+    from ..utils.database import settings
+    path = settings.file_path
+    if not path:
+        raise click.ClickException("Backups need a SQLite database file")
+    return path
+
+def _size(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+@db.command()
+@click.option('--full', is_flag=True, help='Store every page instead of only the pages changed since the last backup')
+def backup(full):
+    """Back up the database while it stays in use
+
+    Pages are copied with SQLite's online backup API in small steps, so
+    writers are only held up briefly. After the first full backup, each
+    backup stores just the pages that changed, with checksums.
+    """
+    from ..utils.backup import backup_set
+
+    path = _database_file()
+    if not os.path.exists(path):
+        raise click.ClickException(f"No database at {path}")
+    backups = backup_set()
+    entry = backups.backup(path, full=full)
+    click.echo(f"Backup {entry['number']} ({entry['kind']}): {entry['changed']} of {entry['pages']} pages, "
+               f"{_size(entry['size'])} written to {backups.root}")
+
+@db.command()
+@click.option('--at', type=click.DateTime(["%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S"]),
+              help='Restore the newest backup taken at or before this time (a bare date means its start)')
+@click.option('--number', type=int, help='Restore this backup number')
+@click.option('--to', 'target', type=click.Path(dir_okay=False), help='Write here instead of over the database')
+@click.option('--list', 'list_only', is_flag=True, help='List the available restore points and exit')
+@click.option('--yes', is_flag=True, help='Do not ask before replacing the database')
+def restore(at, number, target, list_only, yes):
+    """Restore the database as of a backup
+
+    Stop other buildcli processes before restoring over the live database.
+    """
+    from ..utils.backup import backup_set, BackupError
+
+    backups = backup_set()
+    if list_only:
+        entries = backups.backups()
+        if not entries:
+            click.echo("No backups found")
+        for entry in entries:
+            click.echo(f"{entry['number']}. {entry['created']} - {entry['kind']} - "
+                       f"{entry['changed']}/{entry['pages']} pages - {_size(entry['size'])}")
+        return
+    if at and number is not None:
+        raise click.UsageError("Use either --at or --number")
+
+    target = target or _database_file()
+    try:
+        chain = backups.chain(at, number)
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    final = chain[-1]
+    if os.path.exists(target) and not yes and not click.confirm(f"Replace {target} with backup {final['number']} from {final['created']}?"):
+        click.echo("Restore cancelled")
+        return
+    try:
+        backups.restore(target, at, number)
+    except (BackupError, OSError) as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Restored backup {final['number']} ({final['created']}) to {target} "
+               f"from {len(chain)} backup file(s)")
@@ -1,7 +1,6 @@
 import click
-from ..utils.database import init_db, get_session
-from ..services.material_service import MaterialService
-from ..models.material import Material, Supplier, Inventory, Order
+from ..utils.importing import FORMATS, iter_records
+from .paging import paging_options, date_range_options, as_date, echo_rows
 
 @click.group()
 def materials():
@@ -11,7 +10,7 @@ def materials():
 @materials.command()
 def add():
     """Add a new material"""
-    init_db()
+    from ..services.material_service import MaterialService
     
     click.echo("\n=== Add New Material ===")
     name = click.prompt("Material name")
@@ -28,7 +27,12 @@ def add():
     supplier = supplier if supplier.strip() else None
     
     service = MaterialService()
-    material = service.add_material(name, unit, cost_per_unit, supplier)
+    if supplier:
+        supplier = _pick_supplier(service, supplier)
+    try:
+        material = service.add_material(name, unit, cost_per_unit, supplier)
+    except ValueError as e:
+        raise click.ClickException(str(e))
     
     click.echo("\nMaterial added successfully!")
     click.echo(f"Name: {name}")
@@ -38,45 +42,118 @@ def add():
     if supplier:
         click.echo(f"Supplier: {supplier}")
 
+def _pick_supplier(service, name):
+    """Offer a near-identical existing supplier before a new one is created"""
+    matches = service.match_suppliers(name)
+    if not matches or matches[0].score == 1.0:
+        return name
+    for match in matches:
+        if click.confirm(f"Did you mean existing supplier '{match.name}' (ID {match.id})?", default=True):
+            return match.name
+    return name
+
+def _echo_errors(errors, label="line", err=False):
+    """Show the first rejected rows of a bulk operation"""
+    if not errors:
+        return
+    click.echo(f"Skipped {len(errors)} invalid rows:", err=err)
+    for line_no, message in errors[:20]:
+        click.echo(f"  {label} {line_no}: {message}", err=err)
+    if len(errors) > 20:
+        click.echo(f"  ... and {len(errors) - 20} more", err=err)
+
+@materials.command(name='import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--input-format', type=click.Choice(FORMATS), help='File format (default: from extension)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=500, show_default=True, help='Rows per transaction')
+@click.option('--suggest-suppliers', is_flag=True, help='List new suppliers whose names resemble existing ones')
+def import_materials(path, input_format, batch_size, suggest_suppliers):
+    """Bulk import materials, suppliers and stock from CSV/JSONL
+
+    Columns: name, unit, cost_per_unit, supplier, supplier_contact,
+    quantity, location.
+    """
+    from ..services.material_service import MaterialService
+    
+    def report(result):
+        click.echo(f"  {result.rows:,} rows processed ({result.rate:,.0f} rows/s)", err=True)
+    
+    service = MaterialService()
+    result = service.import_materials(iter_records(path, input_format), batch_size, report, suggest_suppliers)
+    
+    click.echo("\nImport complete!")
+    click.echo(f"Rows read: {result.rows:,}")
+    click.echo(f"Materials added: {result.materials:,}")
+    click.echo(f"Suppliers added: {result.suppliers:,}")
+    click.echo(f"Inventory rows added: {result.inventory:,}")
+    click.echo(f"Elapsed: {result.elapsed:.2f}s ({result.rate:,.0f} rows/s)")
+    _echo_errors(result.errors)
+    if result.similar_suppliers:
+        click.echo(f"\n{len(result.similar_suppliers)} new suppliers look like existing ones:")
+        for name, match in result.similar_suppliers[:20]:
+            click.echo(f"  '{name}' ~ '{match.name}' (ID {match.id}, {match.score:.0%})")
+        click.echo("Run 'buildcli suppliers dedupe' to merge them.")
+
 @materials.command()
-def list():
+@paging_options
+def list(limit, after_id):
     """List all materials"""
+    from ..services.material_service import MaterialService
+    from ..services.read_models import MaterialRow
     service = MaterialService()
-    materials = service.list_materials()
-    
-    if not materials:
-        click.echo("No materials found")
-        return
-    
-    click.echo("Materials List:")
-    for m in materials:
-        click.echo(f"{m.id}. {m.name} - {m.unit} - ${m.cost_per_unit:.2f}")
+    echo_rows(
+        service.iter_material_rows(limit, after_id),
+        "Materials List:", "No materials found",
+        lambda m: f"{m.id}. {m.name} - {m.unit} - ${m.cost_per_unit or 0:.2f}",
+        limit, MaterialRow._fields,
+    )
 
 @materials.command()
 @click.option('--low-stock', is_flag=True, help='Show only low stock items')
 @click.option('--threshold', type=float, default=10, help='Low stock threshold')
-def inventory(low_stock, threshold):
+@click.option('--by', 'view', type=click.Choice(['material', 'location', 'site']), default='material',
+              show_default=True, help='Totals per material, totals per location, or one row per material per site')
+@paging_options
+def inventory(low_stock, threshold, view, limit, after_id):
     """Show inventory status"""
+    from ..services.material_service import MaterialService
+    from ..services.read_models import InventoryRow, MaterialStockRow, LocationStockRow
     service = MaterialService()
-    results = service.get_inventory(threshold if low_stock else None)
-    
-    if not results:
-        click.echo("No inventory items found")
-        return
-    
-    click.echo("Inventory Status:")
-    for material, inventory in results:
-        qty = inventory.quantity if inventory else 0
-        location = inventory.location if inventory else "N/A"
-        click.echo(f"{material.name}: {qty} {material.unit} - Location: {location}")
+    threshold = threshold if low_stock else None
+    
+    if view == 'location':
+        if low_stock or after_id is not None:
+            raise click.UsageError("--low-stock and --after-id do not apply to --by location")
+        echo_rows(
+            service.iter_location_stock_rows(limit),
+            "Inventory by Location:", "No inventory items found",
+            lambda row: f"{row.location or 'N/A'}: {row.materials} materials - {row.quantity:g} units on hand",
+            None, LocationStockRow._fields,
+        )
+    elif view == 'site':
+        echo_rows(
+            service.iter_inventory_rows(threshold, limit, after_id),
+            "Inventory by Site:", "No inventory items found",
+            lambda row: f"{row.id}. {row.name}: {row.quantity or 0:g} {row.unit} - Location: {row.location or 'N/A'}",
+            limit, InventoryRow._fields,
+        )
+    else:
+        def line(row):
+            sites = f"{row.locations} location{'s' if row.locations != 1 else ''}" if row.locations else "N/A"
+            return f"{row.name}: {row.quantity:g} {row.unit} - Locations: {sites}"
+        
+        rows = service.iter_material_stock_rows(threshold, limit, after_id)
+        echo_rows(rows, "Inventory Status:", "No inventory items found", line, limit, MaterialStockRow._fields)
 
 @materials.command()
 def stock():
     """Update material stock quantity"""
+    from ..services import lookups
+    from ..services.material_service import MaterialService
     service = MaterialService()
     
     # Show available materials first
-    materials = service.list_materials()
+    materials = lookups.materials()
     if not materials:
         click.echo("No materials found. Add materials first.")
         return
@@ -116,21 +193,131 @@ def stock():
     else:
         click.echo("\nFailed to update stock")
 
+@materials.command()
+@click.argument('kind', type=click.Choice(["receipt", "issue", "adjustment", "transfer"]))
+@click.option('--material-id', type=int, required=True, help='Material to move')
+@click.option('--quantity', type=float, required=True, help='Amount moved (signed for adjustments)')
+@click.option('--location', default='warehouse', show_default=True, help='Location stock moves at or from')
+@click.option('--to-location', help='Destination of a transfer')
+@click.option('--reference', help='Delivery note, requisition or other reference')
+def move(kind, material_id, quantity, location, to_location, reference):
+    """Record a stock receipt, issue, adjustment or transfer"""
+    from ..services.material_service import MaterialService
+    service = MaterialService()
+    
+    try:
+        movements = service.record_movement(material_id, kind, quantity, location, to_location, reference)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if movements is None:
+        raise click.ClickException(f"Material {material_id} not found")
+    
+    click.echo(f"\nRecorded {kind} of {quantity:g} for material {material_id}")
+    for m in movements:
+        click.echo(f"  #{m.id}: {m.quantity:+g} at {m.location}")
+
+@materials.command()
+@click.option('--material-id', type=int, help='Only show movements of this material')
+@paging_options
+def movements(material_id, limit, after_id):
+    """Show the stock movement ledger"""
+    from ..services.material_service import MaterialService
+    from ..services.read_models import MovementRow
+    service = MaterialService()
+    
+    def line(m):
+        reference = f" ({m.reference})" if m.reference else ""
+        return (f"{m.id}. {m.moved_at:%Y-%m-%d %H:%M} {m.kind} {m.material_name}"
+                f" {m.quantity:+g} at {m.location or 'N/A'}{reference}")
+    
+    rows = service.iter_movement_rows(material_id, limit, after_id)
+    echo_rows(rows, "Stock Movements:", "No stock movements found", line, limit, MovementRow._fields)
+
+@materials.command(name='stock-at')
+@click.option('--material-id', type=int, required=True, help='Material to look up')
+@click.option('--date', 'at', type=click.DateTime(["%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S"]),
+              help='Point in time (a bare date means end of that day; default: now)')
+@click.option('--location', help='Only count stock held at this location')
+def stock_at(material_id, at, location):
+    """Show the quantity on hand at a past date"""
+    from datetime import datetime, time
+    from ..services.material_service import MaterialService
+    service = MaterialService()
+    
+    if at is None:
+        at = datetime.now()
+    elif at.time() == time.min:
+        at = datetime.combine(at.date(), time.max)
+    
+    quantity = service.stock_at(material_id, at, location)
+    if quantity is None:
+        raise click.ClickException(f"Material {material_id} not found")
+    where = f" at {location}" if location else ""
+    click.echo(f"Material {material_id} on hand{where} as of {at:%Y-%m-%d %H:%M}: {quantity:g}")
+
+@materials.command()
+@click.option('--days', type=click.IntRange(min=1), default=90, show_default=True,
+              help='Consumption history to average over')
+@click.option('--service-level', type=click.FloatRange(0.5, 0.999), default=0.95, show_default=True,
+              help='Chance of not running out before a reorder arrives')
+@click.option('--lead-time', type=click.FloatRange(min=0), default=7, show_default=True,
+              help='Days from order to delivery when a material has no order history')
+@click.option('--cover-days', type=click.FloatRange(min=0), default=14, show_default=True,
+              help='Days of demand each suggested order should cover')
+@click.option('--all', 'include_all', is_flag=True, help='Include materials that do not need reordering')
+@click.option('--create-orders', is_flag=True, help='Place the suggested orders with default suppliers')
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation before placing orders')
+def reorder(days, service_level, lead_time, cover_days, include_all, create_orders, yes):
+    """Suggest reorder points and quantities from stock and usage history"""
+    from ..services.reorder import ReorderService, ReorderRow
+    
+    try:
+        rows = ReorderService().suggest(days, service_level, lead_time, cover_days, include_all)
+    except ImportError as e:
+        raise click.ClickException(str(e))
+    
+    def line(r):
+        return (f"{r.material_id}. {r.name}: {r.on_hand:g} on hand + {r.on_order:g} on order {r.unit or ''}"
+                f" - uses {r.daily_usage:g}/day, lead {r.lead_time:g}d, reorder at {r.reorder_point:g}"
+                f" - order {r.suggested:g}")
+    
+    echo_rows(rows, "Reorder Suggestions:", "Nothing needs reordering", line, None, ReorderRow._fields)
+    
+    due = [r for r in rows if r.suggested]
+    if not create_orders or not due:
+        return
+    if not yes and not click.confirm(f"\nPlace {len(due)} orders?"):
+        click.echo("No orders placed.")
+        return
+    
+    result = ReorderService().create_orders(due)
+    click.echo(f"\nPlaced {result.orders} orders", err=True)
+    _echo_errors(result.errors, "material", err=True)
+
 @click.group()
 def suppliers():
     """Supplier management"""
     pass
 
-@suppliers.command()
-def add():
+@suppliers.command(name='add')
+def add_supplier():
     """Add a new supplier"""
+    from ..services.material_service import MaterialService
     click.echo("\n=== Add New Supplier ===")
     name = click.prompt("Supplier name")
     contact = click.prompt("Contact information (optional, press Enter to skip)", default="", show_default=False)
     contact = contact if contact.strip() else None
     
     service = MaterialService()
-    supplier = service.add_supplier(name, contact)
+    matches = service.match_suppliers(name)
+    if matches and matches[0].score < 1.0 and not click.confirm(
+            f"Similar supplier '{matches[0].name}' (ID {matches[0].id}) exists. Add anyway?"):
+        click.echo("\nSupplier not added.")
+        return
+    try:
+        supplier = service.add_supplier(name, contact)
+    except ValueError as e:
+        raise click.ClickException(str(e))
     
     click.echo("\nSupplier added successfully!")
     click.echo(f"Name: {name}")
@@ -138,29 +325,98 @@ def add():
     if contact:
         click.echo(f"Contact: {contact}")
 
-@suppliers.command()
-def list():
+@suppliers.command(name='list')
+@paging_options
+def list_suppliers(limit, after_id):
     """List all suppliers"""
+    from ..services.material_service import MaterialService
+    from ..services.read_models import SupplierRow
+    service = MaterialService()
+    echo_rows(
+        service.iter_supplier_rows(limit, after_id),
+        "Suppliers List:", "No suppliers found",
+        lambda s: f"{s.id}. {s.name} - {s.contact or 'N/A'}",
+        limit, SupplierRow._fields,
+    )
+
+@suppliers.command()
+@click.option('--threshold', type=click.FloatRange(0.5, 1.0), default=0.9, show_default=True,
+              help='Name similarity at which suppliers count as duplicates')
+@click.option('--dry-run', is_flag=True, help='Only list the duplicates')
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation before merging')
+def dedupe(threshold, dry_run, yes):
+    """Find suppliers with near-identical names and merge them
+
+    Each group keeps its oldest supplier; materials and orders of the others
+    are moved to it before they are deleted.
+    """
+    from ..services.material_service import MaterialService, DuplicateSupplierRow
     service = MaterialService()
-    suppliers = service.list_suppliers()
+    rows = service.duplicate_suppliers(threshold)
+    
+    def line(row):
+        action = "keep" if row.id == row.keep_id else f"merge into {row.keep_id}"
+        return (f"[{row.group}] {row.id}. {row.name} - {row.contact or 'N/A'}"
+                f" - {row.materials} materials, {row.orders} orders - {action}")
     
-    if not suppliers:
-        click.echo("No suppliers found")
+    echo_rows(rows, "Duplicate Suppliers:", "No duplicate suppliers found", line, None, DuplicateSupplierRow._fields)
+    
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.keep_id, []).append(row.id)
+    if dry_run or not groups:
+        return
+    if not yes and not click.confirm(f"\nMerge {len(groups)} groups?"):
+        click.echo("No suppliers merged.")
         return
     
-    click.echo("Suppliers List:")
-    for s in suppliers:
-        contact = s.contact or "N/A"
-        click.echo(f"{s.id}. {s.name} - {contact}")
+    materials_moved = orders_moved = 0
+    for keep_id, ids in groups.items():
+        moved = service.merge_suppliers(keep_id, ids)
+        materials_moved += moved[0]
+        orders_moved += moved[1]
+    removed = len(rows) - len(groups)
+    click.echo(f"\nMerged {removed} suppliers; moved {materials_moved} materials and {orders_moved} orders", err=True)
 
 @materials.command()
-def order():
-    """Create a material order"""
+@click.option('--from-file', 'path', type=click.Path(exists=True, dir_okay=False),
+              help='Create every order listed in a CSV/JSONL file in one transaction')
+@click.option('--input-format', type=click.Choice(FORMATS), help='File format (default: from extension)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=1000, show_default=True,
+              help='Orders validated per lookup')
+@click.option('--project-id', type=int, help='Charge the order(s) to this project')
+@click.option('--phase-id', type=int, help='Charge the order(s) to this project phase')
+def order(path, input_format, batch_size, project_id, phase_id):
+    """Create a material order
+
+    With --from-file, columns are material_id, quantity, supplier_id
+    (default: the material's supplier), delivery_date (YYYY-MM-DD) and
+    optional project_id/phase_id, which default to --project-id/--phase-id.
+    """
     from datetime import datetime
+    from ..services import lookups
+    from ..services.material_service import MaterialService
     service = MaterialService()
     
+    if path:
+        def allocated(records):
+            for line_no, record in records:
+                if record is not None:
+                    for key, default in (("project_id", project_id), ("phase_id", phase_id)):
+                        if record.get(key) in (None, ""):
+                            record[key] = default
+                yield line_no, record
+        
+        result = service.create_orders(allocated(iter_records(path, input_format)), batch_size)
+        click.echo("\nOrders submitted!")
+        click.echo(f"Rows read: {result.rows:,}")
+        click.echo(f"Orders created: {result.orders:,}")
+        click.echo(f"Elapsed: {result.elapsed:.2f}s ({result.rate:,.0f} rows/s)")
+        _echo_errors(result.errors)
+        return
+    
     # Show available materials
-    materials = service.list_materials()
+    materials = lookups.materials()
     if not materials:
         click.echo("No materials found. Add materials first.")
         return
@@ -168,7 +424,7 @@ def order():
     click.echo("\n=== Create Material Order ===")
     click.echo("Available materials:")
     for m in materials:
-        click.echo(f"  {m.id}. {m.name} ({m.unit}) - ${m.cost_per_unit:.2f}")
+        click.echo(f"  {m.id}. {m.name} ({m.unit}) - ${m.cost_per_unit or 0:.2f}")
     
     # Select material
     while True:
@@ -191,7 +447,7 @@ def order():
             click.echo("Please enter a valid number")
     
     # Show available suppliers
-    suppliers = service.list_suppliers()
+    suppliers = lookups.suppliers()
     supplier_id = None
     
     if suppliers:
@@ -222,15 +478,15 @@ def order():
             delivery_dt = None
     
     # Create order
-    order = service.create_order(material_id, quantity, supplier_id, delivery_dt)
+    order = service.create_order(material_id, quantity, supplier_id, delivery_dt, project_id, phase_id)
     
     if not order:
-        click.echo("\nFailed to create order. Check supplier availability.")
+        click.echo("\nFailed to create order. Check supplier, project and phase IDs.")
         return
     
     # Show success
     supplier = next((s for s in suppliers if s.id == order.supplier_id), None)
-    total_cost = quantity * material.cost_per_unit if material.cost_per_unit else 0
+    total_cost = order.total_cost or 0
     
     click.echo("\nOrder created successfully!")
     click.echo(f"Order ID: {order.id}")
@@ -238,32 +494,41 @@ def order():
     click.echo(f"Quantity: {quantity} {material.unit}")
     click.echo(f"Supplier: {supplier.name if supplier else 'Unknown'}")
     click.echo(f"Total Cost: ${total_cost:.2f}")
+    if order.project_id:
+        click.echo(f"Project ID: {order.project_id}")
     if delivery_dt:
         click.echo(f"Expected Delivery: {delivery_dt}")
 
 @materials.command()
-def orders():
-    """List all material orders"""
+@date_range_options
+@paging_options
+def orders(since, until, limit, after_id):
+    """List all material orders
+
+    With --since/--until, orders placed in that range are listed, including
+    any moved out by `buildcli archive`.
+    """
+    from ..services.material_service import MaterialService
+    from ..services.read_models import OrderRow
     service = MaterialService()
-    orders = service.list_orders()
     
-    if not orders:
-        click.echo("No orders found")
-        return
-    
-    click.echo("Material Orders:")
-    for order in orders:
+    def line(order):
         delivery = order.delivery_date.strftime("%Y-%m-%d") if order.delivery_date else "TBD"
-        total = order.quantity * order.material.cost_per_unit if order.material.cost_per_unit else 0
-        click.echo(f"{order.id}. {order.material.name} - {order.quantity} {order.material.unit} - {order.supplier.name} - ${total:.2f} - {order.status} - Delivery: {delivery}")
+        return (f"{order.id}. {order.material_name} - {order.quantity} {order.unit} - {order.supplier_name}"
+                f" - ${order.total or 0:.2f} - {order.status} - Delivery: {delivery}")
+    
+    rows = service.iter_order_rows(limit, after_id, since=as_date(since), until=as_date(until))
+    echo_rows(rows, "Material Orders:", "No orders found", line, limit, OrderRow._fields)
 
 @materials.command()
 def delete():
     """Delete a material"""
+    from ..services import lookups
+    from ..services.material_service import MaterialService
     service = MaterialService()
     
     # Show available materials
-    materials = service.list_materials()
+    materials = lookups.materials()
     if not materials:
         click.echo("No materials found.")
         return
@@ -271,7 +536,7 @@ def delete():
     click.echo("\n=== Delete Material ===")
     click.echo("Available materials:")
     for m in materials:
-        click.echo(f"  {m.id}. {m.name} ({m.unit}) - ${m.cost_per_unit:.2f}")
+        click.echo(f"  {m.id}. {m.name} ({m.unit}) - ${m.cost_per_unit or 0:.2f}")
     
     while True:
         try:
@@ -0,0 +1,51 @@
+import click
+from ..utils.output import write_rows
+
+def paging_options(f):
+    """Add --limit/--after-id keyset pagination options to a list command"""
+    f = click.option('--after-id', type=int, help='Only show rows with an ID greater than this')(f)
+    f = click.option('--limit', type=click.IntRange(min=1), help='Maximum number of rows to show')(f)
+    return f
+
+def date_range_options(f):
+    """Add --since/--until date filters; a range also reads archived rows it reaches"""
+    f = click.option('--until', type=click.DateTime(["%Y-%m-%d"]),
+                     help='Only rows dated on or before this day (YYYY-MM-DD)')(f)
+    f = click.option('--since', type=click.DateTime(["%Y-%m-%d"]),
+                     help='Only rows dated on or after this day (YYYY-MM-DD), archived ones included')(f)
+    return f
+
+def as_date(value):
+    return value.date() if value else None
+
+def output_format():
+    """The global --format choice, 'table' when run outside buildcli"""
+    ctx = click.get_current_context(silent=True)
+    options = ctx.find_object(dict) if ctx else None
+    return (options or {}).get("format", "table")
+
+def echo_rows(rows, header, empty, line, limit=None, fields=None):
+    """Print rows as they stream in; hint at the next page when the limit was hit
+
+    Machine formats (--format json/jsonl/csv) bypass the per-line text and
+    serialize rows straight from the cursor.
+    """
+    fmt = output_format()
+    if fmt != "table":
+        count = write_rows(rows, fmt, fields)
+        if limit and count >= limit:
+            click.echo("-- more rows may follow: pass the last id to --after-id", err=True)
+        return
+
+    count = 0
+    last_id = None
+    for row in rows:
+        if not count:
+            click.echo(header)
+        click.echo(line(row))
+        count += 1
+        last_id = row[0]
+    if not count:
+        click.echo(empty)
+    elif limit and count >= limit:
+        click.echo(f"-- more rows may follow: use --after-id {last_id}")
@@ -1,7 +1,8 @@
 import click
-from ..utils.database import init_db, get_session
-from ..services.project_service import ProjectService
-from ..models.project import Project, Phase, Milestone
+from .paging import paging_options, date_range_options, as_date, echo_rows, output_format
+from ..utils.output import write_rows
+
+STATUS_FIELDS = ("id", "name", "status", "budget", "location", "start_date", "end_date")
 
 @click.group()
 def project():
@@ -11,7 +12,7 @@ def project():
 @project.command()
 def create():
     """Create a new project"""
-    init_db()
+    from ..services.project_service import ProjectService
     
     click.echo("\n=== Create New Project ===")
     name = click.prompt("Project name")
@@ -55,24 +56,26 @@ def create():
 
 @project.command()
 @click.option('--status', help='Filter by status')
-def list(status):
+@paging_options
+def list(status, limit, after_id):
     """List all projects"""
+    from ..services.project_service import ProjectService
+    from ..services.read_models import ProjectRow
     service = ProjectService()
-    projects = service.list_projects(status)
     
-    if not projects:
-        click.echo("No projects found")
-        return
-    
-    click.echo("Project List:")
-    for p in projects:
+    def line(p):
         budget = f"${p.budget:,.0f}" if p.budget else "N/A"
-        click.echo(f"{p.id}. {p.name} - {budget} - {p.status}")
+        return f"{p.id}. {p.name} - {budget} - {p.status}"
+    
+    rows = service.iter_project_rows(status, limit, after_id)
+    echo_rows(rows, "Project List:", "No projects found", line, limit, ProjectRow._fields)
 
 @project.command()
 @click.option('--project-id', required=True, type=int, help='Project ID')
 def status(project_id):
     """Show project status"""
+    from ..utils.database import get_session
+    from ..models.project import Project
     session = get_session()
     try:
         project = session.query(Project).filter(Project.id == project_id).first()
@@ -80,6 +83,11 @@ def status(project_id):
             click.echo("Project not found")
             return
         
+        fmt = output_format()
+        if fmt != "table":
+            write_rows([project], fmt, STATUS_FIELDS)
+            return
+        
         click.echo(f"Project: {project.name}")
         click.echo(f"Status: {project.status}")
         click.echo(f"Budget: ${project.budget:,.0f}" if project.budget else "Budget: N/A")
@@ -93,8 +101,11 @@ def status(project_id):
 @click.option('--budget', type=float, help='New budget')
 @click.option('--status', help='New status')
 @click.option('--location', help='New location')
-def update(project_id, budget, status, location):
+@click.option('--end-date', type=click.DateTime(["%Y-%m-%d"]), help='Planned completion date (YYYY-MM-DD)')
+def update(project_id, budget, status, location, end_date):
     """Update project details"""
+    from ..utils.database import get_session
+    from ..models.project import Project
     session = get_session()
     try:
         project = session.query(Project).filter(Project.id == project_id).first()
@@ -108,6 +119,8 @@ def update(project_id, budget, status, location):
             project.status = status
         if location:
             project.location = location
+        if end_date:
+            project.end_date = end_date.date()
         
         session.commit()
         click.echo("Project updated successfully")
@@ -119,13 +132,16 @@ def phases():
     """Project phases management"""
     pass
 
-@phases.command()
-def add():
+@phases.command(name='add')
+def add_phase():
     """Add a phase to a project"""
+    from ..services import lookups
+    from ..services.project_service import ProjectService
     service = ProjectService()
     
     # Show available projects
-    projects = service.list_projects()
+    projects = lookups.projects()
+    projects_by_id = lookups.by_id(projects)
     if not projects:
         click.echo("No projects found. Create a project first.")
         return
@@ -140,7 +156,7 @@ def add():
     while True:
         try:
             project_id = click.prompt("\nEnter project ID", type=int)
-            project = service.get_project(project_id)
+            project = projects_by_id.get(project_id)
             if project:
                 break
             else:
@@ -167,41 +183,87 @@ def add():
     if duration:
         click.echo(f"Duration: {duration} days")
 
-@phases.command()
+@phases.command(name='list')
 @click.option('--project-id', required=True, type=int, help='Project ID')
-def list(project_id):
+def list_phases(project_id):
     """List phases for a project"""
-    session = get_session()
+    from ..services.unit_of_work import unit_of_work
+    from ..services.read_models import PhaseRow
+    with unit_of_work() as uow:
+        project_name = uow.projects.get_project_name(project_id)
+        phases = uow.projects.phase_rows(project_id) if project_name else []
+    
+    if not project_name:
+        click.echo("Project not found")
+        return
+    
+    def line(p):
+        duration = f"{p.duration} days" if p.duration else "N/A"
+        return f"{p.id}. {p.name} - {duration} - {p.status}"
+    
+    echo_rows(phases, f"Phases for project: {project_name}", f"No phases found for project: {project_name}",
+              line, None, PhaseRow._fields)
+
+def _reschedule_message(changed):
+    click.echo(f"Rescheduled {changed} phase{'s' if changed != 1 else ''} downstream")
+
+@phases.command(name='depend')
+@click.option('--phase-id', required=True, type=int, help='Phase that has to wait')
+@click.option('--after', 'predecessor_id', required=True, type=int, help='Phase that must finish first')
+def add_dependency(phase_id, predecessor_id):
+    """Make a phase start after another one finishes"""
+    from ..services.schedule_service import ScheduleService
     try:
-        project = session.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            click.echo("Project not found")
-            return
-        
-        phases = session.query(Phase).filter(Phase.project_id == project_id).all()
-        if not phases:
-            click.echo(f"No phases found for project: {project.name}")
-            return
-        
-        click.echo(f"Phases for project: {project.name}")
-        for p in phases:
-            duration = f"{p.duration} days" if p.duration else "N/A"
-            click.echo(f"{p.id}. {p.name} - {duration} - {p.status}")
-    finally:
-        session.close()
+        changed = ScheduleService().add_dependency(phase_id, predecessor_id)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if changed is None:
+        click.echo("Phase not found")
+        return
+    click.echo(f"Phase {phase_id} now starts after phase {predecessor_id}")
+    _reschedule_message(changed)
+
+@phases.command(name='undepend')
+@click.option('--phase-id', required=True, type=int, help='Phase that was waiting')
+@click.option('--after', 'predecessor_id', required=True, type=int, help='Phase it no longer waits for')
+def remove_dependency(phase_id, predecessor_id):
+    """Remove a dependency between two phases"""
+    from ..services.schedule_service import ScheduleService
+    changed = ScheduleService().remove_dependency(phase_id, predecessor_id)
+    if changed is None:
+        click.echo("Dependency not found")
+        return
+    click.echo(f"Phase {phase_id} no longer waits for phase {predecessor_id}")
+    _reschedule_message(changed)
+
+@phases.command(name='duration')
+@click.option('--phase-id', required=True, type=int, help='Phase ID')
+@click.option('--days', required=True, type=click.IntRange(min=0), help='New duration in days')
+def set_duration(phase_id, days):
+    """Change a phase duration and shift the phases that depend on it"""
+    from ..services.schedule_service import ScheduleService
+    changed = ScheduleService().set_duration(phase_id, days)
+    if changed is None:
+        click.echo("Phase not found")
+        return
+    click.echo(f"Phase {phase_id} now takes {days} days")
+    _reschedule_message(changed)
 
 @click.group()
 def milestones():
     """Project milestones management"""
     pass
 
-@milestones.command()
-def add():
+@milestones.command(name='add')
+def add_milestone():
     """Add a milestone to a project"""
+    from ..services import lookups
+    from ..services.project_service import ProjectService
     service = ProjectService()
     
     # Show available projects
-    projects = service.list_projects()
+    projects = lookups.projects()
+    projects_by_id = lookups.by_id(projects)
     if not projects:
         click.echo("No projects found. Create a project first.")
         return
@@ -216,7 +278,7 @@ def add():
     while True:
         try:
             project_id = click.prompt("\nEnter project ID", type=int)
-            project = service.get_project(project_id)
+            project = projects_by_id.get(project_id)
             if project:
                 break
             else:
@@ -245,35 +307,34 @@ def add():
     if target_date:
         click.echo(f"Target date: {target_date}")
 
-@milestones.command()
+@milestones.command(name='list')
 @click.option('--project-id', required=True, type=int, help='Project ID')
-def list(project_id):
+def list_milestones(project_id):
     """List milestones for a project"""
-    session = get_session()
-    try:
-        project = session.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            click.echo("Project not found")
-            return
-        
-        milestones = session.query(Milestone).filter(Milestone.project_id == project_id).all()
-        if not milestones:
-            click.echo(f"No milestones found for project: {project.name}")
-            return
-        
-        click.echo(f"Milestones for project: {project.name}")
-        for m in milestones:
-            target = m.target_date.strftime("%Y-%m-%d") if m.target_date else "N/A"
-            completion = m.completion_date.strftime("%Y-%m-%d") if m.completion_date else "N/A"
-            click.echo(f"{m.id}. {m.name} - Target: {target} - Status: {m.status}")
-    finally:
-        session.close()
+    from ..services.unit_of_work import unit_of_work
+    from ..services.read_models import MilestoneRow
+    with unit_of_work() as uow:
+        project_name = uow.projects.get_project_name(project_id)
+        milestones = uow.projects.milestone_rows(project_id) if project_name else []
+    
+    if not project_name:
+        click.echo("Project not found")
+        return
+    
+    def line(m):
+        target = m.target_date.strftime("%Y-%m-%d") if m.target_date else "N/A"
+        return f"{m.id}. {m.name} - Target: {target} - Status: {m.status}"
+    
+    echo_rows(milestones, f"Milestones for project: {project_name}",
+              f"No milestones found for project: {project_name}", line, None, MilestoneRow._fields)
 
-@milestones.command()
+@milestones.command(name='complete')
 @click.option('--milestone-id', required=True, type=int, help='Milestone ID')
-def complete(milestone_id):
+def complete_milestone(milestone_id):
     """Mark milestone as completed"""
     from datetime import date
+    from ..utils.database import get_session
+    from ..models.project import Milestone
     session = get_session()
     try:
         milestone = session.query(Milestone).filter(Milestone.id == milestone_id).first()
@@ -288,5 +349,107 @@ def complete(milestone_id):
     finally:
         session.close()
 
+@project.command()
+@click.option('--status', help='Only show projects with this status')
+@click.option('--window', type=click.IntRange(min=0), default=14, show_default=True,
+              help='Days ahead that count as upcoming for milestones')
+@paging_options
+def dashboard(status, window, limit, after_id):
+    """Overview of phases, milestones and budgets across all projects"""
+    from ..services.project_service import ProjectService
+    from ..services.read_models import DashboardRow
+    service = ProjectService()
+    
+    def line(p):
+        budget = f"${p.budget:,.0f}" if p.budget else "N/A"
+        remaining = f"{p.days_remaining} days left" if p.end_date else "no end date"
+        next_due = f", next {p.next_milestone:%Y-%m-%d}" if p.next_milestone else ""
+        return (f"{p.id}. {p.name} [{p.status}] - {budget} ({p.committed:,.0f} committed) - {remaining}"
+                f" | phases {p.phases_completed}/{p.phases} done, {p.phases_in_progress} in progress"
+                f" | milestones {p.milestones_overdue} overdue, {p.milestones_upcoming} upcoming{next_due}")
+    
+    rows = service.iter_dashboard_rows(status, window, limit, after_id)
+    echo_rows(rows, "Project Dashboard:", "No projects found", line, limit,
+              DashboardRow._fields + ("days_remaining",))
+
+@project.command()
+@click.option('--project-id', type=int, help='Break one project down instead of listing the portfolio')
+@click.option('--by', 'view', type=click.Choice(['phase', 'supplier']), default='phase', show_default=True,
+              help='Grouping for a single project breakdown')
+@click.option('--status', help='Only list projects with this status')
+@click.option('--rebuild', is_flag=True, help='Recompute the cached totals from all orders first')
+@date_range_options
+@paging_options
+def costs(project_id, view, status, rebuild, since, until, limit, after_id):
+    """Compare project budgets with committed order costs
+
+    --since/--until keep projects ending in that range (archived ones
+    included), or for one project's breakdown, orders placed in it. A
+    breakdown always includes the project's archived orders, so it adds up
+    to the portfolio totals.
+    """
+    from ..services.project_service import ProjectService
+    from ..services.read_models import ProjectCostRow, CostBreakdownRow
+    service = ProjectService()
+    
+    if rebuild:
+        service.rebuild_costs()
+        click.echo("Project cost totals rebuilt", err=True)
+    
+    def money(value):
+        return f"${value:,.2f}" if value is not None else "N/A"
+    
+    if project_id is None:
+        def line(p):
+            used = f" ({p.committed / p.budget:.0%} of budget)" if p.budget else ""
+            return (f"{p.id}. {p.name} - Budget: {money(p.budget)} - Committed: {money(p.committed)}{used}"
+                    f" - Remaining: {money(p.remaining)} - {p.orders} orders")
+        
+        rows = service.iter_cost_rows(status, limit, after_id, since=as_date(since), until=as_date(until))
+        echo_rows(rows, "Project Costs:", "No projects found", line, limit, ProjectCostRow._fields)
+        return
+    
+    since, until = as_date(since), as_date(until)
+    project_name = service.get_project_name(project_id)
+    if not project_name:
+        from ..services.archive_service import ArchiveService
+        project_name = ArchiveService().project_name(project_id, since, until)
+    if not project_name:
+        click.echo("Project not found")
+        return
+    
+    def breakdown_line(row):
+        name = row.name or ("Unallocated" if view == "phase" else "Unknown")
+        return f"{row.id or '-'}. {name} - {row.orders} orders - {money(row.total)}"
+    
+    rows = service.cost_breakdown(project_id, view, since, until)
+    echo_rows(rows, f"Costs for {project_name} by {view}:", "No orders charged to this project",
+              breakdown_line, None, CostBreakdownRow._fields)
+
+@project.command()
+@click.option('--project-id', required=True, type=int, help='Project ID')
+@click.option('--critical-only', is_flag=True, help='Only show phases on the critical path')
+def schedule(project_id, critical_only):
+    """Compute the critical path and phase start dates"""
+    from ..services.schedule_service import ScheduleService, ScheduleRow
+    try:
+        rows = ScheduleService().schedule(project_id)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if rows is None:
+        click.echo("Project not found")
+        return
+    if critical_only:
+        rows = [r for r in rows if r.critical]
+    
+    def line(r):
+        marker = "*" if r.critical else " "
+        return (f"{marker} {r.id}. {r.name} - {r.duration}d - start {r.start_date:%Y-%m-%d}"
+                f" (day {r.early_start}-{r.early_finish}) - float {r.total_float}d")
+    
+    echo_rows(rows, "Schedule (* = critical path):", "No phases found", line, None, ScheduleRow._fields)
+    if rows and output_format() == "table":
+        click.echo(f"Project finishes on day {max(r.early_finish for r in rows)}")
+
 project.add_command(phases)
 project.add_command(milestones)
\ No newline at end of file
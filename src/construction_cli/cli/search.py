@@ -0,0 +1,28 @@
+import click
+from .paging import echo_rows
+
+KINDS = ("project", "material", "supplier")
+
+@click.command()
+@click.argument('terms', nargs=-1, required=True)
+@click.option('--type', 'kinds', type=click.Choice(KINDS), multiple=True,
+              help='Only return this kind of result (repeatable)')
+@click.option('--limit', type=click.IntRange(min=1), default=20, show_default=True, help='Maximum results')
+def search(terms, kinds, limit):
+    """Search projects, materials and suppliers by name
+
+    Every word matches as a prefix, so 'conc mix' finds 'Concrete Mix'.
+    Results are ranked best first.
+    """
+    from ..services.search_service import SearchService, SearchRow
+
+    try:
+        rows = SearchService().search(terms, kinds, limit)
+    except LookupError as e:
+        raise click.ClickException(str(e))
+    
+    def line(row):
+        detail = f" - {row.detail}" if row.detail else ""
+        return f"[{row.kind}] {row.id}. {row.title}{detail}"
+    
+    echo_rows(rows, "Search Results:", "No matches found", line, None, SearchRow._fields)
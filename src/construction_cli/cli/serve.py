@@ -0,0 +1,30 @@
+import click
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='Interface to bind')
+@click.option('--port', type=int, default=8000, show_default=True, help='Port to listen on')
+@click.option('--workers', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Threads running database calls')
+@click.option('--allow-origin', 'allow_origins', multiple=True,
+              help="Browser origin allowed to call the API (repeatable; '*' allows any page) "
+                   "[default: http://localhost:3000]")
+def serve(host, port, workers, allow_origins):
+    """Serve projects and materials as a local JSON API"""
+    import asyncio
+    from ..api.server import ApiServer, DEFAULT_ORIGINS
+    from ..utils.database import init_db
+
+    init_db()
+    if '*' in allow_origins:
+        click.echo("Warning: any web page you visit can read and change data through this API", err=True)
+    server = ApiServer(host, port, workers, allow_origins or DEFAULT_ORIGINS)
+    
+    def ready(server):
+        click.echo(f"Serving buildcli API on http://{server.host}:{server.port}/api (Ctrl+C to stop)")
+    
+    try:
+        asyncio.run(server.serve_forever(ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
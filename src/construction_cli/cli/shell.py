@@ -0,0 +1,117 @@
+import os
+import shlex
+import click
+
+HISTORY_FILE = os.path.join("~", ".buildcli_history")
+EXIT_WORDS = ("exit", "quit")
+
+def _resolve(root, words):
+    """Walk the command tree along words; return the deepest command reached"""
+    ctx = click.Context(root, info_name="buildcli")
+    command = root
+    for word in words:
+        if not isinstance(command, click.Group):
+            break
+        sub = command.get_command(ctx, word)
+        if sub is None:
+            break
+        command = sub
+    return ctx, command
+
+def _candidates(root, words, prefix):
+    ctx, command = _resolve(root, words)
+    names = []
+    if isinstance(command, click.Group):
+        names.extend(command.list_commands(ctx))
+    if prefix.startswith("-") or not isinstance(command, click.Group):
+        for param in command.get_params(ctx):
+            names.extend(getattr(param, "opts", []))
+    return sorted(n for n in names if n.startswith(prefix) and n != "shell")
+
+def _setup_readline(root):
+    try:
+        import readline
+    except ImportError:
+        return None
+
+    history = os.path.expanduser(HISTORY_FILE)
+    try:
+        readline.read_history_file(history)
+    except OSError:
+        pass
+
+    def complete(text, state):
+        line = readline.get_line_buffer()[:readline.get_begidx()]
+        words = line.split()
+        if words and words[0] == "buildcli":
+            words = words[1:]
+        matches = _candidates(root, words, text)
+        return matches[state] + " " if state < len(matches) else None
+
+    readline.set_completer(complete)
+    readline.set_completer_delims(" \t")
+    readline.parse_and_bind("tab: complete")
+    return lambda: readline.write_history_file(history)
+
+def run_line(root, line):
+    """Run one shell line as a buildcli command; return False to leave the shell"""
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return True
+    if args and args[0] == "buildcli":
+        args = args[1:]
+    if not args:
+        return True
+    if args[0] in EXIT_WORDS:
+        return False
+    if args[0] == "help":
+        args = args[1:] + ["--help"]
+    if args[0] == "shell":
+        click.echo("Already in the buildcli shell")
+        return True
+
+    try:
+        root.main(args, prog_name="buildcli", standalone_mode=False)
+    except click.ClickException as e:
+        e.show()
+    except click.Abort:
+        click.echo("Aborted!")
+    except SystemExit:
+        pass
+    except Exception as e:
+        # Keep the session alive when a single command fails
+        click.echo(f"Error: {type(e).__name__}: {e}", err=True)
+    return True
+
+@click.command()
+@click.pass_context
+def shell(ctx):
+    """Interactive shell that keeps the database connection warm"""
+    from ..utils.cache import reference_cache
+    from ..utils.database import init_db
+
+    root = ctx.find_root().command
+    init_db()
+    # Pickers reuse material/supplier/project lists until a write changes them
+    reference_cache.enabled = True
+    save_history = _setup_readline(root)
+
+    click.echo("buildcli shell - type 'help' for commands, 'exit' to leave")
+    try:
+        while True:
+            try:
+                line = input("buildcli> ")
+            except EOFError:
+                click.echo()
+                break
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+            if not run_line(root, line):
+                break
+    finally:
+        reference_cache.enabled = False
+        if save_history:
+            save_history()
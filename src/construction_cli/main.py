@@ -1,33 +1,84 @@
+import importlib
 import click
-from .cli.project import project
-from .cli.materials import materials
-from .utils.database import init_db
+from .utils.output import FORMATS
 
-@click.group()
-def buildcli():
+# Subcommands are imported by name on first use so that `--help`, shell
+# completion and single commands only load the modules they need.
+LAZY_COMMANDS = {
+    'project': 'construction_cli.cli.project:project',
+    'materials': 'construction_cli.cli.materials:materials',
+    'db': 'construction_cli.cli.db:db',
+    'shell': 'construction_cli.cli.shell:shell',
+    'serve': 'construction_cli.cli.serve:serve',
+    'search': 'construction_cli.cli.search:search',
+    'archive': 'construction_cli.cli.archive:archive',
+    'suppliers': 'construction_cli.cli.materials:suppliers',
+    'project-create': 'construction_cli.cli.project:create',
+    'project-list': 'construction_cli.cli.project:list',
+    'project-status': 'construction_cli.cli.project:status',
+    'project-update': 'construction_cli.cli.project:update',
+    'project-costs': 'construction_cli.cli.project:costs',
+    'project-dashboard': 'construction_cli.cli.project:dashboard',
+    'project-schedule': 'construction_cli.cli.project:schedule',
+    'project-phases': 'construction_cli.cli.project:phases',
+    'project-milestones': 'construction_cli.cli.project:milestones',
+    'materials-add': 'construction_cli.cli.materials:add',
+    'materials-import': 'construction_cli.cli.materials:import_materials',
+    'materials-list': 'construction_cli.cli.materials:list',
+    'materials-inventory': 'construction_cli.cli.materials:inventory',
+    'materials-stock': 'construction_cli.cli.materials:stock',
+    'materials-move': 'construction_cli.cli.materials:move',
+    'materials-movements': 'construction_cli.cli.materials:movements',
+    'materials-stock-at': 'construction_cli.cli.materials:stock_at',
+    'materials-reorder': 'construction_cli.cli.materials:reorder',
+    'materials-order': 'construction_cli.cli.materials:order',
+    'materials-orders': 'construction_cli.cli.materials:orders',
+    'materials-suppliers': 'construction_cli.cli.materials:suppliers',
+    'materials-delete': 'construction_cli.cli.materials:delete',
+}
+
+class LazyGroup(click.Group):
+    """Click group that resolves subcommands from 'module:attribute' paths"""
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[cmd_name].split(':')
+            self.commands[cmd_name] = getattr(importlib.import_module(module_name), attr)
+        return super().get_command(ctx, cmd_name)
+
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
+@click.option('--format', 'output_format', type=click.Choice(FORMATS), default='table',
+              envvar='BUILDCLI_FORMAT', show_default=True, help='Output format for read commands')
+@click.option('--profile', is_flag=True, envvar='BUILDCLI_PROFILE',
+              help='Report SQL statement counts, timings and sessions on stderr')
+@click.option('--profile-output', type=click.Path(dir_okay=False), envvar='BUILDCLI_PROFILE_OUTPUT',
+              help='Also write cProfile stats to this file (implies --profile)')
+@click.pass_context
+def buildcli(ctx, output_format, profile, profile_output):
     """Construction Management CLI System"""
-    init_db()
-
-# Add all subcommands for flat help display
-from .cli.project import create, list as project_list, status, update, phases, milestones
-from .cli.materials import add, list as materials_list, inventory, stock, order, orders, suppliers, delete
-
-buildcli.add_command(project)
-buildcli.add_command(materials)
-buildcli.add_command(create, name='project-create')
-buildcli.add_command(project_list, name='project-list')
-buildcli.add_command(status, name='project-status')
-buildcli.add_command(update, name='project-update')
-buildcli.add_command(phases, name='project-phases')
-buildcli.add_command(milestones, name='project-milestones')
-buildcli.add_command(add, name='materials-add')
-buildcli.add_command(materials_list, name='materials-list')
-buildcli.add_command(inventory, name='materials-inventory')
-buildcli.add_command(stock, name='materials-stock')
-buildcli.add_command(order, name='materials-order')
-buildcli.add_command(orders, name='materials-orders')
-buildcli.add_command(suppliers, name='materials-suppliers')
-buildcli.add_command(delete, name='materials-delete')
+    ctx.ensure_object(dict)['format'] = output_format
+    if profile or profile_output:
+        _start_profiler(ctx, profile_output)
+
+def _start_profiler(ctx, cprofile_path):
+    from .utils.database import engine
+    from .utils.profiler import QueryProfiler
+    profiler = QueryProfiler(engine, cprofile_path=cprofile_path)
+    profiler.start()
+
+    def report():
+        elapsed = profiler.stop()
+        for line in profiler.report(elapsed, ctx.invoked_subcommand):
+            click.echo(line, err=True)
+
+    ctx.call_on_close(report)
 
 if __name__ == '__main__':
-    buildcli()
\ No newline at end of file
+    buildcli()
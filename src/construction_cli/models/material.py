@@ -1,15 +1,24 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 from ..utils.database import Base
+from ..utils.matching import normalize_name
 
 class Supplier(Base):
     __tablename__ = "suppliers"
     
     id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, index=True)
+    # Exact-match key so "ACME Concrete Inc." and "acme concrete" are one supplier
+    normalized_name = Column(String(100), unique=True, index=True,
+                             default=lambda context: normalize_name(context.get_current_parameters()["name"]))
     contact = Column(String(100))
     
     materials = relationship("Material", back_populates="supplier")
+    
+    @validates("name")
+    def _normalize(self, key, name):
+        self.normalized_name = normalize_name(name)
+        return name
 
 class Material(Base):
     __tablename__ = "materials"
@@ -18,13 +27,19 @@ class Material(Base):
     name = Column(String(100), nullable=False)
     unit = Column(String(20))
     cost_per_unit = Column(Float)
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"))
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), index=True)
     
     supplier = relationship("Supplier", back_populates="materials")
-    inventory = relationship("Inventory", back_populates="material", uselist=False)
+    inventory = relationship("Inventory", back_populates="material", cascade="all, delete-orphan")
 
 class Inventory(Base):
     __tablename__ = "inventory"
+    # One balance per material per site; also serves lookups by material alone.
+    # (location, quantity) covers the per-location totals.
+    __table_args__ = (
+        Index("ix_inventory_material_location", "material_id", "location", unique=True),
+        Index("ix_inventory_location_quantity", "location", "quantity"),
+    )
     
     id = Column(Integer, primary_key=True)
     material_id = Column(Integer, ForeignKey("materials.id"))
@@ -37,12 +52,45 @@ class Order(Base):
     __tablename__ = "orders"
     
     id = Column(Integer, primary_key=True)
-    material_id = Column(Integer, ForeignKey("materials.id"))
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"))
+    material_id = Column(Integer, ForeignKey("materials.id"), index=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    phase_id = Column(Integer, ForeignKey("phases.id"), index=True)
     quantity = Column(Float, nullable=False)
+    # Priced when the order is placed so later material price changes don't rewrite history
+    unit_cost = Column(Float)
+    total_cost = Column(Float)
     order_date = Column(Date)
     delivery_date = Column(Date)
-    status = Column(String(20), default="pending")
+    status = Column(String(20), default="pending", index=True)
+    
+    material = relationship("Material")
+    supplier = relationship("Supplier")
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_material_moved_at", "material_id", "moved_at"),
+        # Covers the per-material demand history read by reorder suggestions
+        Index("ix_stock_movements_demand", "kind", "material_id", "moved_at", "quantity"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False, index=True)
+    kind = Column(String(20), nullable=False)
+    quantity = Column(Float, nullable=False)
+    location = Column(String(100), default="warehouse")
+    moved_at = Column(DateTime, nullable=False)
+    reference = Column(String(100))
     
     material = relationship("Material")
-    supplier = relationship("Supplier")
\ No newline at end of file
+
+class InventorySnapshot(Base):
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (Index("ix_inventory_snapshots_material_taken_at", "material_id", "taken_at"),)
+    
+    id = Column(Integer, primary_key=True)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False)
+    quantity = Column(Float, nullable=False)
+    taken_at = Column(DateTime, nullable=False)
+    last_movement_id = Column(Integer, nullable=False)
@@ -11,7 +11,7 @@ class Project(Base):
     budget = Column(Float)
     start_date = Column(Date)
     end_date = Column(Date)
-    status = Column(String(20), default="active")
+    status = Column(String(20), default="active", index=True)
     
     phases = relationship("Phase", back_populates="project")
     milestones = relationship("Milestone", back_populates="project")
@@ -20,22 +20,39 @@ class Phase(Base):
     __tablename__ = "phases"
     
     id = Column(Integer, primary_key=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
     name = Column(String(100), nullable=False)
     duration = Column(Integer)
     start_date = Column(Date)
+    # Days from the project start, kept by the scheduler for incremental updates
+    early_start = Column(Integer)
     status = Column(String(20), default="planned")
     
     project = relationship("Project", back_populates="phases")
 
+class PhaseDependency(Base):
+    """`phase_id` cannot start until `predecessor_id` has finished"""
+    __tablename__ = "phase_dependencies"
+    
+    phase_id = Column(Integer, ForeignKey("phases.id"), primary_key=True)
+    predecessor_id = Column(Integer, ForeignKey("phases.id"), primary_key=True, index=True)
+
 class Milestone(Base):
     __tablename__ = "milestones"
     
     id = Column(Integer, primary_key=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
     name = Column(String(100), nullable=False)
-    target_date = Column(Date)
+    target_date = Column(Date, index=True)
     completion_date = Column(Date)
     status = Column(String(20), default="pending")
     
-    project = relationship("Project", back_populates="milestones")
\ No newline at end of file
+    project = relationship("Project", back_populates="milestones")
+
+class ProjectCost(Base):
+    """Running order totals per project, updated by every order write"""
+    __tablename__ = "project_costs"
+    
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    committed = Column(Float, nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,179 @@
+from collections import namedtuple
+from sqlalchemy import select, func, delete, or_
+from .base import BaseService
+from . import read_models
+from ..models.material import Material, Supplier, Order
+from ..models.project import Project, Phase, Milestone, PhaseDependency, ProjectCost
+from ..utils.archive import archive_store, partition_key
+
+# Archived orders keep the names they were listed under, so reports still
+# read them after the material, supplier or phase has gone
+ORDER_FIELDS = read_models.OrderRow._fields + ("phase_id", "phase_name")
+PROJECT_FIELDS = ("id", "name", "location", "budget", "start_date", "end_date", "status", "committed", "orders")
+PHASE_FIELDS = ("id", "project_id", "name", "duration", "start_date", "early_start", "status")
+MILESTONE_FIELDS = ("id", "project_id", "name", "target_date", "completion_date", "status")
+DEPENDENCY_FIELDS = ("phase_id", "predecessor_id")
+
+# Ids per IN (...) list, well under SQLite's bound parameter limit
+CHUNK = 500
+
+ArchiveResult = namedtuple("ArchiveResult", "projects phases milestones dependencies orders partitions")
+
+def _chunks(ids):
+    for start in range(0, len(ids), CHUNK):
+        yield ids[start:start + CHUNK]
+
+def _select_in(session, statement, column, ids):
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend(session.execute(statement.where(column.in_(chunk))).all())
+    return rows
+
+def _in_window(value, since, until):
+    return value is not None and (since is None or value >= since) and (until is None or value <= until)
+
+def _group(rows, key):
+    groups = {}
+    for row in rows:
+        groups.setdefault(key(row), []).append(tuple(row))
+    return groups
+
+class ArchiveService(BaseService):
+    def archive(self, before, dry_run=False):
+        """Move completed projects and delivered orders dated before `before` to the archive"""
+        with self._session() as session:
+            projects = session.execute(
+                select(Project.id, Project.name, Project.location, Project.budget, Project.start_date,
+                       Project.end_date, Project.status, func.coalesce(ProjectCost.committed, 0),
+                       func.coalesce(ProjectCost.orders, 0))
+                .outerjoin(ProjectCost, ProjectCost.project_id == Project.id)
+                .where(Project.status == "completed", read_models.project_date() < before)
+                .order_by(Project.id)
+            ).all()
+            project_ids = [p.id for p in projects]
+            filed = {p.id: partition_key(p.end_date or p.start_date) for p in projects}
+
+            phases = _select_in(session, select(*(getattr(Phase, f) for f in PHASE_FIELDS)).order_by(Phase.id),
+                                Phase.project_id, project_ids)
+            milestones = _select_in(session, select(*(getattr(Milestone, f) for f in MILESTONE_FIELDS))
+                                    .order_by(Milestone.id), Milestone.project_id, project_ids)
+            phase_ids = [p.id for p in phases]
+            phase_project = {p.id: p.project_id for p in phases}
+            dependencies = []
+            for chunk in _chunks(phase_ids):
+                dependencies.extend(session.execute(
+                    select(PhaseDependency.phase_id, PhaseDependency.predecessor_id)
+                    .where(or_(PhaseDependency.phase_id.in_(chunk), PhaseDependency.predecessor_id.in_(chunk)))
+                ).all())
+            dependencies = sorted(set(dependencies))
+
+            # Outer joins: orders outlive deleted materials and suppliers and must still be archived
+            orders = session.execute(
+                select(Order.id, Order.material_id, Material.name, Material.unit, Order.supplier_id, Supplier.name,
+                       Order.project_id, Order.quantity, Order.unit_cost, Order.total_cost, Order.status,
+                       Order.order_date, Order.delivery_date, Order.phase_id, Phase.name)
+                .outerjoin(Material, Order.material_id == Material.id)
+                .outerjoin(Supplier, Order.supplier_id == Supplier.id)
+                .outerjoin(Phase, Order.phase_id == Phase.id)
+                .where(Order.status == "delivered", Order.order_date < before)
+                .order_by(Order.id)
+            ).all()
+
+            def dependency_key(d):
+                return filed[phase_project.get(d.phase_id, phase_project.get(d.predecessor_id))]
+
+            batches = [
+                ("projects", PROJECT_FIELDS, _group(projects, lambda p: filed[p.id])),
+                ("phases", PHASE_FIELDS, _group(phases, lambda p: filed[p.project_id])),
+                ("milestones", MILESTONE_FIELDS, _group(milestones, lambda m: filed[m.project_id])),
+                ("phase_dependencies", DEPENDENCY_FIELDS, _group(dependencies, dependency_key)),
+                ("orders", ORDER_FIELDS, _group(orders, lambda o: partition_key(o.order_date))),
+            ]
+            result = ArchiveResult(len(projects), len(phases), len(milestones), len(dependencies), len(orders),
+                                   sum(len(groups) for _, _, groups in batches))
+            if dry_run or not (projects or orders):
+                return result
+
+            # Files first: if the delete never commits, the next run re-archives the same ids, which append skips
+            store = archive_store()
+            for table, fields, groups in batches:
+                for key, rows in groups.items():
+                    store.append(table, key, fields, rows)
+
+            order_ids = [o.id for o in orders]
+            for chunk in _chunks(phase_ids):
+                session.execute(delete(PhaseDependency).where(
+                    or_(PhaseDependency.phase_id.in_(chunk), PhaseDependency.predecessor_id.in_(chunk))))
+            for model, column, ids in ((Order, Order.id, order_ids), (Milestone, Milestone.project_id, project_ids),
+                                       (Phase, Phase.project_id, project_ids),
+                                       (ProjectCost, ProjectCost.project_id, project_ids),
+                                       (Project, Project.id, project_ids)):
+                for chunk in _chunks(ids):
+                    session.execute(delete(model).where(column.in_(chunk)))
+            self._save(session)
+            return result
+
+    def _orders(self, since, until):
+        store = archive_store()
+        date_at = ORDER_FIELDS.index("order_date")
+        for row in store.rows("orders", store.partitions("orders", since, until), ORDER_FIELDS):
+            if _in_window(row[date_at], since, until):
+                yield row
+
+    def order_rows(self, since=None, until=None, after_id=None):
+        """Archived orders placed within since..until, ordered by id"""
+        width = len(read_models.OrderRow._fields)
+        rows = [read_models.OrderRow(*row[:width]) for row in self._orders(since, until)
+                if after_id is None or row[0] > after_id]
+        return sorted(rows, key=lambda row: row.id)
+
+    def cost_rows(self, status=None, since=None, until=None, after_id=None):
+        """Budget rows for archived projects filed within since..until, ordered by id"""
+        if status and status != "completed":
+            return []
+        store = archive_store()
+        rows = []
+        for p in store.rows("projects", store.partitions("projects", since, until), PROJECT_FIELDS):
+            p = dict(zip(PROJECT_FIELDS, p))
+            if not _in_window(p["end_date"] or p["start_date"], since, until):
+                continue
+            if after_id is not None and p["id"] <= after_id:
+                continue
+            remaining = p["budget"] - p["committed"] if p["budget"] is not None else None
+            rows.append(read_models.ProjectCostRow(p["id"], p["name"], p["budget"], p["committed"], remaining,
+                                                   p["orders"]))
+        return sorted(rows, key=lambda row: row.id)
+
+    def project_name(self, project_id, since=None, until=None):
+        """Name of an archived project filed within since..until, or None"""
+        store = archive_store()
+        for row_id, name in store.rows("projects", store.partitions("projects", since, until), ("id", "name")):
+            if row_id == project_id:
+                return name
+        return None
+
+    def phase_names(self, project_id, since=None, until=None):
+        """{phase id: name} for an archived project filed within since..until"""
+        store = archive_store()
+        keys = store.partitions("phases", since, until)
+        return {phase_id: name for phase_id, owner, name in store.rows("phases", keys, ("id", "project_id", "name"))
+                if owner == project_id}
+
+    def cost_breakdown(self, project_id, by="phase", since=None, until=None):
+        """{key: CostBreakdownRow} of one project's archived orders grouped by phase or supplier"""
+        fields = {"phase": ("phase_id", "phase_name"), "supplier": ("supplier_id", "supplier_name")}[by]
+        totals = {}
+        for row in self._orders(since, until):
+            order = dict(zip(ORDER_FIELDS, row))
+            if order["project_id"] != project_id:
+                continue
+            key, name = order[fields[0]], order[fields[1]]
+            _, _, count, quantity, total = totals.get(key, (key, name, 0, 0.0, 0.0))
+            totals[key] = read_models.CostBreakdownRow(key, name, count + 1, quantity + (order["quantity"] or 0),
+                                                       total + (order["total"] or 0))
+        return totals
+
+    def order_totals(self):
+        """(project_id, total) for every archived order, for rebuilding project totals"""
+        store = archive_store()
+        return list(store.rows("orders", store.partitions("orders"), ("project_id", "total")))
@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+from ..utils.database import get_session
+
+class BaseService:
+    """Runs each call in its own session, or in a shared one when bound to a unit of work"""
+
+    def __init__(self, session=None):
+        self.session = session
+
+    @contextmanager
+    def _session(self):
+        if self.session is not None:
+            yield self.session
+            return
+        session = get_session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def _owns(self, session):
+        return session is not self.session
+
+    def _save(self, session, *instances):
+        """Commit and reload instances for a standalone call; only flush inside a unit of work"""
+        if not self._owns(session):
+            session.flush()
+            return
+        session.commit()
+        for instance in instances:
+            session.refresh(instance)
+
+    def _stream(self, statement, row_type, batch_size=1000):
+        """Yield rows as the cursor produces them; the session stays open until exhausted"""
+        with self._session() as session:
+            result = session.execute(statement.execution_options(yield_per=batch_size))
+            for row in result:
+                yield row_type(*row)
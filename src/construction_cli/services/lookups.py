@@ -0,0 +1,18 @@
+from ..utils.cache import reference_cache
+from .material_service import MaterialService
+from .project_service import ProjectService
+
+def materials():
+    """All materials, for pickers; cached while the materials table is unchanged"""
+    return reference_cache.get("materials", ("materials",), MaterialService().material_rows)
+
+def suppliers():
+    """All suppliers, for pickers"""
+    return reference_cache.get("suppliers", ("suppliers",), MaterialService().supplier_rows)
+
+def projects():
+    """All projects, for pickers"""
+    return reference_cache.get("projects", ("projects",), ProjectService().project_rows)
+
+def by_id(rows):
+    return {row.id: row for row in rows}
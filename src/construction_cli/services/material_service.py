@@ -1,87 +1,472 @@
-from datetime import date
-from ..utils.database import get_session
-from ..models.material import Material, Supplier, Inventory, Order
+import time
+from collections import namedtuple
+from datetime import date, datetime
+from sqlalchemy import func, update, delete
+from .base import BaseService
+from . import read_models
+from ..utils.importing import batched, clean
+from ..utils.matching import normalize_name, name_tokens, best_matches, duplicate_groups, NameIndex
+from ..utils import search_index
+from .project_costs import add_order_costs
+from .archive_service import ArchiveService
+from ..utils.archive import merge_by_id
+from ..models.material import Material, Supplier, Inventory, Order, StockMovement, InventorySnapshot
+from ..models.project import Project, Phase
 
-class MaterialService:
-    def add_material(self, name, unit, cost_per_unit, supplier_name=None):
-        session = get_session()
+MOVEMENT_KINDS = ("receipt", "issue", "adjustment", "transfer")
+
+# Fuzzy supplier scores at or above this are offered as "did you mean"
+SUPPLIER_MATCH_THRESHOLD = 0.8
+
+SupplierMatch = namedtuple("SupplierMatch", "id name score")
+
+class DuplicateSupplierError(ValueError):
+    """A supplier with the same normalized name already exists"""
+
+DuplicateSupplierRow = namedtuple("DuplicateSupplierRow", "group keep_id id name contact materials orders")
+
+# A material's balance is snapshotted after this many ledger entries, so
+# stock-at-date only sums the movements since the nearest snapshot
+SNAPSHOT_EVERY = 50
+
+class ImportResult:
+    """Running totals for a bulk material import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.materials = 0
+        self.suppliers = 0
+        self.inventory = 0
+        self.errors = []
+        # (new supplier name, SupplierMatch) for new suppliers resembling existing ones
+        self.similar_suppliers = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+def _text(record, key):
+    value = clean(record.get(key))
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{key} must be text")
+    return value
+
+def _material_row(record):
+    if record is None:
+        raise ValueError("not a valid record")
+    name = _text(record, "name")
+    if not name:
+        raise ValueError("missing material name")
+    cost = clean(record.get("cost_per_unit"))
+    quantity = clean(record.get("quantity"))
+    try:
+        cost = float(cost) if cost is not None else None
+        quantity = float(quantity) if quantity is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("cost_per_unit and quantity must be numbers")
+    supplier = _text(record, "supplier")
+    if supplier and not normalize_name(supplier):
+        raise ValueError("supplier name must contain letters or digits")
+    return {
+        "name": name,
+        "unit": _text(record, "unit"),
+        "cost_per_unit": cost,
+        "supplier": supplier,
+        "contact": _text(record, "supplier_contact"),
+        "quantity": quantity,
+        "location": _text(record, "location") or "warehouse",
+    }
+
+class OrderBatchResult:
+    """Running totals for a bulk order submission"""
+
+    def __init__(self):
+        self.rows = 0
+        self.orders = 0
+        self.quantity = 0.0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+def _order_row(record):
+    if record is None:
+        raise ValueError("not a valid record")
+    try:
+        material_id = int(clean(record.get("material_id")))
+    except (TypeError, ValueError):
+        raise ValueError("material_id must be an integer")
+    try:
+        quantity = float(clean(record.get("quantity")))
+    except (TypeError, ValueError):
+        raise ValueError("quantity must be a number")
+    if quantity <= 0:
+        raise ValueError("quantity must be positive")
+    supplier_id = clean(record.get("supplier_id"))
+    try:
+        supplier_id = int(supplier_id) if supplier_id is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("supplier_id must be an integer")
+    delivery_date = clean(record.get("delivery_date"))
+    try:
+        delivery_date = datetime.strptime(delivery_date, "%Y-%m-%d").date() if delivery_date else None
+    except (TypeError, ValueError):
+        raise ValueError("delivery_date must be YYYY-MM-DD")
+    allocation = {}
+    for key in ("project_id", "phase_id"):
+        value = clean(record.get(key))
         try:
+            allocation[key] = int(value) if value is not None else None
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be an integer")
+    return dict({
+        "material_id": material_id,
+        "supplier_id": supplier_id,
+        "quantity": quantity,
+        "delivery_date": delivery_date,
+    }, **allocation)
+
+class MaterialService(BaseService):
+    def add_material(self, name, unit, cost_per_unit, supplier_name=None):
+        with self._session() as session:
             supplier_id = None
             if supplier_name:
-                supplier = session.query(Supplier).filter(Supplier.name == supplier_name).first()
-                if not supplier:
-                    supplier = Supplier(name=supplier_name)
-                    session.add(supplier)
-                    session.flush()
-                supplier_id = supplier.id
+                # Remembered per session so a unit of work resolves each name once
+                supplier_ids = session.info.setdefault("supplier_ids", {})
+                normalized = normalize_name(supplier_name)
+                if not normalized:
+                    raise ValueError("Supplier name must contain letters or digits")
+                supplier_id = supplier_ids.get(normalized)
+                if supplier_id is None:
+                    supplier = session.query(Supplier).filter(Supplier.normalized_name == normalized).first()
+                    if not supplier:
+                        supplier = Supplier(name=str(supplier_name))
+                        session.add(supplier)
+                        session.flush()
+                    supplier_id = supplier_ids[normalized] = supplier.id
             
             material = Material(name=name, unit=unit, cost_per_unit=cost_per_unit, supplier_id=supplier_id)
             session.add(material)
-            session.commit()
-            session.refresh(material)
+            self._save(session, material)
             return material
-        finally:
-            session.close()
     
-    def list_materials(self):
-        session = get_session()
-        try:
-            return session.query(Material).all()
-        finally:
-            session.close()
+    def import_materials(self, records, batch_size=500, progress=None, suggest_suppliers=False):
+        """Bulk insert materials, suppliers and stock from (line_no, record) pairs
+
+        With suggest_suppliers, new suppliers are compared against every
+        existing one (loaded once) and close names land in
+        result.similar_suppliers.
+        """
+        result = ImportResult()
+        with self._session() as session:
+            try:
+                known = None
+                if suggest_suppliers:
+                    known = NameIndex(session.query(Supplier.id, Supplier.name, Supplier.normalized_name))
+                for batch in batched(records, batch_size):
+                    self._import_batch(session, batch, result, known)
+                    self._save(session)
+                    result.elapsed = time.perf_counter() - result.started
+                    if progress:
+                        progress(result)
+                result.elapsed = time.perf_counter() - result.started
+                return result
+            except Exception:
+                if self._owns(session):
+                    session.rollback()
+                raise
+    
+    def _import_batch(self, session, batch, result, known=None):
+        rows = []
+        for line_no, record in batch:
+            result.rows += 1
+            try:
+                rows.append(_material_row(record))
+            except ValueError as e:
+                result.errors.append((line_no, str(e)))
+        if not rows:
+            return
+        
+        contacts = {}
+        for row in rows:
+            if row["supplier"]:
+                contacts.setdefault(row["supplier"], row["contact"])
+        supplier_ids = self._resolve_suppliers(session, contacts, result, known)
+        
+        material_params = [{
+            "name": row["name"],
+            "unit": row["unit"],
+            "cost_per_unit": row["cost_per_unit"],
+            "supplier_id": supplier_ids.get(row["supplier"]),
+        } for row in rows]
+        # The first insert takes the database write lock, so no other writer
+        # can claim ids until this batch commits and the rest can be numbered
+        # up front for the inventory rows to reference
+        next_id = session.execute(Material.__table__.insert(), material_params[0]).inserted_primary_key[0]
+        for params in material_params:
+            params["id"] = next_id
+            next_id += 1
+        if len(material_params) > 1:
+            session.execute(Material.__table__.insert(), material_params[1:])
+        inventory_params = [
+            {"material_id": params["id"], "quantity": row["quantity"], "location": row["location"]}
+            for row, params in zip(rows, material_params) if row["quantity"] is not None
+        ]
+        
+        if inventory_params:
+            session.execute(Inventory.__table__.insert(), inventory_params)
+            moved_at = datetime.now()
+            session.execute(StockMovement.__table__.insert(), [
+                {"material_id": p["material_id"], "kind": "receipt", "quantity": p["quantity"],
+                 "location": p["location"], "moved_at": moved_at, "reference": "import"}
+                for p in inventory_params
+            ])
+        result.materials += len(material_params)
+        result.inventory += len(inventory_params)
+    
+    def _resolve_suppliers(self, session, contacts, result, known=None):
+        """Map supplier names to ids by normalized name, creating the missing ones in one insert"""
+        if not contacts:
+            return {}
+        first = {}
+        for name in contacts:
+            first.setdefault(normalize_name(name), name)
+        ids = dict(
+            session.query(Supplier.normalized_name, Supplier.id).filter(Supplier.normalized_name.in_(set(first)))
+        )
+        missing = sorted(set(first) - set(ids))
+        if missing:
+            if known is not None:
+                for normalized in missing:
+                    for score, row in known.best_matches(first[normalized], SUPPLIER_MATCH_THRESHOLD, 1):
+                        result.similar_suppliers.append((first[normalized], SupplierMatch(row[0], row[1], round(score, 3))))
+            session.execute(Supplier.__table__.insert(), [
+                {"name": first[n], "normalized_name": n, "contact": contacts[first[n]]} for n in missing
+            ])
+            created = session.query(Supplier.normalized_name, Supplier.id).filter(Supplier.normalized_name.in_(missing))
+            for normalized, supplier_id in created:
+                ids[normalized] = supplier_id
+                if known is not None:
+                    known.add((supplier_id, first[normalized], normalized))
+            result.suppliers += len(missing)
+        return {name: ids[normalize_name(name)] for name in contacts}
+    
+    def list_materials(self, limit=None, after_id=None):
+        with self._session() as session:
+            query = session.query(Material).order_by(Material.id)
+            return read_models.keyset(query, Material.id, after_id, limit).all()
     
     def add_supplier(self, name, contact=None):
-        session = get_session()
-        try:
+        with self._session() as session:
+            normalized = normalize_name(name)
+            if not normalized:
+                raise ValueError("Supplier name must contain letters or digits")
+            existing = session.query(Supplier).filter(Supplier.normalized_name == normalized).first()
+            if existing:
+                raise DuplicateSupplierError(f"Supplier '{existing.name}' already exists (ID {existing.id})")
             supplier = Supplier(name=name, contact=contact)
             session.add(supplier)
-            session.commit()
-            session.refresh(supplier)
+            self._save(session, supplier)
             return supplier
-        finally:
-            session.close()
     
-    def list_suppliers(self):
-        session = get_session()
-        try:
-            return session.query(Supplier).all()
-        finally:
-            session.close()
+    def match_suppliers(self, name, threshold=SUPPLIER_MATCH_THRESHOLD, limit=3):
+        """Existing suppliers whose names resemble `name`, best first; an exact match scores 1.0"""
+        with self._session() as session:
+            return self._match_suppliers(session, name, threshold, limit)
     
-    def get_inventory(self, low_stock_threshold=None):
-        session = get_session()
-        try:
-            query = session.query(Material, Inventory).outerjoin(Inventory)
-            if low_stock_threshold:
-                query = query.filter(Inventory.quantity <= low_stock_threshold)
-            return query.all()
-        finally:
-            session.close()
+    def _match_suppliers(self, session, name, threshold=SUPPLIER_MATCH_THRESHOLD, limit=3):
+        tokens = name_tokens(name)
+        if not tokens:
+            return []
+        # Block on shared name words through the search index, or on the
+        # leading word through the normalized-name index without it
+        conn = session.connection()
+        query = session.query(Supplier.id, Supplier.name, Supplier.normalized_name)
+        if search_index.available(conn):
+            query = query.filter(Supplier.id.in_(search_index.matching_ids(conn, "supplier", tokens)))
+        else:
+            query = query.filter(Supplier.normalized_name >= tokens[0],
+                                 Supplier.normalized_name < tokens[0] + "\uffff")
+        return [SupplierMatch(row.id, row.name, round(score, 3))
+                for score, row in best_matches(name, query.all(), threshold, limit)]
+    
+    def duplicate_suppliers(self, threshold=0.9):
+        """Groups of suppliers with near-identical names; the oldest in each group is kept"""
+        with self._session() as session:
+            groups = duplicate_groups(session.query(Supplier.id, Supplier.normalized_name).all(), threshold)
+            if not groups:
+                return []
+            ids = [supplier_id for group in groups for supplier_id in group]
+            suppliers = {s.id: s for s in session.query(Supplier.id, Supplier.name, Supplier.contact)
+                         .filter(Supplier.id.in_(ids))}
+            materials = dict(session.query(Material.supplier_id, func.count(Material.id))
+                             .filter(Material.supplier_id.in_(ids)).group_by(Material.supplier_id))
+            orders = dict(session.query(Order.supplier_id, func.count(Order.id))
+                          .filter(Order.supplier_id.in_(ids)).group_by(Order.supplier_id))
+            return [
+                DuplicateSupplierRow(number, group[0], supplier_id, suppliers[supplier_id].name,
+                                     suppliers[supplier_id].contact, materials.get(supplier_id, 0),
+                                     orders.get(supplier_id, 0))
+                for number, group in enumerate(groups, 1) for supplier_id in group
+            ]
+    
+    def merge_suppliers(self, keep_id, duplicate_ids):
+        """Point materials and orders at `keep_id` and delete the duplicates; returns (materials, orders) moved"""
+        duplicate_ids = [d for d in duplicate_ids if d != keep_id]
+        with self._session() as session:
+            keep = session.get(Supplier, keep_id)
+            if not keep or not duplicate_ids:
+                return 0, 0
+            moved_materials = session.execute(
+                update(Material).where(Material.supplier_id.in_(duplicate_ids)).values(supplier_id=keep_id)
+            ).rowcount
+            moved_orders = session.execute(
+                update(Order).where(Order.supplier_id.in_(duplicate_ids)).values(supplier_id=keep_id)
+            ).rowcount
+            if not keep.contact:
+                keep.contact = (session.query(Supplier.contact)
+                                .filter(Supplier.id.in_(duplicate_ids), Supplier.contact.isnot(None))
+                                .order_by(Supplier.id).limit(1).scalar())
+            session.execute(delete(Supplier).where(Supplier.id.in_(duplicate_ids)))
+            session.info.pop("supplier_ids", None)
+            self._save(session)
+            return moved_materials, moved_orders
+    
+    def list_suppliers(self, limit=None, after_id=None):
+        with self._session() as session:
+            query = session.query(Supplier).order_by(Supplier.id)
+            return read_models.keyset(query, Supplier.id, after_id, limit).all()
     
     def update_stock(self, material_id, quantity, location="warehouse"):
-        session = get_session()
-        try:
-            material = session.query(Material).filter(Material.id == material_id).first()
+        """Set the on-hand quantity, recording the difference as an adjustment"""
+        with self._session() as session:
+            material = session.get(Material, material_id)
             if not material:
                 return None
             
-            inventory = session.query(Inventory).filter(Inventory.material_id == material_id).first()
-            if inventory:
-                inventory.quantity = quantity
-                inventory.location = location
-            else:
-                inventory = Inventory(material_id=material_id, quantity=quantity, location=location)
-                session.add(inventory)
+            inventory = self._balance(session, material_id, location)
+            delta = quantity - (inventory.quantity or 0)
+            if delta:
+                self._apply_movements(session, material_id, "adjustment", [(location, delta)], "stock count")
             
-            session.commit()
+            self._save(session, inventory)
             return inventory
-        finally:
-            session.close()
     
-    def create_order(self, material_id, quantity, supplier_id=None, delivery_date=None):
-        session = get_session()
-        try:
-            material = session.query(Material).filter(Material.id == material_id).first()
+    def record_movement(self, material_id, kind, quantity, location="warehouse", to_location=None,
+                        reference=None, moved_at=None):
+        """Append receipt/issue/adjustment/transfer entries and update the balance
+
+        Quantities are positive except for adjustments, which are signed.
+        A transfer is written as an outgoing and an incoming entry.
+        """
+        if kind not in MOVEMENT_KINDS:
+            raise ValueError(f"Unknown movement kind: {kind}")
+        if kind != "adjustment" and quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        if kind == "transfer" and not to_location:
+            raise ValueError("A transfer needs a destination location")
+        
+        with self._session() as session:
+            material = session.get(Material, material_id)
+            if not material:
+                return None
+            
+            if kind in ("issue", "transfer"):
+                on_hand = self._balance(session, material_id, location).quantity or 0
+                if quantity > on_hand:
+                    raise ValueError(f"Only {on_hand:g} {material.unit or ''} on hand at {location}")
+            
+            if kind == "transfer":
+                deltas = [(location, -quantity), (to_location, quantity)]
+            else:
+                deltas = [(location, -quantity if kind == "issue" else quantity)]
+            movements = self._apply_movements(session, material_id, kind, deltas, reference, moved_at)
+            
+            self._save(session, *movements)
+            return movements
+    
+    def _balance(self, session, material_id, location):
+        inventory = (session.query(Inventory)
+                     .filter(Inventory.material_id == material_id, Inventory.location == location).first())
+        if not inventory:
+            inventory = Inventory(material_id=material_id, quantity=0, location=location)
+            session.add(inventory)
+        return inventory
+    
+    def _apply_movements(self, session, material_id, kind, deltas, reference=None, moved_at=None):
+        """Append ledger entries and move the per-location balances in the same transaction"""
+        moved_at = moved_at or datetime.now()
+        last = (session.query(func.max(StockMovement.moved_at))
+                .filter(StockMovement.material_id == material_id).scalar())
+        if last and moved_at < last:
+            raise ValueError(f"Movements must be recorded in time order (last one at {last:%Y-%m-%d %H:%M})")
+        
+        movements = [
+            StockMovement(material_id=material_id, kind=kind, quantity=delta, location=location,
+                          moved_at=moved_at, reference=reference)
+            for location, delta in deltas
+        ]
+        session.add_all(movements)
+        for location, delta in deltas:
+            inventory = self._balance(session, material_id, location)
+            inventory.quantity = (inventory.quantity or 0) + delta
+        session.flush()
+        self._snapshot_if_due(session, material_id, movements[-1])
+        return movements
+    
+    def _snapshot_if_due(self, session, material_id, movement):
+        snapshot = self._latest_snapshot(session, material_id)
+        base, since = (snapshot.quantity, snapshot.last_movement_id) if snapshot else (0.0, 0)
+        count, total = (
+            session.query(func.count(StockMovement.id), func.coalesce(func.sum(StockMovement.quantity), 0))
+            .filter(StockMovement.material_id == material_id, StockMovement.id > since)
+            .one()
+        )
+        if count >= SNAPSHOT_EVERY:
+            session.add(InventorySnapshot(material_id=material_id, quantity=base + total,
+                                          taken_at=movement.moved_at, last_movement_id=movement.id))
+    
+    def _latest_snapshot(self, session, material_id, at=None):
+        query = session.query(InventorySnapshot).filter(InventorySnapshot.material_id == material_id)
+        if at is not None:
+            query = query.filter(InventorySnapshot.taken_at <= at)
+        return query.order_by(InventorySnapshot.taken_at.desc(), InventorySnapshot.id.desc()).first()
+    
+    def stock_at(self, material_id, at, location=None):
+        """Quantity on hand at a point in time: nearest snapshot plus the movements after it
+
+        Snapshots hold totals across locations, so a single location is
+        summed from its ledger entries alone.
+        """
+        with self._session() as session:
+            if not session.get(Material, material_id):
+                return None
+            if location is not None:
+                return (
+                    session.query(func.coalesce(func.sum(StockMovement.quantity), 0))
+                    .filter(StockMovement.material_id == material_id, StockMovement.moved_at <= at,
+                            StockMovement.location == location)
+                    .scalar()
+                )
+            snapshot = self._latest_snapshot(session, material_id, at)
+            base, since = (snapshot.quantity, snapshot.last_movement_id) if snapshot else (0.0, 0)
+            tail = (
+                session.query(func.coalesce(func.sum(StockMovement.quantity), 0))
+                .filter(StockMovement.material_id == material_id, StockMovement.id > since,
+                        StockMovement.moved_at <= at)
+                .scalar()
+            )
+            return base + tail
+    
+    def create_order(self, material_id, quantity, supplier_id=None, delivery_date=None,
+                     project_id=None, phase_id=None):
+        with self._session() as session:
+            material = session.get(Material, material_id)
             if not material:
                 return None
             
@@ -91,42 +476,195 @@ class MaterialService:
             if not supplier_id:
                 return None
             
-            supplier = session.query(Supplier).filter(Supplier.id == supplier_id).first()
+            supplier = session.get(Supplier, supplier_id)
             if not supplier:
                 return None
             
+            if phase_id:
+                phase = session.get(Phase, phase_id)
+                if not phase or (project_id and phase.project_id != project_id):
+                    return None
+                project_id = phase.project_id
+            elif project_id and not session.get(Project, project_id):
+                return None
+            
+            unit_cost = material.cost_per_unit
             order = Order(
                 material_id=material_id,
                 supplier_id=supplier_id,
+                project_id=project_id,
+                phase_id=phase_id,
                 quantity=quantity,
+                unit_cost=unit_cost,
+                total_cost=quantity * unit_cost if unit_cost is not None else None,
                 order_date=date.today(),
                 delivery_date=delivery_date
             )
             session.add(order)
-            session.commit()
-            session.refresh(order)
+            add_order_costs(session, [(project_id, order.total_cost)])
+            self._save(session, order)
             return order
-        finally:
-            session.close()
     
-    def list_orders(self):
-        session = get_session()
-        try:
-            return session.query(Order).join(Material).join(Supplier).all()
-        finally:
-            session.close()
+    def create_orders(self, records, batch_size=1000, progress=None):
+        """Validate and insert orders from (line_no, record) pairs in one transaction
+
+        Invalid lines are collected in the result instead of failing the batch.
+        """
+        result = OrderBatchResult()
+        with self._session() as session:
+            try:
+                for batch in batched(records, batch_size):
+                    self._order_batch(session, batch, result)
+                    result.elapsed = time.perf_counter() - result.started
+                    if progress:
+                        progress(result)
+                self._save(session)
+                result.errors.sort(key=lambda error: error[0])
+                result.elapsed = time.perf_counter() - result.started
+                return result
+            except Exception:
+                if self._owns(session):
+                    session.rollback()
+                raise
+    
+    def _order_batch(self, session, batch, result):
+        rows = []
+        for line_no, record in batch:
+            result.rows += 1
+            try:
+                rows.append((line_no, _order_row(record)))
+            except ValueError as e:
+                result.errors.append((line_no, str(e)))
+        if not rows:
+            return
+        
+        # One lookup per referenced table for the whole batch
+        materials = {
+            mid: (supplier_id, cost) for mid, supplier_id, cost in
+            session.query(Material.id, Material.supplier_id, Material.cost_per_unit)
+            .filter(Material.id.in_({row["material_id"] for _, row in rows}))
+        }
+        for _, row in rows:
+            if row["supplier_id"] is None and row["material_id"] in materials:
+                row["supplier_id"] = materials[row["material_id"]][0]
+        suppliers = self._existing_ids(session, Supplier.id, {row["supplier_id"] for _, row in rows})
+        projects = self._existing_ids(session, Project.id, {row["project_id"] for _, row in rows})
+        phase_ids = {row["phase_id"] for _, row in rows if row["phase_id"] is not None}
+        phases = dict(session.query(Phase.id, Phase.project_id).filter(Phase.id.in_(phase_ids))) if phase_ids else {}
+        
+        today = date.today()
+        params = []
+        for line_no, row in rows:
+            if row["material_id"] not in materials:
+                result.errors.append((line_no, f"unknown material {row['material_id']}"))
+            elif row["supplier_id"] is None:
+                result.errors.append((line_no, f"material {row['material_id']} has no default supplier"))
+            elif row["supplier_id"] not in suppliers:
+                result.errors.append((line_no, f"unknown supplier {row['supplier_id']}"))
+            elif row["phase_id"] is not None and row["phase_id"] not in phases:
+                result.errors.append((line_no, f"unknown phase {row['phase_id']}"))
+            elif row["phase_id"] is not None and row["project_id"] not in (None, phases[row["phase_id"]]):
+                result.errors.append((line_no, f"phase {row['phase_id']} is not in project {row['project_id']}"))
+            elif row["project_id"] is not None and row["project_id"] not in projects:
+                result.errors.append((line_no, f"unknown project {row['project_id']}"))
+            else:
+                unit_cost = materials[row["material_id"]][1]
+                params.append(dict(
+                    row,
+                    project_id=phases[row["phase_id"]] if row["phase_id"] is not None else row["project_id"],
+                    unit_cost=unit_cost,
+                    total_cost=row["quantity"] * unit_cost if unit_cost is not None else None,
+                    order_date=today,
+                ))
+        if params:
+            session.execute(Order.__table__.insert(), params)
+            add_order_costs(session, [(p["project_id"], p["total_cost"]) for p in params])
+            result.orders += len(params)
+            result.quantity += sum(p["quantity"] for p in params)
+    
+    def _existing_ids(self, session, id_column, ids):
+        ids.discard(None)
+        if not ids:
+            return set()
+        return {row_id for row_id, in session.query(id_column).filter(id_column.in_(ids))}
+    
+    def material_rows(self, limit=None, after_id=None):
+        """Lightweight rows for material listings and pickers"""
+        with self._session() as session:
+            return read_models.fetch(session, read_models.materials_query(after_id, limit), read_models.MaterialRow)
+    
+    def supplier_rows(self, limit=None, after_id=None):
+        with self._session() as session:
+            return read_models.fetch(session, read_models.suppliers_query(after_id, limit), read_models.SupplierRow)
+    
+    def inventory_rows(self, low_stock_threshold=None, limit=None, after_id=None):
+        with self._session() as session:
+            query = read_models.inventory_query(low_stock_threshold, after_id, limit)
+            return read_models.fetch(session, query, read_models.InventoryRow)
+    
+    def material_stock_rows(self, low_stock_threshold=None, limit=None, after_id=None):
+        """Totals across locations; the threshold applies to the total"""
+        with self._session() as session:
+            query = read_models.material_stock_query(low_stock_threshold, after_id, limit)
+            return read_models.fetch(session, query, read_models.MaterialStockRow)
+    
+    def location_stock_rows(self, limit=None):
+        with self._session() as session:
+            return read_models.fetch(session, read_models.location_stock_query(limit), read_models.LocationStockRow)
+    
+    def order_rows(self, limit=None, after_id=None, since=None, until=None):
+        """Orders with material and supplier names in a single query
+
+        A since/until date range also reads the archive partitions it reaches.
+        """
+        with self._session() as session:
+            query = read_models.orders_query(after_id, limit, since, until)
+            rows = read_models.fetch(session, query, read_models.OrderRow)
+        if since is None and until is None:
+            return rows
+        return list(merge_by_id(rows, ArchiveService().order_rows(since, until, after_id), limit))
+    
+    # Streaming variants: rows are yielded as the cursor advances, so memory
+    # stays flat and the first row is available before the query finishes.
+    
+    def iter_material_rows(self, limit=None, after_id=None, batch_size=1000):
+        return self._stream(read_models.materials_query(after_id, limit), read_models.MaterialRow, batch_size)
+    
+    def iter_supplier_rows(self, limit=None, after_id=None, batch_size=1000):
+        return self._stream(read_models.suppliers_query(after_id, limit), read_models.SupplierRow, batch_size)
+    
+    def iter_inventory_rows(self, low_stock_threshold=None, limit=None, after_id=None, batch_size=1000):
+        query = read_models.inventory_query(low_stock_threshold, after_id, limit)
+        return self._stream(query, read_models.InventoryRow, batch_size)
+    
+    def iter_material_stock_rows(self, low_stock_threshold=None, limit=None, after_id=None, batch_size=1000):
+        query = read_models.material_stock_query(low_stock_threshold, after_id, limit)
+        return self._stream(query, read_models.MaterialStockRow, batch_size)
+    
+    def iter_location_stock_rows(self, limit=None, batch_size=1000):
+        return self._stream(read_models.location_stock_query(limit), read_models.LocationStockRow, batch_size)
+    
+    def iter_order_rows(self, limit=None, after_id=None, batch_size=1000, since=None, until=None):
+        rows = self._stream(read_models.orders_query(after_id, limit, since, until), read_models.OrderRow, batch_size)
+        if since is None and until is None:
+            return rows
+        return merge_by_id(rows, ArchiveService().order_rows(since, until, after_id), limit)
+    
+    def iter_movement_rows(self, material_id=None, limit=None, after_id=None, batch_size=1000):
+        query = read_models.movements_query(material_id, after_id, limit)
+        return self._stream(query, read_models.MovementRow, batch_size)
     
     def delete_material(self, material_id):
-        session = get_session()
-        try:
-            material = session.query(Material).filter(Material.id == material_id).first()
-            if material:
-                session.delete(material)
-                session.commit()
-                return True
-            return False
-        except Exception:
-            session.rollback()
-            return False
-        finally:
-            session.close()
\ No newline at end of file
+        with self._session() as session:
+            try:
+                material = session.get(Material, material_id)
+                if material:
+                    session.delete(material)
+                    self._save(session)
+                    return True
+                return False
+            except Exception:
+                if not self._owns(session):
+                    raise
+                session.rollback()
+                return False
\ No newline at end of file
@@ -0,0 +1,35 @@
+from sqlalchemy import select, func, update, insert, delete
+from ..models.material import Order
+from ..models.project import ProjectCost
+
+# project_costs holds per-project order totals so portfolio budget reports
+# read one row per project instead of aggregating the whole order table.
+# Every order write adds its totals here in the same transaction.
+
+def add_order_costs(session, orders):
+    """Add (project_id, total_cost) pairs for newly placed orders to the running totals"""
+    deltas = {}
+    for project_id, total in orders:
+        if project_id is None:
+            continue
+        amount, count = deltas.get(project_id, (0.0, 0))
+        deltas[project_id] = (amount + (total or 0), count + 1)
+
+    for project_id, (amount, count) in deltas.items():
+        updated = session.execute(
+            update(ProjectCost)
+            .where(ProjectCost.project_id == project_id)
+            .values(committed=ProjectCost.committed + amount, orders=ProjectCost.orders + count)
+        ).rowcount
+        if not updated:
+            session.execute(insert(ProjectCost).values(project_id=project_id, committed=amount, orders=count))
+
+def rebuild_project_costs(session):
+    """Recompute every project's totals from the order table"""
+    session.execute(delete(ProjectCost))
+    totals = (
+        select(Order.project_id, func.coalesce(func.sum(Order.total_cost), 0), func.count(Order.id))
+        .where(Order.project_id.isnot(None))
+        .group_by(Order.project_id)
+    )
+    session.execute(insert(ProjectCost).from_select(["project_id", "committed", "orders"], totals))
@@ -1,105 +1,172 @@
 from datetime import datetime, date
-from ..utils.database import get_session
-from ..models.project import Project, Phase, Milestone
+from sqlalchemy import select
+from .base import BaseService
+from . import read_models
+from .project_costs import add_order_costs, rebuild_project_costs
+from .archive_service import ArchiveService
+from ..utils.archive import archive_store, merge_by_id
+from ..models.project import Project, Phase, Milestone, ProjectCost
 
-class ProjectService:
+class ProjectService(BaseService):
     def create_project(self, name, budget=None, start_date=None, location=None):
-        session = get_session()
-        try:
+        with self._session() as session:
             start_dt = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
             project = Project(name=name, budget=budget, start_date=start_dt, location=location)
             session.add(project)
-            session.commit()
-            session.refresh(project)
+            self._save(session, project)
             return project
-        finally:
-            session.close()
     
-    def list_projects(self, status=None):
-        session = get_session()
-        try:
-            query = session.query(Project)
+    def list_projects(self, status=None, limit=None, after_id=None):
+        with self._session() as session:
+            query = session.query(Project).order_by(Project.id)
             if status:
                 query = query.filter(Project.status == status)
-            return query.all()
-        finally:
-            session.close()
+            return read_models.keyset(query, Project.id, after_id, limit).all()
     
     def get_project(self, project_id):
-        session = get_session()
-        try:
-            return session.query(Project).filter(Project.id == project_id).first()
-        finally:
-            session.close()
+        with self._session() as session:
+            return session.get(Project, project_id)
+    
+    def get_project_name(self, project_id):
+        with self._session() as session:
+            return session.query(Project.name).filter(Project.id == project_id).scalar()
+    
+    def project_rows(self, status=None, limit=None, after_id=None):
+        """Lightweight rows for project listings and pickers"""
+        with self._session() as session:
+            return read_models.fetch(session, read_models.projects_query(status, after_id, limit), read_models.ProjectRow)
+    
+    def iter_project_rows(self, status=None, limit=None, after_id=None, batch_size=1000):
+        """Stream project rows as the cursor advances"""
+        return self._stream(read_models.projects_query(status, after_id, limit), read_models.ProjectRow, batch_size)
+    
+    def phase_rows(self, project_id):
+        with self._session() as session:
+            return read_models.fetch(session, read_models.phases_query(project_id), read_models.PhaseRow)
+    
+    def milestone_rows(self, project_id):
+        with self._session() as session:
+            return read_models.fetch(session, read_models.milestones_query(project_id), read_models.MilestoneRow)
+    
+    def dashboard_rows(self, status=None, window=14, limit=None, after_id=None):
+        """Portfolio overview: phase and milestone counts for every project in one statement"""
+        with self._session() as session:
+            query = read_models.dashboard_query(status, window, after_id, limit)
+            return read_models.fetch(session, query, read_models.DashboardRow)
+    
+    def iter_dashboard_rows(self, status=None, window=14, limit=None, after_id=None, batch_size=1000):
+        query = read_models.dashboard_query(status, window, after_id, limit)
+        return self._stream(query, read_models.DashboardRow, batch_size)
+    
+    def cost_rows(self, status=None, limit=None, after_id=None, since=None, until=None):
+        """Budget versus committed order value per project, from the cached totals
+
+        A since/until range keeps projects filed (by end date) in it, archived ones included.
+        """
+        with self._session() as session:
+            query = read_models.project_costs_query(status, after_id, limit, since, until)
+            rows = read_models.fetch(session, query, read_models.ProjectCostRow)
+        if since is None and until is None:
+            return rows
+        return list(merge_by_id(rows, ArchiveService().cost_rows(status, since, until, after_id), limit))
+    
+    def iter_cost_rows(self, status=None, limit=None, after_id=None, batch_size=1000, since=None, until=None):
+        query = read_models.project_costs_query(status, after_id, limit, since, until)
+        rows = self._stream(query, read_models.ProjectCostRow, batch_size)
+        if since is None and until is None:
+            return rows
+        return merge_by_id(rows, ArchiveService().cost_rows(status, since, until, after_id), limit)
+    
+    def cost_breakdown(self, project_id, by="phase", since=None, until=None):
+        """Order count, quantity and value of one project grouped by phase or supplier
+
+        Archived orders are included whenever they count towards the range (or,
+        without one, towards the project's cached totals).
+        """
+        queries = {"phase": read_models.phase_costs_query, "supplier": read_models.supplier_costs_query}
+        with self._session() as session:
+            rows = read_models.fetch(session, queries[by](project_id, since, until), read_models.CostBreakdownRow)
+            if since is None and until is None and not self._has_archived_orders(session, project_id, rows):
+                return rows
+        archive = ArchiveService()
+        merged = archive.cost_breakdown(project_id, by, since, until)
+        for row in rows:
+            old = merged.pop(row.id, None)
+            if old:
+                row = row._replace(name=row.name or old.name, orders=row.orders + old.orders,
+                                   quantity=(row.quantity or 0) + old.quantity, total=row.total + old.total)
+            merged[row.id] = row
+        if by == "phase" and any(row.id is not None and row.name is None for row in merged.values()):
+            # Live orders can still point at phases of an archived project
+            names = archive.phase_names(project_id, since, until)
+            merged = {key: row._replace(name=row.name or names.get(key)) for key, row in merged.items()}
+        return sorted(merged.values(), key=lambda row: (row.id is not None, row.id or 0))
+    
+    def _has_archived_orders(self, session, project_id, rows):
+        cached = session.execute(
+            select(ProjectCost.orders).where(ProjectCost.project_id == project_id)
+        ).scalar()
+        if cached is not None:
+            return sum(row.orders for row in rows) < cached
+        # No running totals: the project itself may be archived
+        return bool(archive_store().partitions("orders"))
+    
+    def rebuild_costs(self):
+        """Recompute the cached project totals from every order, archived ones included"""
+        with self._session() as session:
+            rebuild_project_costs(session)
+            add_order_costs(session, ArchiveService().order_totals())
+            self._save(session)
     
     def update_project(self, project_id, **kwargs):
-        session = get_session()
-        try:
-            project = session.query(Project).filter(Project.id == project_id).first()
+        with self._session() as session:
+            project = session.get(Project, project_id)
             if project:
                 for key, value in kwargs.items():
                     if hasattr(project, key):
                         setattr(project, key, value)
-                session.commit()
+                self._save(session)
                 return True
             return False
-        finally:
-            session.close()
     
     def add_phase(self, name, project_id, duration=None):
-        session = get_session()
-        try:
-            project = session.query(Project).filter(Project.id == project_id).first()
+        with self._session() as session:
+            # Identity-map hit for repeat calls inside a unit of work
+            project = session.get(Project, project_id)
             if not project:
                 return None
             
             phase = Phase(name=name, project_id=project_id, duration=duration)
             session.add(phase)
-            session.commit()
-            session.refresh(phase)
+            self._save(session, phase)
             return phase
-        finally:
-            session.close()
     
     def list_phases(self, project_id):
-        session = get_session()
-        try:
+        with self._session() as session:
             return session.query(Phase).filter(Phase.project_id == project_id).all()
-        finally:
-            session.close()
     
     def add_milestone(self, name, project_id, target_date=None):
-        session = get_session()
-        try:
-            project = session.query(Project).filter(Project.id == project_id).first()
+        with self._session() as session:
+            project = session.get(Project, project_id)
             if not project:
                 return None
             
             target_dt = datetime.strptime(target_date, "%Y-%m-%d").date() if target_date else None
             milestone = Milestone(name=name, project_id=project_id, target_date=target_dt)
             session.add(milestone)
-            session.commit()
-            session.refresh(milestone)
+            self._save(session, milestone)
             return milestone
-        finally:
-            session.close()
     
     def list_milestones(self, project_id):
-        session = get_session()
-        try:
+        with self._session() as session:
             return session.query(Milestone).filter(Milestone.project_id == project_id).all()
-        finally:
-            session.close()
     
     def complete_milestone(self, milestone_id):
-        session = get_session()
-        try:
-            milestone = session.query(Milestone).filter(Milestone.id == milestone_id).first()
+        with self._session() as session:
+            milestone = session.get(Milestone, milestone_id)
             if milestone:
                 milestone.status = "completed"
                 milestone.completion_date = date.today()
-                session.commit()
+                self._save(session, milestone)
                 return milestone
-            return None
-        finally:
-            session.close()
\ No newline at end of file
+            return None
\ No newline at end of file
@@ -0,0 +1,215 @@
+from collections import namedtuple
+from datetime import date, timedelta
+from sqlalchemy import select, func, case
+from ..models.material import Material, Supplier, Inventory, Order, StockMovement
+from ..models.project import Project, Phase, Milestone, ProjectCost
+
+# Listing rows are plain tuples built from column projections: no identity
+# map, no lazy loads, and safe to use after the session has closed.
+
+MaterialRow = namedtuple("MaterialRow", "id name unit cost_per_unit supplier_id")
+SupplierRow = namedtuple("SupplierRow", "id name contact")
+InventoryRow = namedtuple("InventoryRow", "id material_id name unit quantity location")
+MaterialStockRow = namedtuple("MaterialStockRow", "material_id name unit quantity locations")
+LocationStockRow = namedtuple("LocationStockRow", "location materials quantity")
+ProjectRow = namedtuple("ProjectRow", "id name budget status")
+PhaseRow = namedtuple("PhaseRow", "id name duration status")
+MilestoneRow = namedtuple("MilestoneRow", "id name target_date completion_date status")
+MovementRow = namedtuple("MovementRow", "id material_id material_name kind quantity location moved_at reference")
+
+OrderRow = namedtuple("OrderRow", "id material_id material_name unit supplier_id supplier_name project_id "
+                                  "quantity cost_per_unit total status order_date delivery_date")
+
+class DashboardRow(namedtuple("DashboardRow", "id name status budget committed end_date phases phases_planned "
+                                              "phases_in_progress phases_completed milestones milestones_overdue "
+                                              "milestones_upcoming next_milestone")):
+    __slots__ = ()
+
+    @property
+    def days_remaining(self):
+        return (self.end_date - date.today()).days if self.end_date else None
+
+ProjectCostRow = namedtuple("ProjectCostRow", "id name budget committed remaining orders")
+CostBreakdownRow = namedtuple("CostBreakdownRow", "id name orders quantity total")
+
+def keyset(query, id_column, after_id=None, limit=None):
+    """Page a query ordered by id_column: rows after `after_id`, at most `limit`"""
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def materials_query(after_id=None, limit=None):
+    query = select(Material.id, Material.name, Material.unit, Material.cost_per_unit,
+                   Material.supplier_id).order_by(Material.id)
+    return keyset(query, Material.id, after_id, limit)
+
+def suppliers_query(after_id=None, limit=None):
+    query = select(Supplier.id, Supplier.name, Supplier.contact).order_by(Supplier.id)
+    return keyset(query, Supplier.id, after_id, limit)
+
+def inventory_query(low_stock_threshold=None, after_id=None, limit=None):
+    """One row per material per location"""
+    query = (
+        select(Inventory.id, Material.id, Material.name, Material.unit, Inventory.quantity, Inventory.location)
+        .join(Material, Inventory.material_id == Material.id)
+        .order_by(Inventory.id)
+    )
+    if low_stock_threshold is not None:
+        query = query.where(Inventory.quantity <= low_stock_threshold)
+    return keyset(query, Inventory.id, after_id, limit)
+
+def material_stock_query(low_stock_threshold=None, after_id=None, limit=None):
+    """Total on hand per material across all locations, in one grouped query"""
+    total = func.coalesce(func.sum(Inventory.quantity), 0)
+    query = (
+        select(Material.id, Material.name, Material.unit, total, func.count(Inventory.id))
+        .outerjoin(Inventory, Inventory.material_id == Material.id)
+        .group_by(Material.id)
+        .order_by(Material.id)
+    )
+    if low_stock_threshold is not None:
+        query = query.having(total <= low_stock_threshold)
+    return keyset(query, Material.id, after_id, limit)
+
+def location_stock_query(limit=None):
+    """Distinct materials and total quantity held at each location"""
+    query = (
+        select(Inventory.location, func.count(Inventory.id), func.sum(Inventory.quantity))
+        .join(Material, Inventory.material_id == Material.id)
+        .group_by(Inventory.location)
+        .order_by(Inventory.location)
+    )
+    return keyset(query, Inventory.location, None, limit)
+
+def in_range(column, since=None, until=None):
+    """Conditions keeping column within since..until (inclusive; either may be None)"""
+    conditions = []
+    if since is not None:
+        conditions.append(column >= since)
+    if until is not None:
+        conditions.append(column <= until)
+    return conditions
+
+def project_date():
+    """The date a project is filed under: its end date, or its start while open-ended"""
+    return func.coalesce(Project.end_date, Project.start_date)
+
+def orders_query(after_id=None, limit=None, since=None, until=None):
+    query = (
+        select(Order.id, Order.material_id, Material.name, Material.unit, Order.supplier_id, Supplier.name,
+               Order.project_id, Order.quantity, Order.unit_cost, Order.total_cost, Order.status,
+               Order.order_date, Order.delivery_date)
+        .join(Material, Order.material_id == Material.id)
+        .join(Supplier, Order.supplier_id == Supplier.id)
+        .where(*in_range(Order.order_date, since, until))
+        .order_by(Order.id)
+    )
+    return keyset(query, Order.id, after_id, limit)
+
+def project_costs_query(status=None, after_id=None, limit=None, since=None, until=None):
+    """Budget against committed order value, read from the project_costs totals"""
+    committed = func.coalesce(ProjectCost.committed, 0)
+    query = (
+        select(Project.id, Project.name, Project.budget, committed, Project.budget - committed,
+               func.coalesce(ProjectCost.orders, 0))
+        .outerjoin(ProjectCost, ProjectCost.project_id == Project.id)
+        .where(*in_range(project_date(), since, until))
+        .order_by(Project.id)
+    )
+    if status:
+        query = query.where(Project.status == status)
+    return keyset(query, Project.id, after_id, limit)
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def dashboard_query(status=None, window=14, after_id=None, limit=None, today=None):
+    """Per-project phase and milestone counts from two grouped subqueries joined to projects"""
+    today = today or date.today()
+    phases = (
+        select(Phase.project_id,
+               func.count(Phase.id).label("total"),
+               _count_where(Phase.status == "planned").label("planned"),
+               _count_where(Phase.status == "in_progress").label("in_progress"),
+               _count_where(Phase.status == "completed").label("completed"))
+        .group_by(Phase.project_id)
+        .subquery()
+    )
+    open_milestone = Milestone.status != "completed"
+    milestones = (
+        select(Milestone.project_id,
+               func.count(Milestone.id).label("total"),
+               _count_where(open_milestone & (Milestone.target_date < today)).label("overdue"),
+               _count_where(open_milestone & (Milestone.target_date >= today)
+                            & (Milestone.target_date <= today + timedelta(days=window))).label("upcoming"),
+               func.min(case((open_milestone & (Milestone.target_date >= today), Milestone.target_date))).label("next"))
+        .group_by(Milestone.project_id)
+        .subquery()
+    )
+    query = (
+        select(Project.id, Project.name, Project.status, Project.budget, func.coalesce(ProjectCost.committed, 0),
+               Project.end_date,
+               func.coalesce(phases.c.total, 0), func.coalesce(phases.c.planned, 0),
+               func.coalesce(phases.c.in_progress, 0), func.coalesce(phases.c.completed, 0),
+               func.coalesce(milestones.c.total, 0), func.coalesce(milestones.c.overdue, 0),
+               func.coalesce(milestones.c.upcoming, 0), milestones.c.next)
+        .outerjoin(ProjectCost, ProjectCost.project_id == Project.id)
+        .outerjoin(phases, phases.c.project_id == Project.id)
+        .outerjoin(milestones, milestones.c.project_id == Project.id)
+        .order_by(Project.id)
+    )
+    if status:
+        query = query.where(Project.status == status)
+    return keyset(query, Project.id, after_id, limit)
+
+def phase_costs_query(project_id, since=None, until=None):
+    """Order value per phase of one project; unallocated orders group under a null phase"""
+    return (
+        select(Order.phase_id, Phase.name, func.count(Order.id), func.sum(Order.quantity),
+               func.coalesce(func.sum(Order.total_cost), 0))
+        .outerjoin(Phase, Order.phase_id == Phase.id)
+        .where(Order.project_id == project_id, *in_range(Order.order_date, since, until))
+        .group_by(Order.phase_id, Phase.name)
+        .order_by(Order.phase_id)
+    )
+
+def supplier_costs_query(project_id, since=None, until=None):
+    return (
+        select(Order.supplier_id, Supplier.name, func.count(Order.id), func.sum(Order.quantity),
+               func.coalesce(func.sum(Order.total_cost), 0))
+        .join(Supplier, Order.supplier_id == Supplier.id)
+        .where(Order.project_id == project_id, *in_range(Order.order_date, since, until))
+        .group_by(Order.supplier_id, Supplier.name)
+        .order_by(Order.supplier_id)
+    )
+
+def movements_query(material_id=None, after_id=None, limit=None):
+    query = (
+        select(StockMovement.id, StockMovement.material_id, Material.name, StockMovement.kind,
+               StockMovement.quantity, StockMovement.location, StockMovement.moved_at, StockMovement.reference)
+        .join(Material, StockMovement.material_id == Material.id)
+        .order_by(StockMovement.id)
+    )
+    if material_id is not None:
+        query = query.where(StockMovement.material_id == material_id)
+    return keyset(query, StockMovement.id, after_id, limit)
+
+def projects_query(status=None, after_id=None, limit=None):
+    query = select(Project.id, Project.name, Project.budget, Project.status).order_by(Project.id)
+    if status:
+        query = query.where(Project.status == status)
+    return keyset(query, Project.id, after_id, limit)
+
+def phases_query(project_id):
+    return (select(Phase.id, Phase.name, Phase.duration, Phase.status)
+            .where(Phase.project_id == project_id).order_by(Phase.id))
+
+def milestones_query(project_id):
+    return (select(Milestone.id, Milestone.name, Milestone.target_date, Milestone.completion_date, Milestone.status)
+            .where(Milestone.project_id == project_id).order_by(Milestone.id))
+
+def fetch(session, statement, row_type):
+    """Run a projection and wrap each result tuple in row_type"""
+    return [row_type(*row) for row in session.execute(statement)]
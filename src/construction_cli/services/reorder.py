@@ -0,0 +1,98 @@
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+from sqlalchemy import select, func
+from .base import BaseService
+from ..models.material import Material, Inventory, Order, StockMovement
+
+ReorderRow = namedtuple("ReorderRow", "material_id name unit supplier_id on_hand on_order daily_usage "
+                                      "lead_time reorder_point suggested")
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Reorder suggestions need NumPy: pip install 'construction-cli[analytics]'")
+    return numpy
+
+def reorder_inputs_query(since):
+    """Per-material stock, open orders, issue statistics and lead time in one statement"""
+    on_hand = (select(Inventory.material_id, func.sum(Inventory.quantity).label("quantity"))
+               .group_by(Inventory.material_id).subquery())
+    on_order = (select(Order.material_id, func.sum(Order.quantity).label("quantity"))
+                .where(Order.status == "pending").group_by(Order.material_id).subquery())
+    lead = (select(Order.material_id,
+                   func.avg(func.julianday(Order.delivery_date) - func.julianday(Order.order_date)).label("days"))
+            .where(Order.delivery_date.isnot(None), Order.order_date.isnot(None))
+            .group_by(Order.material_id).subquery())
+    # Issues are stored as negative quantities; total them per day first so
+    # the variance is over daily demand rather than individual movements
+    daily = (select(StockMovement.material_id, (-func.sum(StockMovement.quantity)).label("used"))
+             .where(StockMovement.kind == "issue", StockMovement.moved_at >= since)
+             .group_by(StockMovement.material_id, func.date(StockMovement.moved_at)).subquery())
+    usage = (select(daily.c.material_id, func.sum(daily.c.used).label("total"),
+                    func.sum(daily.c.used * daily.c.used).label("squares"))
+             .group_by(daily.c.material_id).subquery())
+    return (
+        select(Material.id, Material.name, Material.unit, Material.supplier_id,
+               on_hand.c.quantity, on_order.c.quantity, usage.c.total, usage.c.squares, lead.c.days)
+        .outerjoin(on_hand, on_hand.c.material_id == Material.id)
+        .outerjoin(on_order, on_order.c.material_id == Material.id)
+        .outerjoin(usage, usage.c.material_id == Material.id)
+        .outerjoin(lead, lead.c.material_id == Material.id)
+        .order_by(Material.id)
+    )
+
+class ReorderService(BaseService):
+    def suggest(self, days=90, service_level=0.95, lead_time=7, cover_days=14, include_all=False):
+        """Reorder point and order quantity for every material, computed column-wise
+
+        Daily demand is the mean of issued quantities over the last `days`
+        days; safety stock covers demand variability over the lead time at
+        the requested service level. A material is due when stock on hand
+        plus open orders falls to its reorder point, and the suggestion tops
+        it up to the reorder point plus `cover_days` of demand.
+        """
+        np = _numpy()
+        since = datetime.combine(date.today() - timedelta(days=days), datetime.min.time())
+        with self._session() as session:
+            rows = session.connection().execute(reorder_inputs_query(since)).all()
+        if not rows:
+            return []
+
+        ids, names, units, suppliers, *numbers = zip(*rows)
+        on_hand, on_order, total, squares, lead = np.array(numbers, dtype=float)
+        on_hand = np.nan_to_num(on_hand)
+        on_order = np.nan_to_num(on_order)
+
+        daily = np.nan_to_num(total) / days
+        variance = np.maximum(np.nan_to_num(squares) / days - daily * daily, 0)
+        lead = np.where(np.isnan(lead) | (lead <= 0), lead_time, lead)
+
+        z = NormalDist().inv_cdf(service_level)
+        safety = z * np.sqrt(variance * lead)
+        reorder_point = daily * lead + safety
+        position = on_hand + on_order
+        suggested = np.where((daily > 0) & (position <= reorder_point),
+                             np.ceil(reorder_point + daily * cover_days - position), 0)
+
+        selected = np.arange(len(ids)) if include_all else np.flatnonzero(suggested > 0)
+        columns = [on_hand, on_order, np.round(daily, 3), np.round(lead, 1),
+                   np.round(reorder_point, 2), suggested]
+        values = zip(*(column[selected].tolist() for column in columns))
+        return [ReorderRow(ids[i], names[i], units[i], suppliers[i], *v) for i, v in zip(selected.tolist(), values)]
+
+    def create_orders(self, rows, delivery_date=None):
+        """Place the suggested orders in one batch; returns an OrderBatchResult"""
+        from .material_service import MaterialService
+        today = date.today()
+        records = (
+            (row.material_id, {
+                "material_id": row.material_id,
+                "supplier_id": row.supplier_id,
+                "quantity": row.suggested,
+                "delivery_date": (delivery_date or today + timedelta(days=round(row.lead_time))).isoformat(),
+            })
+            for row in rows if row.suggested
+        )
+        return MaterialService(self.session).create_orders(records)
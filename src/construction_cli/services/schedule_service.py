@@ -0,0 +1,192 @@
+from collections import defaultdict, deque, namedtuple
+from datetime import date, timedelta
+from sqlalchemy import select
+from .base import BaseService
+from ..models.project import Project, Phase, PhaseDependency
+
+ScheduleRow = namedtuple("ScheduleRow", "id name duration early_start early_finish late_start late_finish "
+                                        "total_float critical start_date")
+
+class CycleError(ValueError):
+    """Phase dependencies loop back on themselves"""
+
+def topological_order(nodes, edges):
+    """Order nodes so every (predecessor, successor) edge points forward"""
+    successors = defaultdict(list)
+    indegree = dict.fromkeys(nodes, 0)
+    for pred, succ in edges:
+        successors[pred].append(succ)
+        indegree[succ] += 1
+    queue = deque(n for n in nodes if not indegree[n])
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for succ in successors[node]:
+            indegree[succ] -= 1
+            if not indegree[succ]:
+                queue.append(succ)
+    if len(order) < len(indegree):
+        raise CycleError("Phase dependencies contain a cycle")
+    return order
+
+def critical_path(durations, edges):
+    """Forward and backward CPM pass over {phase_id: days} and (predecessor, phase) edges
+
+    Returns the topological order with early-start and late-finish day offsets.
+    """
+    order = topological_order(list(durations), edges)
+    predecessors = defaultdict(list)
+    successors = defaultdict(list)
+    for pred, succ in edges:
+        predecessors[succ].append(pred)
+        successors[pred].append(succ)
+
+    early = {}
+    for node in order:
+        early[node] = max((early[p] + durations[p] for p in predecessors[node]), default=0)
+    finish = max((early[n] + durations[n] for n in order), default=0)
+
+    late_finish = {}
+    for node in reversed(order):
+        late_finish[node] = min((late_finish[s] - durations[s] for s in successors[node]), default=finish)
+    return order, early, late_finish
+
+class ScheduleService(BaseService):
+    def schedule(self, project_id):
+        """Schedule every phase of a project and store the computed start dates"""
+        with self._session() as session:
+            project = session.get(Project, project_id)
+            if not project:
+                return None
+
+            phases = {
+                row.id: row for row in
+                session.query(Phase.id, Phase.name, Phase.duration, Phase.early_start, Phase.start_date)
+                .filter(Phase.project_id == project_id)
+            }
+            edges = (
+                session.query(PhaseDependency.predecessor_id, PhaseDependency.phase_id)
+                .join(Phase, Phase.id == PhaseDependency.phase_id)
+                .filter(Phase.project_id == project_id)
+                .all()
+            )
+            durations = {phase_id: row.duration or 0 for phase_id, row in phases.items()}
+            order, early, late_finish = critical_path(durations, edges)
+
+            anchor = self._anchor(project)
+            rows = []
+            updates = []
+            for phase_id in order:
+                phase = phases[phase_id]
+                duration = durations[phase_id]
+                start_date = anchor + timedelta(days=early[phase_id])
+                slack = late_finish[phase_id] - duration - early[phase_id]
+                rows.append(ScheduleRow(
+                    phase_id, phase.name, duration, early[phase_id], early[phase_id] + duration,
+                    late_finish[phase_id] - duration, late_finish[phase_id], slack, slack == 0, start_date,
+                ))
+                if phase.early_start != early[phase_id] or phase.start_date != start_date:
+                    updates.append({"id": phase_id, "early_start": early[phase_id], "start_date": start_date})
+            if updates:
+                session.bulk_update_mappings(Phase, updates)
+            self._save(session)
+            return rows
+
+    def add_dependency(self, phase_id, predecessor_id):
+        """Make a phase wait for another; returns the number of phases rescheduled"""
+        with self._session() as session:
+            phase = session.get(Phase, phase_id)
+            predecessor = session.get(Phase, predecessor_id)
+            if not phase or not predecessor:
+                return None
+            if phase.project_id != predecessor.project_id:
+                raise ValueError("Both phases must belong to the same project")
+            if phase_id == predecessor_id or predecessor_id in self._downstream(session, [phase_id]):
+                raise CycleError(f"Phase {phase_id} already comes before phase {predecessor_id}")
+            if not session.get(PhaseDependency, (phase_id, predecessor_id)):
+                session.add(PhaseDependency(phase_id=phase_id, predecessor_id=predecessor_id))
+                session.flush()
+            changed = self._reschedule(session, phase)
+            self._save(session)
+            return changed
+
+    def remove_dependency(self, phase_id, predecessor_id):
+        with self._session() as session:
+            dependency = session.get(PhaseDependency, (phase_id, predecessor_id))
+            if not dependency:
+                return None
+            session.delete(dependency)
+            session.flush()
+            changed = self._reschedule(session, session.get(Phase, phase_id))
+            self._save(session)
+            return changed
+
+    def set_duration(self, phase_id, duration):
+        """Change a phase's duration and move only the phases downstream of it"""
+        with self._session() as session:
+            phase = session.get(Phase, phase_id)
+            if not phase:
+                return None
+            phase.duration = duration
+            session.flush()
+            changed = self._reschedule(session, phase)
+            self._save(session)
+            return changed
+
+    def _anchor(self, project):
+        """The date day offsets count from; fixed on first scheduling so later partial reschedules agree"""
+        if project.start_date is None:
+            project.start_date = date.today()
+        return project.start_date
+    
+    def _downstream(self, session, phase_ids):
+        """The phases reachable from phase_ids, in one recursive query over the predecessor index"""
+        reachable = (
+            select(PhaseDependency.phase_id)
+            .where(PhaseDependency.predecessor_id.in_(phase_ids))
+            .cte("reachable", recursive=True)
+        )
+        # UNION rather than UNION ALL drops repeats, so the walk ends even on a cycle
+        reachable = reachable.union(
+            select(PhaseDependency.phase_id)
+            .join(reachable, PhaseDependency.predecessor_id == reachable.c.phase_id)
+        )
+        return set(phase_ids) | set(session.execute(select(reachable.c.phase_id)).scalars())
+
+    def _reschedule(self, session, phase):
+        """Forward pass over the subgraph downstream of one phase; returns how many phases moved
+
+        Predecessors outside the subgraph keep their stored early starts.
+        """
+        affected = self._downstream(session, [phase.id])
+        incoming = (
+            session.query(PhaseDependency.predecessor_id, PhaseDependency.phase_id)
+            .filter(PhaseDependency.phase_id.in_(affected))
+            .all()
+        )
+        needed = affected | {pred for pred, _ in incoming}
+        stored = {
+            row.id: row for row in
+            session.query(Phase.id, Phase.duration, Phase.early_start, Phase.start_date).filter(Phase.id.in_(needed))
+        }
+        predecessors = defaultdict(list)
+        for pred, succ in incoming:
+            predecessors[succ].append(pred)
+
+        anchor = self._anchor(session.get(Project, phase.project_id))
+        early = {}
+
+        def finish(pred):
+            start = early[pred] if pred in affected else stored[pred].early_start or 0
+            return start + (stored[pred].duration or 0)
+
+        updates = []
+        for node in topological_order(affected, [(p, s) for p, s in incoming if p in affected]):
+            early[node] = max((finish(p) for p in predecessors[node]), default=0)
+            start_date = anchor + timedelta(days=early[node])
+            if stored[node].early_start != early[node] or stored[node].start_date != start_date:
+                updates.append({"id": node, "early_start": early[node], "start_date": start_date})
+        if updates:
+            session.bulk_update_mappings(Phase, updates)
+        return len(updates)
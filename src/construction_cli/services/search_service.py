@@ -0,0 +1,49 @@
+import re
+from collections import namedtuple
+from sqlalchemy import text
+from .base import BaseService
+from ..utils import search_index
+
+SearchRow = namedtuple("SearchRow", "kind id title detail")
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# bm25 weights per column (kind, ref_id, title, detail): names outrank details
+_RANK = "bm25(search_index, 0.0, 0.0, 10.0, 2.0)"
+
+def match_expression(terms):
+    """Turn free text into an FTS5 query where every word is a required prefix"""
+    tokens = _TOKEN.findall(" ".join(terms))
+    return " ".join(f'"{token}"*' for token in tokens)
+
+class SearchService(BaseService):
+    def search(self, terms, kinds=None, limit=20):
+        """Ranked prefix search over projects, materials and suppliers
+
+        Raises LookupError when the database has no search index.
+        """
+        expression = match_expression(terms)
+        if not expression:
+            return []
+        sql = (f"SELECT kind, ref_id, title, detail FROM search_index "
+               f"WHERE search_index MATCH :expression")
+        params = {"expression": expression, "limit": limit}
+        if kinds:
+            names = [f":kind{i}" for i in range(len(kinds))]
+            sql += f" AND kind IN ({', '.join(names)})"
+            params.update((f"kind{i}", kind) for i, kind in enumerate(kinds))
+        sql += f" ORDER BY {_RANK} LIMIT :limit"
+
+        with self._session() as session:
+            if not search_index.available(session.connection()):
+                raise LookupError("Full-text search is unavailable: run 'buildcli db upgrade' "
+                                  "with an SQLite build that includes FTS5")
+            return [SearchRow(*row) for row in session.execute(text(sql), params)]
+
+    def reindex(self):
+        with self._session() as session:
+            if not search_index.available(session.connection()):
+                return False
+            search_index.rebuild(session.connection())
+            self._save(session)
+            return True
@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+from ..utils.database import get_session
+from .material_service import MaterialService
+from .project_service import ProjectService
+
+class UnitOfWork:
+    """Service instances sharing one session and one commit"""
+
+    def __init__(self, session):
+        self.session = session
+        self.projects = ProjectService(session)
+        self.materials = MaterialService(session)
+
+@contextmanager
+def unit_of_work():
+    """Yield a UnitOfWork; commit once on success, roll back on error"""
+    # Objects stay readable after the block since nothing is expired on commit
+    session = get_session(expire_on_commit=False)
+    try:
+        yield UnitOfWork(session)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,100 @@
+import gzip
+import heapq
+import itertools
+import json
+import os
+from datetime import date
+
+SUFFIX = ".json.gz"
+
+def partition_key(value):
+    """Monthly partition a date falls in, e.g. '2024-03'"""
+    return f"{value.year:04d}-{value.month:02d}"
+
+def _encode(values):
+    if any(isinstance(v, date) for v in values):
+        return "date", [v.isoformat() if v is not None else None for v in values]
+    return None, list(values)
+
+def _decode(kind, values):
+    if kind == "date":
+        return [date.fromisoformat(v) if v is not None else None for v in values]
+    return values
+
+class ArchiveStore:
+    """Compressed, columnar archive files partitioned by table and month
+
+    Each `<root>/<table>/<YYYY-MM>.json.gz` file holds one list per column,
+    so a partition is a few long runs of similar values that gzip well.
+    Readers pick partitions by name from a date range and never open the rest.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, table, key):
+        return os.path.join(self.root, table, key + SUFFIX)
+
+    def partitions(self, table, since=None, until=None):
+        """Partition keys of table overlapping since..until (dates, inclusive), oldest first"""
+        try:
+            names = os.listdir(os.path.join(self.root, table))
+        except FileNotFoundError:
+            return []
+        low = partition_key(since) if since else None
+        high = partition_key(until) if until else None
+        keys = sorted(name[:-len(SUFFIX)] for name in names if name.endswith(SUFFIX))
+        return [k for k in keys if (low is None or k >= low) and (high is None or k <= high)]
+
+    def read(self, table, key):
+        """{column: values} for one partition"""
+        with gzip.open(self._path(table, key), "rt", encoding="utf-8") as f:
+            stored = json.load(f)
+        types = stored.get("types", {})
+        return {name: _decode(types.get(name), values) for name, values in stored["columns"].items()}
+
+    def rows(self, table, keys, fields):
+        """Yield tuples of fields from each partition in keys"""
+        for key in keys:
+            columns = self.read(table, key)
+            yield from zip(*(columns[name] for name in fields))
+
+    def append(self, table, key, fields, rows):
+        """Add rows to a partition, skipping ids (or whole rows) it already holds"""
+        path = self._path(table, key)
+        columns = {name: [] for name in fields}
+        if os.path.exists(path):
+            columns.update(self.read(table, key))
+        identity = (lambda row: row[0]) if fields[0] == "id" else tuple
+        seen = {identity(row) for row in zip(*(columns[name] for name in fields))}
+        added = 0
+        for row in rows:
+            if identity(row) in seen:
+                continue
+            seen.add(identity(row))
+            for name, value in zip(fields, row):
+                columns[name].append(value)
+            added += 1
+
+        stored = {"columns": {}, "types": {}}
+        for name in fields:
+            kind, values = _encode(columns[name])
+            stored["columns"][name] = values
+            if kind:
+                stored["types"][name] = kind
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(stored, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return added
+
+def archive_store():
+    """The archive for the configured database"""
+    from .database import settings
+    return ArchiveStore(settings.archive_dir)
+
+def merge_by_id(live, archived, limit=None):
+    """Interleave two id-ordered row streams, stopping after limit rows"""
+    merged = heapq.merge(live, archived, key=lambda row: row.id)
+    return merged if limit is None else itertools.islice(merged, limit)
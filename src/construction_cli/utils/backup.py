@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+from datetime import datetime
+
+MANIFEST = "manifest.json"
+# Digest of every page in the newest backup, compared to find changed pages
+PAGE_HASHES = "pages.digest"
+DIGEST_SIZE = 16
+# Pages copied per online backup step; writers get the database between steps
+STEP_PAGES = 1024
+STEP_SLEEP = 0.005
+
+_PAGE_NUMBER = struct.Struct(">I")
+
+def _page_digest(page):
+    return hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest()
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _page_size(path):
+    with open(path, "rb") as f:
+        header = f.read(100)
+    size = int.from_bytes(header[16:18], "big")
+    return 65536 if size == 1 else size
+
+def online_copy(source_path, target_path, pages=STEP_PAGES, sleep=STEP_SLEEP, progress=None):
+    """Copy a live database with the backup API, a few pages at a time"""
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=pages, sleep=sleep,
+                          progress=(lambda status, remaining, total: progress(total - remaining, total))
+                          if progress else None)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+class BackupError(Exception):
+    pass
+
+class BackupSet:
+    """Full and incremental page-level backups of one SQLite file
+
+    The first backup (or one taken with full=True) stores every page; later
+    ones store only pages whose digest changed since the previous backup.
+    Each backup file is a gzip stream of (page number, page) records, and
+    the manifest keeps its SHA-256 plus the SHA-256 of the whole database
+    it restores to, so a restore can verify both.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def backups(self):
+        """Manifest entries, oldest first"""
+        try:
+            with open(self._path(MANIFEST)) as f:
+                return json.load(f)["backups"]
+        except FileNotFoundError:
+            return []
+
+    def _write_manifest(self, backups):
+        tmp = self._path(MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"backups": backups}, f, indent=1)
+        os.replace(tmp, self._path(MANIFEST))
+
+    def _previous_digests(self, page_size):
+        backups = self.backups()
+        if not backups or backups[-1]["page_size"] != page_size:
+            return None
+        try:
+            with open(self._path(PAGE_HASHES), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if hashlib.sha256(data).hexdigest() != backups[-1].get("digests_sha256"):
+            return None
+        return [data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+    def backup(self, database_path, full=False, progress=None):
+        """Take a backup of database_path; returns its manifest entry"""
+        os.makedirs(self.root, exist_ok=True)
+        backups = self.backups()
+        number = backups[-1]["number"] + 1 if backups else 1
+        copy = self._path(f".copy-{os.getpid()}.db")
+        try:
+            online_copy(database_path, copy, progress=progress)
+            page_size = _page_size(copy)
+            previous = None if full else self._previous_digests(page_size)
+            kind = "incremental" if previous is not None else "full"
+            name = f"{number:06d}-{kind}.pages.gz"
+            digests = []
+            changed = 0
+            with open(copy, "rb") as db, gzip.open(self._path(name + ".tmp"), "wb", compresslevel=6) as out:
+                for page_number, page in enumerate(iter(lambda: db.read(page_size), b"")):
+                    digest = _page_digest(page)
+                    digests.append(digest)
+                    if previous is not None and page_number < len(previous) and previous[page_number] == digest:
+                        continue
+                    out.write(_PAGE_NUMBER.pack(page_number))
+                    out.write(page)
+                    changed += 1
+            os.replace(self._path(name + ".tmp"), self._path(name))
+            database_sha256 = _file_sha256(copy)
+        finally:
+            if os.path.exists(copy):
+                os.remove(copy)
+
+        digest_data = b"".join(digests)
+        with open(self._path(PAGE_HASHES + ".tmp"), "wb") as f:
+            f.write(digest_data)
+        os.replace(self._path(PAGE_HASHES + ".tmp"), self._path(PAGE_HASHES))
+        entry = {
+            "number": number,
+            "kind": kind,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "file": name,
+            "page_size": page_size,
+            "pages": len(digests),
+            "changed": changed,
+            "size": os.path.getsize(self._path(name)),
+            "sha256": _file_sha256(self._path(name)),
+            "database_sha256": database_sha256,
+            "digests_sha256": hashlib.sha256(digest_data).hexdigest(),
+        }
+        backups.append(entry)
+        self._write_manifest(backups)
+        return entry
+
+    def chain(self, at=None, number=None):
+        """Backups to apply, from the last full one up to the chosen point"""
+        backups = self.backups()
+        if number is not None:
+            chosen = [b for b in backups if b["number"] <= number]
+            if not chosen or chosen[-1]["number"] != number:
+                raise BackupError(f"No backup number {number}")
+        else:
+            chosen = [b for b in backups if at is None or datetime.fromisoformat(b["created"]) <= at]
+            if not chosen:
+                raise BackupError("No backup taken at or before that time" if at else "No backups yet")
+        start = max(i for i, b in enumerate(chosen) if b["kind"] == "full")
+        return chosen[start:]
+
+    def restore(self, target_path, at=None, number=None):
+        """Rebuild the database as of a backup and atomically replace target_path"""
+        chain = self.chain(at, number)
+        final = chain[-1]
+        tmp = f"{target_path}.{os.getpid()}.restore"
+        try:
+            with open(tmp, "wb") as db:
+                for entry in chain:
+                    path = self._path(entry["file"])
+                    if _file_sha256(path) != entry["sha256"]:
+                        raise BackupError(f"Backup file {entry['file']} is damaged (checksum mismatch)")
+                    page_size = entry["page_size"]
+                    with gzip.open(path, "rb") as pages:
+                        while True:
+                            header = pages.read(_PAGE_NUMBER.size)
+                            if not header:
+                                break
+                            page_number, = _PAGE_NUMBER.unpack(header)
+                            db.seek(page_number * page_size)
+                            db.write(pages.read(page_size))
+                db.truncate(final["pages"] * final["page_size"])
+                db.flush()
+                os.fsync(db.fileno())
+            if _file_sha256(tmp) != final["database_sha256"]:
+                raise BackupError("Restored database does not match the backup checksum")
+            # Journal files of the replaced database must not be replayed over the restored one
+            for suffix in ("-wal", "-shm", "-journal"):
+                if os.path.exists(target_path + suffix):
+                    os.remove(target_path + suffix)
+            os.replace(tmp, target_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return final
+
+def backup_set():
+    """The backup set for the configured database"""
+    from .database import settings
+    return BackupSet(settings.backup_dir)
@@ -0,0 +1,91 @@
+import threading
+from sqlalchemy import event
+
+_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+class ReferenceCache:
+    """In-process cache of small reference lists, dropped when their tables change
+
+    Only used while `enabled` (the interactive shell). Entries are stamped
+    with the database's change counters when it keeps them, so writes
+    committed by other processes invalidate them too; otherwise only this
+    process's commits do.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.engine = None
+        self._entries = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _stamp(self, tables):
+        return tuple(self._versions.get(t, 0) for t in tables) + (self._versions.get("*", 0),)
+
+    def _stored_stamp(self, tables):
+        if self.engine is None:
+            return None
+        from .change_counter import read
+        with self.engine.connect() as conn:
+            versions = read(conn, tables)
+        return None if versions is None else ("db",) + versions
+
+    def get(self, key, tables, loader):
+        """Return the cached value for key, calling loader() if any of tables changed"""
+        if not self.enabled:
+            return loader()
+        stamp = self._stored_stamp(tables)
+        with self._lock:
+            stamp = stamp or self._stamp(tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+        value = loader()
+        with self._lock:
+            self._entries[key] = (stamp, value)
+        return value
+
+    def invalidate(self, tables=None):
+        """Mark tables (or everything when None) as changed"""
+        with self._lock:
+            for table in tables or ("*",):
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+reference_cache = ReferenceCache()
+
+def _written_table(statement, context):
+    if context is not None and context.compiled is not None:
+        if context.isinsert or context.isupdate or context.isdelete:
+            table = getattr(context.compiled.statement, "table", None)
+            return getattr(table, "name", "*")
+        return None
+    if statement.lstrip()[:7].upper().startswith(_WRITES):
+        return "*"
+    return None
+
+def track_writes(engine, cache=reference_cache):
+    """Invalidate cached tables when a transaction that wrote to them commits"""
+    cache.engine = engine
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_write(conn, cursor, statement, parameters, context, executemany):
+        table = _written_table(statement, context)
+        if table:
+            conn.info.setdefault("written_tables", set()).add(table)
+
+    @event.listens_for(engine, "commit")
+    def invalidate_written(conn):
+        tables = conn.info.pop("written_tables", None)
+        if tables:
+            from .change_counter import bump
+            # Fires before the DBAPI commit, so the counters move with the data
+            bump(conn, tables)
+            cache.invalidate(tables)
+
+    @event.listens_for(engine, "rollback")
+    def discard_written(conn):
+        conn.info.pop("written_tables", None)
@@ -0,0 +1,62 @@
+from sqlalchemy import event
+from .database import Base
+
+# table_versions holds one counter per reference table. Every process bumps
+# the counters of the tables a transaction wrote just before it commits, so
+# comparing counters tells a cache whether its copy of a table is still
+# current without reading the table itself.
+TRACKED = ("materials", "suppliers", "projects")
+
+def install(conn):
+    """Create the counter table; returns False outside SQLite"""
+    if conn.dialect.name != "sqlite":
+        return False
+    conn.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name VARCHAR(50) NOT NULL PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )""")
+    for table in TRACKED:
+        conn.exec_driver_sql("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)", (table,))
+    return True
+
+def read(conn, tables):
+    """Current counters for tables, or None when they aren't all tracked"""
+    if conn.dialect.name != "sqlite" or not set(tables) <= set(TRACKED):
+        return None
+    try:
+        versions = dict(conn.exec_driver_sql(
+            f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' * len(tables))})",
+            tuple(tables),
+        ).fetchall())
+    except conn.dialect.dbapi.Error:
+        return None
+    if len(versions) < len(set(tables)):
+        return None
+    return tuple(versions[table] for table in tables)
+
+def bump(conn, tables):
+    """Advance the counters of written tables ("*" for all) inside the committing transaction
+
+    Runs on the raw DBAPI cursor so it is not itself recorded as a write.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    names = TRACKED if "*" in tables else [t for t in TRACKED if t in tables]
+    if not names:
+        return
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(
+            f"UPDATE table_versions SET version = version + 1 WHERE name IN ({', '.join('?' * len(names))})",
+            tuple(names),
+        )
+    except conn.dialect.dbapi.Error:
+        pass  # database not upgraded yet
+    finally:
+        cursor.close()
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_on_create(metadata, conn, **kw):
+    if set(TRACKED) <= set(metadata.tables):
+        install(conn)
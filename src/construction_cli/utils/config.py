@@ -0,0 +1,128 @@
+import os
+from configparser import ConfigParser
+
+DEFAULT_DB_PATH = "construction.db"
+
+# Applied in this order on every new SQLite connection
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": "-64000",
+    "mmap_size": "268435456",
+    "temp_store": "MEMORY",
+    "busy_timeout": "5000",
+}
+
+POOL_CLASSES = ("queue", "null", "static")
+
+# Seconds between saves of an in-memory working copy back to its file
+DEFAULT_SNAPSHOT_INTERVAL = 60.0
+
+_TRUE = ("1", "true", "yes", "on")
+
+CONFIG_FILES = ("buildcli.ini", os.path.join("~", ".buildcli.ini"))
+
+class DatabaseSettings:
+    """Resolved database URL, pragma profile and pool choice"""
+
+    def __init__(self, url, pragmas=None, pool=None, pool_size=5, max_overflow=10, in_memory=False,
+                 snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL, archive_dir=None, backup_dir=None):
+        self.url = url
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.pool = pool
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.in_memory = in_memory
+        self.snapshot_interval = snapshot_interval
+        self._archive_dir = archive_dir
+        self._backup_dir = backup_dir
+
+    @property
+    def is_sqlite(self):
+        return self.url.startswith("sqlite")
+
+    @property
+    def is_memory(self):
+        return self.is_sqlite and (self.url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in self.url)
+
+    @property
+    def file_path(self):
+        """Path of the SQLite database file, or None for other databases"""
+        if not self.is_sqlite or self.is_memory or not self.url.startswith("sqlite:///"):
+            return None
+        return self.url[len("sqlite:///"):].split("?", 1)[0]
+
+    @property
+    def archive_dir(self):
+        """Where `buildcli archive` writes; next to the database file unless configured"""
+        if self._archive_dir:
+            return os.path.expanduser(self._archive_dir)
+        path = self.file_path
+        return os.path.splitext(path)[0] + "-archive" if path else os.path.abspath("buildcli-archive")
+
+    @property
+    def backup_dir(self):
+        """Where `buildcli db backup` writes; next to the database file unless configured"""
+        if self._backup_dir:
+            return os.path.expanduser(self._backup_dir)
+        path = self.file_path
+        return os.path.splitext(path)[0] + "-backups" if path else os.path.abspath("buildcli-backups")
+
+def _config_file():
+    path = os.environ.get("BUILDCLI_CONFIG")
+    if path:
+        return os.path.expanduser(path)
+    for candidate in CONFIG_FILES:
+        candidate = os.path.expanduser(candidate)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def sqlite_url(path):
+    return "sqlite:///" + os.path.abspath(os.path.expanduser(path))
+
+def load_settings(environ=None):
+    """Build settings from the config file, then BUILDCLI_* environment variables"""
+    environ = os.environ if environ is None else environ
+    parser = ConfigParser()
+    path = _config_file()
+    if path:
+        parser.read(path)
+
+    database = parser["database"] if parser.has_section("database") else {}
+    url = environ.get("BUILDCLI_DB_URL") or database.get("url")
+    if not url:
+        db_path = environ.get("BUILDCLI_DB_PATH") or database.get("path") or DEFAULT_DB_PATH
+        url = sqlite_url(db_path)
+
+    pragmas = dict(DEFAULT_PRAGMAS)
+    if parser.has_section("sqlite"):
+        pragmas.update(parser["sqlite"])
+    for name in list(pragmas):
+        value = environ.get("BUILDCLI_SQLITE_" + name.upper())
+        if value is not None:
+            pragmas[name] = value
+    # An empty value switches a pragma off and leaves SQLite's default in place
+    pragmas = {name: value for name, value in pragmas.items() if str(value).strip()}
+
+    pool = environ.get("BUILDCLI_DB_POOL") or database.get("pool")
+    if pool and pool not in POOL_CLASSES:
+        raise ValueError(f"Unknown pool '{pool}', expected one of {', '.join(POOL_CLASSES)}")
+
+    in_memory = str(environ.get("BUILDCLI_DB_MEMORY") or database.get("memory") or "").lower() in _TRUE
+    if in_memory and not DatabaseSettings(url).file_path:
+        raise ValueError("In-memory mode needs a SQLite database file")
+    interval = float(environ.get("BUILDCLI_DB_SNAPSHOT_INTERVAL") or database.get("snapshot_interval")
+                     or DEFAULT_SNAPSHOT_INTERVAL)
+
+    return DatabaseSettings(
+        url,
+        pragmas=pragmas,
+        pool=pool,
+        pool_size=int(environ.get("BUILDCLI_DB_POOL_SIZE") or database.get("pool_size") or 5),
+        max_overflow=int(environ.get("BUILDCLI_DB_MAX_OVERFLOW") or database.get("max_overflow") or 10),
+        in_memory=in_memory,
+        snapshot_interval=interval,
+        archive_dir=environ.get("BUILDCLI_ARCHIVE_DIR") or parser.get("archive", "path", fallback=None),
+        backup_dir=environ.get("BUILDCLI_BACKUP_DIR") or parser.get("backup", "path", fallback=None),
+    )
@@ -1,13 +1,172 @@
-from sqlalchemy import create_engine
+import atexit
+import os
+import re
+import sqlite3
+import threading
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+from .cache import track_writes
+from .config import load_settings
+
+_PRAGMA_VALUE = re.compile(r"^-?[\w.]+$")
 
 Base = declarative_base()
-engine = create_engine("sqlite:///construction.db")
+
+def _pool_options(settings):
+    pool = settings.pool
+    if pool is None:
+        # One shared connection for :memory:, a small reusable pool for files under WAL
+        pool = "static" if settings.is_memory else "queue" if settings.is_sqlite else None
+    if pool == "static":
+        return {"poolclass": StaticPool}
+    if pool == "null":
+        return {"poolclass": NullPool}
+    if pool == "queue":
+        return {"poolclass": QueuePool, "pool_size": settings.pool_size, "max_overflow": settings.max_overflow}
+    return {}
+
+def _apply_pragmas(engine, pragmas):
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not _PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Invalid SQLite pragma setting: {name} = {value}")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+def load_into_memory(path):
+    """Copy the SQLite file at path into a new in-memory connection"""
+    memory = sqlite3.connect(":memory:", check_same_thread=False)
+    if os.path.exists(path):
+        source = sqlite3.connect(path)
+        try:
+            # Fold any WAL content into the file so it is not replayed over a later snapshot
+            source.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            source.backup(memory)
+        finally:
+            source.close()
+    return memory
+
+def _retire_wal(path):
+    """Fold a file's WAL into it and drop the -wal/-shm files before the file is replaced
+
+    Left in place, SQLite would replay the old WAL frames over the new file.
+    Leaving WAL mode needs exclusive access, so this fails (and the swap
+    does not happen) while another connection has the database open.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        mode, = conn.execute("PRAGMA journal_mode = DELETE").fetchone()
+        if mode.lower() != "delete":
+            raise sqlite3.OperationalError(f"Cannot take {path} out of WAL mode; is it open elsewhere?")
+    finally:
+        conn.close()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+class MemorySnapshot:
+    """Saves an in-memory working copy back to its file with the online backup API"""
+
+    def __init__(self, connection, path, interval):
+        self.connection = connection
+        self.path = path
+        self.interval = interval
+        self.saved_at = time.monotonic()
+        self._saved_changes = connection.total_changes
+        self._lock = threading.Lock()
+
+    @property
+    def dirty(self):
+        return self.connection.total_changes != self._saved_changes
+
+    def save(self):
+        """Write the database to a temporary file and swap it in; False if nothing changed"""
+        with self._lock:
+            changes = self.connection.total_changes
+            if changes == self._saved_changes and os.path.exists(self.path):
+                return False
+            tmp = f"{self.path}.{os.getpid()}.snapshot"
+            try:
+                target = sqlite3.connect(tmp)
+                try:
+                    self.connection.backup(target)
+                finally:
+                    target.close()
+                if os.path.exists(self.path):
+                    os.chmod(tmp, os.stat(self.path).st_mode & 0o7777)
+                    _retire_wal(self.path)
+                os.replace(tmp, self.path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            self._saved_changes = changes
+            self.saved_at = time.monotonic()
+            return True
+
+    def maybe_save(self):
+        """Save if the interval has passed since the last snapshot"""
+        if self.dirty and time.monotonic() - self.saved_at >= self.interval:
+            self.save()
+
+def _memory_engine(settings):
+    memory = load_into_memory(settings.file_path)
+    engine = create_engine("sqlite://", creator=lambda: memory, poolclass=StaticPool)
+    snapshot = MemorySnapshot(memory, settings.file_path, settings.snapshot_interval)
+
+    # Checked when a connection goes back to the pool, so no transaction is open
+    @event.listens_for(engine, "checkin")
+    def save_on_interval(dbapi_connection, connection_record):
+        snapshot.maybe_save()
+
+    atexit.register(snapshot.save)
+    engine.snapshot = snapshot
+    return engine
+
+def make_engine(settings):
+    """Create an engine with the pool and per-connection pragmas from settings"""
+    if settings.in_memory:
+        engine = _memory_engine(settings)
+    else:
+        options = _pool_options(settings)
+        if settings.is_sqlite:
+            # Pooled connections are handed between threads (web server, worker pools)
+            options["connect_args"] = {"check_same_thread": False}
+        engine = create_engine(settings.url, **options)
+    if settings.is_sqlite and settings.pragmas:
+        _apply_pragmas(engine, settings.pragmas)
+    track_writes(engine)
+    return engine
+
+settings = load_settings()
+engine = make_engine(settings)
 SessionLocal = sessionmaker(bind=engine)
 
+_schema_checked = False
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    """Create or migrate the schema, skipped once the stored version is current"""
+    global _schema_checked
+    if _schema_checked:
+        return
+    from .migrations import is_current, upgrade
+    with engine.connect() as conn:
+        current = is_current(conn)
+    if not current:
+        with engine.begin() as conn:
+            upgrade(conn)
+    _schema_checked = True
 
-def get_session():
-    return SessionLocal()
\ No newline at end of file
+def get_session(**options):
+    init_db()
+    return SessionLocal(**options)
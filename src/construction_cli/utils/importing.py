@@ -0,0 +1,54 @@
+import csv
+import json
+import os
+
+FORMATS = ("csv", "jsonl")
+
+def detect_format(path):
+    """Guess the record format from a file extension"""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    return "csv"
+
+def iter_records(path, file_format=None):
+    """Stream (line_number, record) pairs from a CSV or JSONL file"""
+    file_format = file_format or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, {k.strip(): v for k, v in record.items() if k}
+        else:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict):
+                    yield line_no, None
+                    continue
+                yield line_no, record
+
+def batched(records, size):
+    """Group an iterable into lists of at most `size` items"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def clean(value):
+    """Normalize an empty/whitespace field to None"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
@@ -0,0 +1,114 @@
+import re
+from difflib import SequenceMatcher
+
+# Company-form words that don't tell suppliers apart
+LEGAL_SUFFIXES = {
+    "co", "company", "corp", "corporation", "inc", "incorporated", "llc", "llp",
+    "lp", "ltd", "limited", "plc", "pty", "gmbh", "sa", "ag", "bv",
+}
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+def name_tokens(name):
+    """Lowercased words of a name with punctuation and legal suffixes dropped"""
+    words = _WORD.findall(str(name or "").lower().replace("&", " and "))
+    tokens = [w for w in words if w not in LEGAL_SUFFIXES]
+    return tokens or words
+
+def normalize_name(name):
+    """Canonical form used for exact supplier matching: 'ACME Concrete Inc.' -> 'acme concrete'"""
+    return " ".join(name_tokens(name)) or None
+
+def similarity(a, b, threshold=0.0):
+    """0..1 similarity of two normalized names, ignoring word order
+
+    Pairs that cannot reach `threshold` are rejected with SequenceMatcher's
+    cheap upper bounds and score 0.
+    """
+    if a == b:
+        return 1.0
+    matcher = SequenceMatcher(None, " ".join(sorted(a.split())), " ".join(sorted(b.split())), autojunk=False)
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
+
+def best_matches(name, candidates, threshold=0.8, limit=3):
+    """Score (id, name, normalized_name) candidates against a name, best first"""
+    target = normalize_name(name)
+    if not target:
+        return []
+    scored = []
+    for candidate in candidates:
+        normalized = candidate[2] or normalize_name(candidate[1])
+        score = similarity(target, normalized, threshold) if normalized else 0.0
+        if score >= threshold:
+            scored.append((score, candidate))
+    scored.sort(key=lambda item: (-item[0], item[1][0]))
+    return scored[:limit]
+
+class NameIndex:
+    """(id, name, normalized_name) rows blocked by name word, for matching many names in memory
+
+    As in duplicate_groups, words shared by more than `max_block` names are
+    too common to block on and are skipped.
+    """
+
+    def __init__(self, rows=(), max_block=200):
+        self.max_block = max_block
+        self.blocks = {}
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        for token in set((row[2] or "").split()):
+            self.blocks.setdefault(token, []).append(row)
+
+    def best_matches(self, name, threshold=0.8, limit=3):
+        candidates = {}
+        for token in name_tokens(name):
+            block = self.blocks.get(token, ())
+            if len(block) > self.max_block:
+                continue
+            for row in block:
+                candidates[row[0]] = row
+        return best_matches(name, candidates.values(), threshold, limit)
+
+def duplicate_groups(rows, threshold=0.9, max_block=200):
+    """Cluster (id, normalized_name) rows whose names look alike
+
+    Names are only compared when they share a token (blocking), so the work
+    grows with block sizes rather than the square of the table. Tokens shared
+    by more than `max_block` names are too common to block on and are skipped.
+    Returns lists of ids, lowest first, for every cluster of two or more.
+    """
+    names = dict(rows)
+    blocks = {}
+    for row_id, normalized in names.items():
+        for token in set((normalized or "").split()):
+            blocks.setdefault(token, []).append(row_id)
+
+    parent = {row_id: row_id for row_id in names}
+
+    def find(row_id):
+        while parent[row_id] != row_id:
+            parent[row_id] = parent[parent[row_id]]
+            row_id = parent[row_id]
+        return row_id
+
+    compared = set()
+    for ids in blocks.values():
+        if len(ids) < 2 or len(ids) > max_block:
+            continue
+        for i, left in enumerate(ids):
+            for right in ids[i + 1:]:
+                pair = (left, right) if left < right else (right, left)
+                if pair in compared or find(left) == find(right):
+                    continue
+                compared.add(pair)
+                if similarity(names[left], names[right], threshold) >= threshold:
+                    parent[find(left)] = find(right)
+
+    groups = {}
+    for row_id in names:
+        groups.setdefault(find(row_id), []).append(row_id)
+    return sorted(sorted(ids) for ids in groups.values() if len(ids) > 1)
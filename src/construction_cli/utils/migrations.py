@@ -0,0 +1,205 @@
+from datetime import datetime
+from sqlalchemy import Table, Column, Integer, String, DateTime, inspect, select
+from sqlalchemy.exc import OperationalError
+from .database import Base
+from . import search_index, change_counter
+from .matching import normalize_name
+
+schema_version = Table(
+    "schema_version", Base.metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200)),
+    Column("applied_at", DateTime),
+)
+
+MIGRATIONS = []
+
+def migration(version, description):
+    """Register a schema migration; versions must be added in order"""
+    def register(func):
+        if MIGRATIONS and version != MIGRATIONS[-1][0] + 1:
+            raise ValueError(f"Migration {version} is out of order")
+        MIGRATIONS.append((version, description, func))
+        return func
+    return register
+
+def head_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def _create_index(conn, name, table, *columns, unique=False):
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.exec_driver_sql(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+
+def _add_column(conn, table, column, ddl):
+    if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+# Version 0 is the original schema created by create_all with no indexes.
+
+@migration(1, "Add lookup indexes for service filters")
+def _add_lookup_indexes(conn):
+    _create_index(conn, "ix_suppliers_name", "suppliers", "name")
+    _create_index(conn, "ix_materials_supplier_id", "materials", "supplier_id")
+    _create_index(conn, "ix_inventory_material_id", "inventory", "material_id")
+    _create_index(conn, "ix_orders_material_id", "orders", "material_id")
+    _create_index(conn, "ix_orders_supplier_id", "orders", "supplier_id")
+    _create_index(conn, "ix_orders_status", "orders", "status")
+    _create_index(conn, "ix_projects_status", "projects", "status")
+    _create_index(conn, "ix_phases_project_id", "phases", "project_id")
+    _create_index(conn, "ix_milestones_project_id", "milestones", "project_id")
+    _create_index(conn, "ix_milestones_target_date", "milestones", "target_date")
+
+@migration(2, "Add stock movement ledger and inventory snapshots")
+def _add_stock_ledger(conn):
+    conn.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS stock_movements (
+            id INTEGER NOT NULL PRIMARY KEY,
+            material_id INTEGER NOT NULL REFERENCES materials (id),
+            kind VARCHAR(20) NOT NULL,
+            quantity FLOAT NOT NULL,
+            location VARCHAR(100),
+            moved_at DATETIME NOT NULL,
+            reference VARCHAR(100)
+        )""")
+    _create_index(conn, "ix_stock_movements_material_id", "stock_movements", "material_id")
+    _create_index(conn, "ix_stock_movements_material_moved_at", "stock_movements", "material_id", "moved_at")
+    conn.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS inventory_snapshots (
+            id INTEGER NOT NULL PRIMARY KEY,
+            material_id INTEGER NOT NULL REFERENCES materials (id),
+            quantity FLOAT NOT NULL,
+            taken_at DATETIME NOT NULL,
+            last_movement_id INTEGER NOT NULL
+        )""")
+    _create_index(conn, "ix_inventory_snapshots_material_taken_at", "inventory_snapshots", "material_id", "taken_at")
+    # Existing balances become opening adjustments so the ledger sums to them
+    conn.exec_driver_sql(
+        "INSERT INTO stock_movements (material_id, kind, quantity, location, moved_at, reference) "
+        "SELECT material_id, 'adjustment', quantity, location, ?, 'opening balance' FROM inventory "
+        "WHERE material_id IS NOT NULL AND quantity != 0",
+        (datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),),
+    )
+
+@migration(3, "Track inventory per material and location")
+def _inventory_per_location(conn):
+    conn.exec_driver_sql("UPDATE stock_movements SET location = 'warehouse' WHERE location IS NULL OR location = ''")
+    # Balances were a single row per material whose location was overwritten;
+    # the ledger knows where each quantity went, so rebuild them from it
+    conn.exec_driver_sql("DELETE FROM inventory")
+    conn.exec_driver_sql(
+        "INSERT INTO inventory (material_id, quantity, location) "
+        "SELECT material_id, sum(quantity), location FROM stock_movements "
+        "WHERE material_id IN (SELECT id FROM materials) GROUP BY material_id, location"
+    )
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_inventory_material_id")
+    _create_index(conn, "ix_inventory_material_location", "inventory", "material_id", "location", unique=True)
+    _create_index(conn, "ix_inventory_location_quantity", "inventory", "location", "quantity")
+
+@migration(4, "Add covering index for issue history")
+def _add_demand_index(conn):
+    _create_index(conn, "ix_stock_movements_demand", "stock_movements", "kind", "material_id", "moved_at", "quantity")
+
+@migration(5, "Allocate orders to projects and keep project cost totals")
+def _add_project_costs(conn):
+    _add_column(conn, "orders", "project_id", "INTEGER REFERENCES projects (id)")
+    _add_column(conn, "orders", "phase_id", "INTEGER REFERENCES phases (id)")
+    _add_column(conn, "orders", "unit_cost", "FLOAT")
+    _add_column(conn, "orders", "total_cost", "FLOAT")
+    _create_index(conn, "ix_orders_project_id", "orders", "project_id")
+    _create_index(conn, "ix_orders_phase_id", "orders", "phase_id")
+    # Existing orders are priced at today's material cost, the best record there is
+    conn.exec_driver_sql(
+        "UPDATE orders SET unit_cost = (SELECT cost_per_unit FROM materials WHERE materials.id = orders.material_id) "
+        "WHERE unit_cost IS NULL"
+    )
+    conn.exec_driver_sql("UPDATE orders SET total_cost = quantity * unit_cost WHERE total_cost IS NULL")
+    conn.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS project_costs (
+            project_id INTEGER NOT NULL PRIMARY KEY REFERENCES projects (id),
+            committed FLOAT NOT NULL,
+            orders INTEGER NOT NULL
+        )""")
+
+@migration(6, "Add phase dependencies for scheduling")
+def _add_phase_dependencies(conn):
+    _add_column(conn, "phases", "early_start", "INTEGER")
+    conn.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS phase_dependencies (
+            phase_id INTEGER NOT NULL REFERENCES phases (id),
+            predecessor_id INTEGER NOT NULL REFERENCES phases (id),
+            PRIMARY KEY (phase_id, predecessor_id)
+        )""")
+    _create_index(conn, "ix_phase_dependencies_predecessor_id", "phase_dependencies", "predecessor_id")
+
+@migration(7, "Add full-text search index")
+def _add_search_index(conn):
+    search_index.install(conn)
+
+@migration(8, "Add normalized supplier names and merge exact duplicates")
+def _add_supplier_normalized_name(conn):
+    _add_column(conn, "suppliers", "normalized_name", "VARCHAR(100)")
+    keep = {}
+    merged = []
+    for supplier_id, name, contact in conn.exec_driver_sql(
+            "SELECT id, name, contact FROM suppliers ORDER BY id").fetchall():
+        normalized = normalize_name(name)
+        if normalized is None:
+            continue
+        if normalized in keep:
+            merged.append((keep[normalized], supplier_id, contact))
+        else:
+            keep[normalized] = supplier_id
+            conn.exec_driver_sql("UPDATE suppliers SET normalized_name = ? WHERE id = ?", (normalized, supplier_id))
+    # Duplicates fold into the oldest supplier with the same normalized name
+    for keep_id, duplicate_id, contact in merged:
+        conn.exec_driver_sql("UPDATE materials SET supplier_id = ? WHERE supplier_id = ?", (keep_id, duplicate_id))
+        conn.exec_driver_sql("UPDATE orders SET supplier_id = ? WHERE supplier_id = ?", (keep_id, duplicate_id))
+        conn.exec_driver_sql("UPDATE suppliers SET contact = ? WHERE id = ? AND contact IS NULL", (contact, keep_id))
+        conn.exec_driver_sql("DELETE FROM suppliers WHERE id = ?", (duplicate_id,))
+    _create_index(conn, "ix_suppliers_normalized_name", "suppliers", "normalized_name", unique=True)
+
+@migration(9, "Add change counters for reference data caching")
+def _add_change_counters(conn):
+    change_counter.install(conn)
+
+def is_current(conn):
+    """Cheap check that the stored schema version is the latest"""
+    try:
+        version = conn.exec_driver_sql("SELECT max(version) FROM schema_version").scalar()
+    except OperationalError:
+        return False
+    return version == head_version()
+
+def current_version(conn):
+    """Return the stored schema version, or None for an unversioned database"""
+    if not inspect(conn).has_table("schema_version"):
+        return None
+    return conn.execute(select(schema_version.c.version).order_by(schema_version.c.version.desc())).scalar() or 0
+
+def _record(conn, version, description):
+    conn.execute(schema_version.insert().values(
+        version=version, description=description, applied_at=datetime.now()))
+
+def upgrade(conn, target=None):
+    """Bring the schema up to `target` (default: latest) and return the applied migrations"""
+    from ..models import material, project  # noqa: F401  -- register every table on Base.metadata
+
+    target = head_version() if target is None else target
+    version = current_version(conn)
+    if version is None:
+        if not inspect(conn).get_table_names():
+            # Fresh database: the models already carry every index
+            Base.metadata.create_all(conn)
+            for number, description, _ in MIGRATIONS:
+                _record(conn, number, description)
+            return [(number, description) for number, description, _ in MIGRATIONS]
+        schema_version.create(conn)
+        version = 0
+
+    applied = []
+    for number, description, func in MIGRATIONS:
+        if version < number <= target:
+            func(conn)
+            _record(conn, number, description)
+            applied.append((number, description))
+    return applied
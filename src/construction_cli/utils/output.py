@@ -0,0 +1,79 @@
+import csv
+import io
+import itertools
+import json
+import sys
+from datetime import date, datetime
+
+FORMATS = ("table", "json", "jsonl", "csv")
+
+# Rows are serialized into an in-memory buffer and written out in chunks
+FLUSH_ROWS = 1000
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+class RowWriter:
+    """Buffered JSON/JSONL/CSV serializer for a stream of tuple-like rows"""
+
+    def __init__(self, fmt, fields, stream=None):
+        if fmt not in ("json", "jsonl", "csv"):
+            raise ValueError(f"Unsupported output format: {fmt}")
+        self.fmt = fmt
+        self.fields = tuple(fields)
+        self.stream = stream or sys.stdout
+        self.count = 0
+        self._buffer = io.StringIO()
+        self._pending = 0
+        if fmt == "csv":
+            self._csv = csv.writer(self._buffer, lineterminator="\n")
+            self._csv.writerow(self.fields)
+        elif fmt == "json":
+            self._buffer.write("[")
+
+    def write(self, values):
+        """Write one row given its values in field order"""
+        if self.fmt == "csv":
+            self._csv.writerow([_plain(v) for v in values])
+        else:
+            record = json.dumps(dict(zip(self.fields, values)), default=_plain)
+            if self.fmt == "json":
+                self._buffer.write("\n" + record if not self.count else ",\n" + record)
+            else:
+                self._buffer.write(record + "\n")
+        self.count += 1
+        self._pending += 1
+        if self._pending >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        self.stream.write(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._pending = 0
+
+    def close(self):
+        if self.fmt == "json":
+            self._buffer.write("\n]\n" if self.count else "]\n")
+        self.flush()
+        self.stream.flush()
+
+def write_rows(rows, fmt, fields=None, stream=None):
+    """Stream rows in a machine format and return how many were written
+
+    `fields` defaults to the namedtuple fields of the first row; names that
+    are not tuple fields (computed properties) are read as attributes.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    base = tuple(getattr(first, "_fields", ()))
+    fields = tuple(fields or base)
+    writer = RowWriter(fmt, fields, stream)
+    if first is not None:
+        direct = fields == base
+        for row in itertools.chain((first,), rows):
+            writer.write(row if direct else [getattr(row, f) for f in fields])
+    writer.close()
+    return writer.count
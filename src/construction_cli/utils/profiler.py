@@ -0,0 +1,109 @@
+import heapq
+import time
+import weakref
+from collections import Counter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Longest parameter repr kept for the slowest statements
+PARAMS_WIDTH = 200
+
+def _one_line(statement, width=160):
+    text = " ".join(statement.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+class QueryProfiler:
+    """Counts statements, DB time and sessions on an engine while started"""
+
+    def __init__(self, engine, top=5, cprofile_path=None):
+        self.engine = engine
+        self.top = top
+        self.cprofile_path = cprofile_path
+        self.statements = 0
+        self.db_time = 0.0
+        self.sessions = 0
+        self.checkouts = 0
+        self.repeated = Counter()
+        self._slowest = []
+        self._seen = weakref.WeakSet()
+        self._profile = None
+        self._started = None
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profiler_start"].pop()
+        self.statements += 1
+        self.db_time += elapsed
+        self.repeated[statement] += 1
+        entry = (elapsed, self.statements, statement, parameters, executemany)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, entry)
+        elif elapsed > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+    def _transaction(self, session, transaction):
+        # Sessions autobegin again after each commit; count each one once
+        if transaction.parent is None and session not in self._seen:
+            self._seen.add(session)
+            self.sessions += 1
+
+    def _listeners(self):
+        return (
+            (self.engine, "before_cursor_execute", self._before),
+            (self.engine, "after_cursor_execute", self._after),
+            (self.engine.pool, "checkout", self._checkout),
+            (Session, "after_transaction_create", self._transaction),
+        )
+
+    def start(self):
+        for target, name, fn in self._listeners():
+            event.listen(target, name, fn)
+        if self.cprofile_path:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        elapsed = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.cprofile_path)
+        for target, name, fn in self._listeners():
+            event.remove(target, name, fn)
+        return elapsed
+
+    def slowest(self):
+        """(seconds, statement, parameters, executemany), slowest first"""
+        return [(e[0], e[2], e[3], e[4]) for e in sorted(self._slowest, key=lambda e: (-e[0], e[1]))]
+
+    def report(self, elapsed, command=None):
+        """Summary lines for one command run"""
+        label = f" {command}" if command else ""
+        lines = [
+            f"profile{label}: {elapsed * 1000:.1f} ms total, {self.statements} statement(s), "
+            f"{self.db_time * 1000:.1f} ms in the database, {self.sessions} session(s), "
+            f"{self.checkouts} connection checkout(s)",
+        ]
+        if self._slowest:
+            lines.append("  slowest statements:")
+            for seconds, statement, parameters, executemany in self.slowest():
+                params = repr(parameters)
+                if len(params) > PARAMS_WIDTH:
+                    params = params[:PARAMS_WIDTH - 3] + "..."
+                many = " (executemany)" if executemany else ""
+                lines.append(f"    {seconds * 1000:8.2f} ms  {_one_line(statement)}")
+                lines.append(f"               params{many}: {params}")
+        repeated = [(n, s) for s, n in self.repeated.most_common(self.top) if n > 1]
+        if repeated:
+            lines.append("  most repeated statements:")
+            for count, statement in repeated:
+                lines.append(f"    {count:6d} x  {_one_line(statement)}")
+        if self._profile is not None:
+            lines.append(f"  cProfile stats written to {self.cprofile_path}")
+        return lines
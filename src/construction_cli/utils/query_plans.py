@@ -0,0 +1,57 @@
+import re
+from datetime import date
+from sqlalchemy import select
+from ..models.material import Material, Supplier, Inventory, Order, StockMovement
+from ..models.project import Project, Phase, Milestone, PhaseDependency
+from ..services import read_models
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+def service_queries():
+    """(name, statement, full_scan_expected) for the filters the services run"""
+    return [
+        ("supplier by name", select(Supplier).where(Supplier.normalized_name == "x"), False),
+        ("materials by supplier", select(Material).where(Material.supplier_id == 1), False),
+        ("inventory by material", select(Inventory).where(Inventory.material_id == 1), False),
+        ("inventory at location", select(Inventory).where(Inventory.material_id == 1,
+                                                          Inventory.location == "warehouse"), False),
+        ("movements by material", select(StockMovement).where(StockMovement.material_id == 1), False),
+        ("orders by material", select(Order).where(Order.material_id == 1), False),
+        ("orders by supplier", select(Order).where(Order.supplier_id == 1), False),
+        ("orders by status", select(Order).where(Order.status == "pending"), False),
+        ("orders by project", select(Order).where(Order.project_id == 1), False),
+        ("projects by status", select(Project).where(Project.status == "active"), False),
+        ("phases by project", select(Phase).where(Phase.project_id == 1), False),
+        ("phase successors", select(PhaseDependency).where(PhaseDependency.predecessor_id == 1), False),
+        ("milestones by project", select(Milestone).where(Milestone.project_id == 1), False),
+        ("milestones due", select(Milestone).where(Milestone.target_date <= date.today()), False),
+        ("list materials", select(Material), True),
+        ("list suppliers", select(Supplier), True),
+        ("list inventory", select(Material, Inventory).outerjoin(Inventory), True),
+        ("stock per material", read_models.material_stock_query(10), True),
+        ("stock per location", read_models.location_stock_query(), True),
+        ("project costs", read_models.project_costs_query(), True),
+        ("project dashboard", read_models.dashboard_query(), True),
+        ("list orders", select(Order).join(Material).join(Supplier), True),
+    ]
+
+def explain(conn, statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positiontup:
+        params = tuple(params[key] for key in compiled.positiontup)
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).fetchall()
+    return [row[-1] for row in rows]
+
+def check_plans(conn):
+    """Yield (name, plan lines, unexpected full-scan tables) per service query"""
+    for name, statement, scan_expected in service_queries():
+        plan = explain(conn, statement)
+        scans = []
+        if not scan_expected:
+            for line in plan:
+                match = _SCAN.match(line)
+                if match and "USING" not in line:
+                    scans.append(match.group(1))
+        yield name, plan, scans
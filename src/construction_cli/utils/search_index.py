@@ -0,0 +1,77 @@
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from .database import Base
+
+# One FTS5 table indexes every searchable entity. Rowids encode the source
+# row as id * 4 + kind code, so triggers replace an entry by rowid instead
+# of scanning the unindexed kind/ref_id columns.
+SOURCES = {
+    "project": (1, "projects", "name", "location"),
+    "material": (2, "materials", "name", "unit"),
+    "supplier": (3, "suppliers", "name", "contact"),
+}
+
+KINDS = tuple(SOURCES)
+
+def _triggers(kind, code, table, title, detail):
+    rowid = f"{{row}}.id * 4 + {code}"
+    insert = (f"INSERT INTO search_index (rowid, kind, ref_id, title, detail) "
+              f"VALUES ({rowid.format(row='new')}, '{kind}', new.id, new.{title}, new.{detail});")
+    delete = f"DELETE FROM search_index WHERE rowid = {rowid.format(row='old')};"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_update AFTER UPDATE OF {title}, {detail} ON {table} "
+        f"BEGIN {delete} {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+    ]
+
+def available(conn):
+    """Whether the database has a search index to query"""
+    return conn.dialect.name == "sqlite" and conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'search_index'").scalar() is not None
+
+def install(conn):
+    """Create the FTS5 table and its sync triggers, then index existing rows
+
+    Returns False when SQLite was built without FTS5; search stays disabled.
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    try:
+        conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, detail, prefix = '2 3')"
+        )
+    except OperationalError:
+        return False
+    for kind, (code, table, title, detail) in SOURCES.items():
+        for statement in _triggers(kind, code, table, title, detail):
+            conn.exec_driver_sql(statement)
+    rebuild(conn)
+    return True
+
+def rebuild(conn):
+    """Re-index every project, material and supplier"""
+    conn.exec_driver_sql("DELETE FROM search_index")
+    for kind, (code, table, title, detail) in SOURCES.items():
+        conn.exec_driver_sql(
+            f"INSERT INTO search_index (rowid, kind, ref_id, title, detail) "
+            f"SELECT id * 4 + {code}, '{kind}', id, {title}, {detail} FROM {table}"
+        )
+    conn.exec_driver_sql("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+def matching_ids(conn, kind, tokens, limit=50):
+    """Ids of `kind` rows whose title shares a word prefix with any token, best first"""
+    expression = " OR ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+    if not expression:
+        return []
+    return conn.exec_driver_sql(
+        "SELECT ref_id FROM search_index WHERE search_index MATCH ? AND kind = ? ORDER BY rank LIMIT ?",
+        (f"title : ({expression})", kind, limit),
+    ).scalars().all()
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_on_create(metadata, conn, **kw):
+    # Fresh databases are built by create_all and skip the migrations
+    if {"projects", "materials", "suppliers"} <= set(metadata.tables):
+        install(conn)
@@ -1,6 +1,9 @@
 import React, { useState, useRef, useEffect } from 'react';
 import './App.css';
 
+// Set REACT_APP_API_URL (e.g. http://localhost:8000) to read real data from `buildcli serve`
+const API_URL = process.env.REACT_APP_API_URL;
+
 function App() {
   const [output, setOutput] = useState([
     'Construction CLI Web Terminal',
@@ -51,14 +54,114 @@ function App() {
     setOutput(prev => [...prev, `$ ${command}`]);
 
     try {
-      // Simulate CLI execution (in real app, this would call your backend)
-      const result = await simulateCliCommand(command);
+      // Read commands go to the API when one is configured; everything else uses the mock
+      const result = API_URL ? await apiCliCommand(command) : await simulateCliCommand(command);
       setOutput(prev => [...prev, ...result.split('\n').filter(line => line.trim())]);
     } catch (error) {
       setOutput(prev => [...prev, `Error: ${error.message}`]);
     }
   };
 
+  const apiGet = async (path) => {
+    const response = await fetch(`${API_URL}/api${path}`);
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.error || response.statusText);
+    }
+    return data;
+  };
+
+  const parseCommand = (command) => {
+    const words = (command.match(/"[^"]*"|\S+/g) || []).map(w => w.replace(/^"|"$/g, ''));
+    if (words[0] === 'buildcli') words.shift();
+    // "project list" and "project-list" name the same command
+    if ((words[0] === 'project' || words[0] === 'materials') && words[1] && !words[1].startsWith('-')) {
+      words.splice(0, 2, `${words[0]}-${words[1]}`);
+    }
+    const options = {};
+    const args = [];
+    for (let i = 0; i < words.length; i++) {
+      if (words[i].startsWith('--')) {
+        const next = words[i + 1];
+        options[words[i].slice(2)] = next && !next.startsWith('--') ? words[++i] : true;
+      } else {
+        args.push(words[i]);
+      }
+    }
+    return { name: args[0], sub: args[1], options };
+  };
+
+  const money = (value, digits = 0) =>
+    `$${Number(value).toLocaleString('en-US', { minimumFractionDigits: digits, maximumFractionDigits: digits })}`;
+
+  const apiCliCommand = async (command) => {
+    const { name, sub, options } = parseCommand(command);
+    if (options.help) {
+      return simulateCliCommand(command);
+    }
+
+    if (name === 'project-list') {
+      const query = options.status ? `?status=${encodeURIComponent(options.status)}` : '';
+      const projects = await apiGet(`/projects${query}`);
+      if (!projects.length) return 'No projects found';
+      return ['Project List:', ...projects.map(p =>
+        `${p.id}. ${p.name} - ${p.budget ? money(p.budget) : 'N/A'} - ${p.status}`)].join('\n');
+    }
+
+    if (name === 'project-status') {
+      const p = await apiGet(`/projects/${options['project-id']}`);
+      return [`Project: ${p.name}`, `Status: ${p.status}`,
+        p.budget ? `Budget: ${money(p.budget)}` : 'Budget: N/A',
+        `Location: ${p.location || 'N/A'}`, `Start Date: ${p.start_date || 'N/A'}`].join('\n');
+    }
+
+    if ((name === 'project-phases' || name === 'project-milestones') && sub === 'list') {
+      const id = options['project-id'];
+      const [project, rows] = await Promise.all([
+        apiGet(`/projects/${id}`),
+        apiGet(`/projects/${id}/${name === 'project-phases' ? 'phases' : 'milestones'}`),
+      ]);
+      if (name === 'project-phases') {
+        if (!rows.length) return `No phases found for project: ${project.name}`;
+        return [`Phases for project: ${project.name}`, ...rows.map(p =>
+          `${p.id}. ${p.name} - ${p.duration ? `${p.duration} days` : 'N/A'} - ${p.status}`)].join('\n');
+      }
+      if (!rows.length) return `No milestones found for project: ${project.name}`;
+      return [`Milestones for project: ${project.name}`, ...rows.map(m =>
+        `${m.id}. ${m.name} - Target: ${m.target_date || 'N/A'} - Status: ${m.status}`)].join('\n');
+    }
+
+    if (name === 'materials-list') {
+      const materials = await apiGet('/materials');
+      if (!materials.length) return 'No materials found';
+      return ['Materials List:', ...materials.map(m =>
+        `${m.id}. ${m.name} - ${m.unit} - ${money(m.cost_per_unit || 0, 2)}`)].join('\n');
+    }
+
+    if (name === 'materials-inventory') {
+      const query = options['low-stock'] ? `?low_stock=${options.threshold || 10}` : '';
+      const rows = await apiGet(`/inventory${query}`);
+      if (!rows.length) return 'No inventory items found';
+      return ['Inventory Status:', ...rows.map(row =>
+        `${row.name}: ${row.quantity} ${row.unit} - Locations: ${row.locations ? `${row.locations} location${row.locations === 1 ? '' : 's'}` : 'N/A'}`)].join('\n');
+    }
+
+    if (name === 'materials-suppliers' && sub === 'list') {
+      const suppliers = await apiGet('/suppliers');
+      if (!suppliers.length) return 'No suppliers found';
+      return ['Suppliers List:', ...suppliers.map(s => `${s.id}. ${s.name} - ${s.contact || 'N/A'}`)].join('\n');
+    }
+
+    if (name === 'materials-orders') {
+      const orders = await apiGet('/orders');
+      if (!orders.length) return 'No orders found';
+      return ['Material Orders:', ...orders.map(o =>
+        `${o.id}. ${o.material_name} - ${o.quantity} ${o.unit} - ${o.supplier_name} - ${money(o.total || 0, 2)} - ${o.status} - Delivery: ${o.delivery_date || 'TBD'}`)].join('\n');
+    }
+
+    return simulateCliCommand(command);
+  };
+
   const simulateCliCommand = async (command) => {
     // Mock CLI responses for demonstration
     const responses = {